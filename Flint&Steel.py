@@ -1,83 +1,1008 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import backtrader as bt
 import datetime
 import logging
-import scipy.stats as stats
+import os
+import re
+import sys
+import json
+import argparse
+import asyncio
 import math
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_squared_error
-import requests
-from bs4 import BeautifulSoup
-import tkinter as tk
-from tkinter import ttk
-from tkcalendar import DateEntry
-from PIL import Image, ImageTk
-from tkinter import scrolledtext, filedialog
+import types
+import itertools
+import array
+import hashlib
+import bisect
+import collections
+import contextlib
+import queue
+import threading
+import multiprocessing
+import concurrent.futures
+import time
+import urllib.parse
+from multiprocessing import shared_memory
+
+# Heavy or GUI-only dependencies (yfinance, matplotlib, scipy, requests, bs4, tkinter, tkcalendar)
+# are imported where they are used so headless runs start fast and work on servers without Tk
+tk = ttk = scrolledtext = filedialog = DateEntry = None
+
+def load_gui_modules():
+    global tk, ttk, scrolledtext, filedialog, DateEntry
+    import tkinter as tk
+    from tkinter import ttk, scrolledtext, filedialog
+    from tkcalendar import DateEntry
 
 # Setup logging for the application
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Transaction Ledger: one row per trade in growable NumPy columns instead of a list of dicts
+class TransactionLedger:
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.dates = np.empty(capacity, dtype='datetime64[ns]')
+        self.ticker_ids = np.empty(capacity, dtype=np.int32)
+        self.prices = np.empty(capacity, dtype=np.float64)
+        # Signed: positive for buys, negative for sells
+        self.amounts = np.empty(capacity, dtype=np.float64)
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        if needed <= len(self.prices):
+            return
+        capacity = max(needed, 2 * len(self.prices))
+        for name in ('dates', 'ticker_ids', 'prices', 'amounts'):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def append(self, date, ticker_id, price, amount):
+        self._reserve(1)
+        i = self.size
+        self.dates[i] = date
+        self.ticker_ids[i] = ticker_id
+        self.prices[i] = price
+        self.amounts[i] = amount
+        self.size += 1
+
+    def extend(self, dates, ticker_ids, prices, amounts):
+        count = len(ticker_ids)
+        self._reserve(count)
+        rows = slice(self.size, self.size + count)
+        self.dates[rows] = dates
+        self.ticker_ids[rows] = ticker_ids
+        self.prices[rows] = prices
+        self.amounts[rows] = amounts
+        self.size += count
+
+    def columns(self):
+        return {'date': self.dates[:self.size], 'ticker_id': self.ticker_ids[:self.size],
+                'price': self.prices[:self.size], 'amount': self.amounts[:self.size]}
+
 # Persistent Portfolio Class
 class Portfolio:
-    def __init__(self, initial_cash):
+    def __init__(self, initial_cash, log_trades=True):
         self.cash = initial_cash
-        self.holdings = {}
-        self.transaction_history = []
+        self.tickers = []
+        self.ticker_index = {}
+        self.positions = np.zeros(0)
+        self.ledger = TransactionLedger()
+        self.log_trades = log_trades
+
+    @property
+    def holdings(self):
+        return dict(zip(self.tickers, self.positions.tolist()))
+
+    @property
+    def transaction_history(self):
+        columns = self.ledger.columns()
+        return [{'ticker': self.tickers[ticker_id], 'price': float(price), 'amount': abs(float(amount)),
+                 'type': 'buy' if amount > 0 else 'sell', 'date': pd.Timestamp(date).to_pydatetime()}
+                for date, ticker_id, price, amount in zip(columns['date'], columns['ticker_id'], columns['price'], columns['amount'])]
     
     def add_ticker(self, ticker):
-        if ticker not in self.holdings:
-            self.holdings[ticker] = 0
+        if ticker not in self.ticker_index:
+            self.ticker_index[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+            self.positions = np.append(self.positions, 0.0)
+        return self.ticker_index[ticker]
 
-    def buy(self, ticker, price, amount):
+    @staticmethod
+    def _bar_time(date):
+        # Trades are stamped with the bar they happened on; wall-clock time only when no bar is given
+        return pd.Timestamp(date if date is not None else datetime.datetime.now()).to_datetime64()
+
+    def buy(self, ticker, price, amount, date=None):
         total_cost = price * amount
         if total_cost > self.cash:
             logger.warning(f"Not enough cash to buy {amount} of {ticker}")
             return False
+        ticker_id = self.add_ticker(ticker)
         self.cash -= total_cost
-        self.holdings[ticker] += amount
-        self.transaction_history.append({'ticker': ticker, 'price': price, 'amount': amount, 'type': 'buy', 'date': datetime.datetime.now()})
-        logger.info(f"Bought {amount} of {ticker} at {price}. Cash left: {self.cash}")
+        self.positions[ticker_id] += amount
+        self.ledger.append(self._bar_time(date), ticker_id, price, amount)
+        if self.log_trades:
+            logger.info(f"Bought {amount} of {ticker} at {price}. Cash left: {self.cash}")
         return True
 
-    def sell(self, ticker, price, amount):
-        if self.holdings[ticker] < amount:
+    def sell(self, ticker, price, amount, date=None):
+        ticker_id = self.ticker_index.get(ticker)
+        if ticker_id is None or self.positions[ticker_id] < amount:
             logger.warning(f"Not enough holdings to sell {amount} of {ticker}")
             return False
         self.cash += price * amount
-        self.holdings[ticker] -= amount
-        self.transaction_history.append({'ticker': ticker, 'price': price, 'amount': amount, 'type': 'sell', 'date': datetime.datetime.now()})
-        logger.info(f"Sold {amount} of {ticker} at {price}. Cash after sale: {self.cash}")
+        self.positions[ticker_id] -= amount
+        self.ledger.append(self._bar_time(date), ticker_id, price, -amount)
+        if self.log_trades:
+            logger.info(f"Sold {amount} of {ticker} at {price}. Cash after sale: {self.cash}")
         return True
 
+    def record_trades(self, dates, tickers, prices, amounts):
+        # Applies many already-simulated trades at once (signed amounts), e.g. a PortfolioBacktest trade list
+        ticker_ids = np.array([self.add_ticker(ticker) for ticker in tickers], dtype=np.int32)
+        prices = np.asarray(prices, dtype=np.float64)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        dates = pd.DatetimeIndex(dates)
+        if dates.tz is not None:
+            dates = dates.tz_convert('UTC').tz_localize(None)
+        np.add.at(self.positions, ticker_ids, amounts)
+        self.cash -= float(prices @ amounts)
+        self.ledger.extend(dates.to_numpy(dtype='datetime64[ns]'), ticker_ids, prices, amounts)
+
+    def price_vector(self, current_prices):
+        # Accepts a {ticker: price} dict or an array aligned with self.tickers (optionally one row per bar)
+        if isinstance(current_prices, dict):
+            return np.array([current_prices.get(ticker, 0) for ticker in self.tickers], dtype=np.float64)
+        return np.asarray(current_prices, dtype=np.float64)
+
     def portfolio_value(self, current_prices):
-        value = self.cash
-        for ticker, amount in self.holdings.items():
-            value += current_prices.get(ticker, 0) * amount
-        logger.info(f"Current portfolio value: {value}")
+        value = self.cash + self.price_vector(current_prices) @ self.positions
+        if self.log_trades and np.ndim(value) == 0:
+            logger.info(f"Current portfolio value: {value}")
         return value
 
+    def pnl(self, current_prices):
+        # Total (realized + unrealized) P&L per ticker: trade cash flows plus the marked value of the position
+        columns = self.ledger.columns()
+        flows = np.bincount(columns['ticker_id'], weights=-columns['amount'] * columns['price'], minlength=len(self.tickers))
+        return flows + self.positions * self.price_vector(current_prices)
+
     def get_holdings_summary(self):
-        return {ticker: amount for ticker, amount in self.holdings.items() if amount > 0}
+        return {ticker: amount for ticker, amount in zip(self.tickers, self.positions.tolist()) if amount > 0}
+
+# Default location of the on-disk OHLCV cache
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.flint_steel', 'cache')
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+# Nanoseconds since the epoch for a tz-aware DatetimeIndex, independent of the index resolution
+def _to_epoch_ns(index):
+    return index.tz_convert('UTC').tz_localize(None).to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+# Default fetcher: downloads a single ticker from yfinance with flat OHLCV columns
+def yfinance_fetcher(ticker, start, end, interval):
+    import yfinance as yf
+    data = yf.download(ticker, start=start, end=end, interval=interval, progress=False)
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+    return data
+
+# Default bulk fetcher: downloads many tickers in one yfinance request, returned as one frame per ticker
+def yfinance_bulk_fetcher(tickers, start, end, interval):
+    import yfinance as yf
+    data = yf.download(list(tickers), start=start, end=end, interval=interval, group_by='ticker', progress=False)
+    frames = {}
+    for ticker in tickers:
+        if ticker in data.columns.get_level_values(0):
+            frames[ticker] = data[ticker].dropna(how='all')
+    return frames
+
+# Persistent OHLCV Cache (memory-mapped NumPy columns, one directory per ticker and interval)
+class OHLCVCache:
+    def __init__(self, cache_dir=CACHE_DIR, fetcher=yfinance_fetcher, bulk_fetcher=None):
+        self.cache_dir = cache_dir
+        self.fetcher = fetcher
+        # A custom single-ticker fetcher is used per ticker unless a matching bulk fetcher is given
+        self.bulk_fetcher = bulk_fetcher or (yfinance_bulk_fetcher if fetcher is yfinance_fetcher else None)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, ticker, interval):
+        return os.path.join(self.cache_dir, re.sub(r'[^A-Za-z0-9._-]', '_', f"{ticker}_{interval}"))
+
+    def _read_meta(self, path):
+        meta_file = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_file):
+            return None
+        with open(meta_file, 'r') as file:
+            return json.load(file)
+
+    def _load(self, path, meta):
+        index = np.load(os.path.join(path, f"index.{meta['version']}.npy"), mmap_mode='r')
+        columns = {col: np.load(os.path.join(path, f"{i}.{meta['version']}.npy"), mmap_mode='r')
+                   for i, col in enumerate(meta['columns'])}
+        return index, columns
+
+    def _to_frame(self, meta, index, columns, lo=0, hi=None):
+        dates = pd.to_datetime(np.asarray(index[lo:hi]), utc=True)
+        dates = dates.tz_convert(meta['tz']) if meta['tz'] else dates.tz_localize(None)
+        frame = pd.DataFrame({col: np.asarray(values[lo:hi]) for col, values in columns.items()},
+                             index=pd.DatetimeIndex(dates, name=meta['index_name']))
+        return frame
+
+    def _write(self, path, meta, frame):
+        os.makedirs(path, exist_ok=True)
+        old_version = meta['version']
+        meta = dict(meta, version=old_version + 1)
+        index = frame.index
+        index = index.tz_convert('UTC') if index.tz is not None else index.tz_localize('UTC')
+        arrays = [('index', _to_epoch_ns(index))] + [(str(i), frame[col].to_numpy(dtype=np.float64))
+                                            for i, col in enumerate(meta['columns'])]
+        for name, values in arrays:
+            tmp_file = os.path.join(path, f"{name}.{meta['version']}.tmp.npy")
+            np.save(tmp_file, values)
+            os.replace(tmp_file, os.path.join(path, f"{name}.{meta['version']}.npy"))
+        tmp_meta = os.path.join(path, 'meta.json.tmp')
+        with open(tmp_meta, 'w') as file:
+            json.dump(meta, file)
+        os.replace(tmp_meta, os.path.join(path, 'meta.json'))
+        for name, _ in arrays:
+            stale = os.path.join(path, f"{name}.{old_version}.npy")
+            if os.path.exists(stale):
+                os.remove(stale)
+        return meta
+
+    @staticmethod
+    def _missing_ranges(covered, start, end):
+        missing = []
+        cursor = start
+        for lo, hi in sorted(covered):
+            if hi <= cursor:
+                continue
+            if lo >= end:
+                break
+            if lo > cursor:
+                missing.append((cursor, lo))
+            cursor = max(cursor, hi)
+            if cursor >= end:
+                break
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    @staticmethod
+    def _merge_ranges(ranges):
+        merged = []
+        for lo, hi in sorted(ranges):
+            if merged and lo <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+        return merged
+
+    def missing_ranges(self, ticker, start, end, interval='1d'):
+        meta = self._read_meta(self._path(ticker, interval))
+        covered = meta['ranges'] if meta else []
+        return self._missing_ranges(covered, str(start), str(end))
+
+    def get(self, ticker, start, end, interval='1d'):
+        return self.get_many([ticker], start, end, interval)[ticker]
+
+    def get_many(self, tickers, start, end, interval='1d'):
+        # Tickers missing the same date ranges are fetched together in one bulk request per range
+        start, end = str(start), str(end)
+        groups = {}
+        for ticker in tickers:
+            meta = self._read_meta(self._path(ticker, interval))
+            missing = self._missing_ranges(meta['ranges'] if meta else [], start, end)
+            if missing:
+                groups.setdefault(tuple(missing), []).append(ticker)
+            else:
+                logger.info(f"Cache hit for {ticker} ({interval}) from {start} to {end}")
+
+        for missing, group in groups.items():
+            fetched = {ticker: [] for ticker in group}
+            # Ranges that came back with bars, and ranges whose request succeeded but returned nothing
+            returned = {ticker: [] for ticker in group}
+            empty = {ticker: [] for ticker in group}
+            for lo, hi in missing:
+                logger.info(f"Cache miss for {', '.join(group)} ({interval}): fetching {lo} to {hi}")
+                frames = self._fetch_range(group, lo, hi, interval)
+                for ticker in group:
+                    frame = frames.get(ticker)
+                    if frame is not None and len(frame):
+                        fetched[ticker].append(frame)
+                        returned[ticker].append((lo, hi))
+                    elif ticker in frames:
+                        empty[ticker].append((lo, hi))
+            for ticker in group:
+                self._merge(ticker, interval, returned[ticker], empty[ticker], fetched[ticker])
+
+        return {ticker: self._read(ticker, start, end, interval) for ticker in tickers}
+
+    def _fetch_range(self, group, lo, hi, interval):
+        # {ticker: frame} for every request that went through; failed requests are logged and left out
+        if self.bulk_fetcher is not None and len(group) > 1:
+            try:
+                return self.bulk_fetcher(group, lo, hi, interval)
+            except Exception as exc:
+                logger.warning(f"Fetching {', '.join(group)} ({interval}) from {lo} to {hi} failed: {exc}")
+                return {}
+        frames = {}
+        for ticker in group:
+            try:
+                frames[ticker] = self.fetcher(ticker, lo, hi, interval)
+            except Exception as exc:
+                logger.warning(f"Fetching {ticker} ({interval}) from {lo} to {hi} failed: {exc}")
+        return frames
+
+    @staticmethod
+    def _holds_no_bars(stamps, bounds, lo, hi):
+        # An empty result is only trusted for ranges without weekdays, or gaps between bars the provider did return
+        # (holidays); anything else may be an error or a rate limit and is fetched again next time
+        if not np.busday_count(pd.Timestamp(lo).date(), pd.Timestamp(hi).date()):
+            return True
+        return bool(len(stamps)) and stamps[0] < bounds[0] and stamps[-1] >= bounds[1]
+
+    def _merge(self, ticker, interval, returned, empty, frames):
+        # Coverage is only recorded up to today, since the current bar is not final yet
+        today = datetime.date.today().isoformat()
+        path = self._path(ticker, interval)
+        meta = self._read_meta(path)
+        if meta is None:
+            sample = frames[0] if frames else pd.DataFrame()
+            meta = {'version': 0, 'ranges': [],
+                    'columns': [col for col in OHLCV_COLUMNS if col in sample.columns] or OHLCV_COLUMNS,
+                    'index_name': sample.index.name or 'Date',
+                    'tz': str(sample.index.tz) if isinstance(sample.index, pd.DatetimeIndex) and sample.index.tz else None}
+        else:
+            index, columns = self._load(path, meta)
+            frames = [self._to_frame(meta, index, columns)] + frames
+        frames = [frame.reindex(columns=meta['columns']) for frame in frames]
+        merged = pd.concat(frames) if frames else pd.DataFrame(columns=meta['columns'], index=pd.DatetimeIndex([]))
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        if empty:
+            index = merged.index if merged.index.tz is not None else merged.index.tz_localize('UTC')
+            stamps = _to_epoch_ns(index)
+            tz = meta['tz'] or 'UTC'
+            returned = returned + [(lo, hi) for lo, hi in empty
+                                   if self._holds_no_bars(stamps, _to_epoch_ns(pd.to_datetime([lo, hi]).tz_localize(tz)), lo, hi)]
+        meta['ranges'] = self._merge_ranges(meta['ranges'] + [[lo, min(hi, today)] for lo, hi in returned if lo < today])
+        self._write(path, meta, merged)
+
+    def _read(self, ticker, start, end, interval):
+        path = self._path(ticker, interval)
+        meta = self._read_meta(path)
+        index, columns = self._load(path, meta)
+        bounds = pd.to_datetime([start, end])
+        if meta['tz']:
+            bounds = bounds.tz_localize(meta['tz'])
+        else:
+            bounds = bounds.tz_localize('UTC')
+        lo, hi = np.searchsorted(index, _to_epoch_ns(bounds))
+        return self._to_frame(meta, index, columns, lo, hi)
 
 # Data Retrieval using yfinance
 class DataHandler:
-    def __init__(self, tickers, start_date, end_date):
+    def __init__(self, tickers, start_date, end_date, interval='1d', cache=None):
         self.tickers = tickers
         self.start_date = start_date
         self.end_date = end_date
+        self.interval = interval
+        self.cache = cache
         self.data = None
     
     def fetch_data(self):
         logger.info(f"Fetching data for {self.tickers} from {self.start_date} to {self.end_date}")
-        self.data = yf.download(self.tickers, start=self.start_date, end=self.end_date)
+        if self.cache is None:
+            import yfinance as yf
+            self.data = yf.download(self.tickers, start=self.start_date, end=self.end_date, interval=self.interval)
+        else:
+            tickers = [self.tickers] if isinstance(self.tickers, str) else list(self.tickers)
+            frames = self.cache.get_many(tickers, self.start_date, self.end_date, self.interval)
+            if len(frames) == 1:
+                self.data = frames[tickers[0]]
+            else:
+                self.data = pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
         logger.info("Data fetching complete")
         return self.data
 
+    def fetch_panel(self):
+        # All tickers in one bulk download, aligned into a date x ticker PricePanel
+        tickers = [self.tickers] if isinstance(self.tickers, str) else list(self.tickers)
+        logger.info(f"Fetching panel for {len(tickers)} tickers from {self.start_date} to {self.end_date}")
+        if self.cache is None:
+            import yfinance as yf
+            data = yf.download(tickers, start=self.start_date, end=self.end_date, interval=self.interval,
+                               group_by='ticker', progress=False)
+            frames = {ticker: data[ticker].dropna(how='all') for ticker in tickers if ticker in data.columns.get_level_values(0)}
+        else:
+            frames = self.cache.get_many(tickers, self.start_date, self.end_date, self.interval)
+        self.data = PricePanel.from_frames(frames)
+        logger.info("Data fetching complete")
+        return self.data
+
+# Price Panel: OHLCV fields as aligned 2-D arrays (dates x tickers), NaN where a ticker has no bar
+class PricePanel:
+    def __init__(self, dates, tickers, fields):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.fields = fields
+
+    def __getitem__(self, field):
+        return self.fields[field]
+
+    @property
+    def shape(self):
+        return (len(self.dates), len(self.tickers))
+
+    @classmethod
+    def from_frames(cls, frames):
+        frames = {ticker: frame for ticker, frame in frames.items() if len(frame)}
+        if not frames:
+            raise ValueError("No price data to build a panel from")
+        sample = next(iter(frames.values()))
+        tz = sample.index.tz
+        stamps = np.unique(np.concatenate([_to_epoch_ns(frame.index if frame.index.tz is not None else frame.index.tz_localize('UTC'))
+                                           for frame in frames.values()]))
+        dates = pd.to_datetime(stamps, utc=True)
+        dates = pd.DatetimeIndex(dates.tz_convert(tz) if tz is not None else dates.tz_localize(None), name=sample.index.name)
+        columns = [col for col in OHLCV_COLUMNS if all(col in frame.columns for frame in frames.values())]
+        fields = {col: np.full((len(dates), len(frames)), np.nan) for col in columns}
+        for j, frame in enumerate(frames.values()):
+            rows = dates.get_indexer(frame.index)
+            for col in columns:
+                fields[col][rows, j] = frame[col].to_numpy(dtype=np.float64)
+        return cls(dates, frames.keys(), fields)
+
+    @classmethod
+    def from_frame(cls, data):
+        # Accepts the (field, ticker) column layout returned by a multi-ticker yf.download
+        tickers = data.columns.get_level_values(1).unique()
+        return cls.from_frames({ticker: data.xs(ticker, axis=1, level=1).dropna(how='all') for ticker in tickers})
+
+    def to_frame(self, ticker):
+        j = self.tickers.index(ticker)
+        frame = pd.DataFrame({col: values[:, j] for col, values in self.fields.items()}, index=self.dates)
+        return frame.dropna(how='all')
+
+# Bar Store: one instrument's bars as raw column files (int64 epoch-ns index, float64 OHLCV) that are memory-mapped
+# rather than loaded. Rows are appended in date order, so histories of any length can be imported chunk by chunk.
+class BarStore:
+    def __init__(self, path):
+        self.path = path
+        meta_file = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_file):
+            raise FileNotFoundError(f"No bar store at {path}")
+        with open(meta_file, 'r') as file:
+            self.meta = json.load(file)
+
+    @classmethod
+    def create(cls, path, columns, tz=None, name=None):
+        os.makedirs(path, exist_ok=True)
+        for file_name in ['index.i64'] + [f"{i}.f64" for i in range(len(columns))]:
+            open(os.path.join(path, file_name), 'wb').close()
+        cls._write_meta(path, {'columns': list(columns), 'tz': tz, 'name': name, 'length': 0, 'last': None})
+        return cls(path)
+
+    @staticmethod
+    def _write_meta(path, meta):
+        tmp_meta = os.path.join(path, 'meta.json.tmp')
+        with open(tmp_meta, 'w') as file:
+            json.dump(meta, file)
+        os.replace(tmp_meta, os.path.join(path, 'meta.json'))
+
+    def __len__(self):
+        return self.meta['length']
+
+    @property
+    def columns(self):
+        return self.meta['columns']
+
+    def append(self, frame):
+        if not len(frame):
+            return
+        index = frame.index
+        if index.tz is None and self.meta['tz']:
+            index = index.tz_localize(self.meta['tz'])
+        stamps = _to_epoch_ns(index.tz_convert('UTC') if index.tz is not None else index.tz_localize('UTC'))
+        if (np.diff(stamps) <= 0).any() or (self.meta['last'] is not None and stamps[0] <= self.meta['last']):
+            raise ValueError(f"Bars appended to {self.path} must be in strictly increasing date order")
+        missing = [col for col in self.columns if col not in frame.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        # Data first, then the row count in meta.json, so a crash mid-append never exposes partial rows
+        with open(os.path.join(self.path, 'index.i64'), 'r+b') as file:
+            file.seek(8 * len(self))
+            stamps.astype('<i8').tofile(file)
+        for i, col in enumerate(self.columns):
+            with open(os.path.join(self.path, f"{i}.f64"), 'r+b') as file:
+                file.seek(8 * len(self))
+                frame[col].to_numpy(dtype='<f8').tofile(file)
+        self.meta = dict(self.meta, length=len(self) + len(frame), last=int(stamps[-1]))
+        self._write_meta(self.path, self.meta)
+
+    def _map(self, file_name, dtype, lo, hi):
+        if hi <= lo:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, file_name), dtype=dtype, mode='r', offset=8 * lo, shape=(hi - lo,))
+
+    def index(self, lo=0, hi=None):
+        return self._map('index.i64', '<i8', lo, len(self) if hi is None else hi)
+
+    def column(self, name, lo=0, hi=None):
+        return self._map(f"{self.columns.index(name)}.f64", '<f8', lo, len(self) if hi is None else hi)
+
+    def _epoch(self, date):
+        stamp = pd.Timestamp(date)
+        return stamp.tz_convert('UTC').value if stamp.tz is not None else stamp.tz_localize(self.meta['tz'] or 'UTC').value
+
+    def locate(self, start=None, end=None):
+        # Row range [lo, hi) of the bars with start <= date < end (naive dates are in the store's timezone)
+        index = self.index()
+        lo = 0 if start is None else int(np.searchsorted(index, self._epoch(start)))
+        hi = len(self) if end is None else int(np.searchsorted(index, self._epoch(end)))
+        return lo, hi
+
+    def chunks(self, chunk_size=100000, start=None, end=None):
+        # Yields (epoch-ns index, {column: values}) copies of at most chunk_size rows; only one chunk is mapped at a time
+        lo, hi = self.locate(start, end)
+        for row in range(lo, hi, chunk_size):
+            stop = min(row + chunk_size, hi)
+            yield np.array(self.index(row, stop)), {col: np.array(self.column(col, row, stop)) for col in self.columns}
+
+    def frame(self, start=None, end=None):
+        lo, hi = self.locate(start, end)
+        dates = pd.to_datetime(np.array(self.index(lo, hi)), utc=True)
+        dates = dates.tz_convert(self.meta['tz']) if self.meta['tz'] else dates.tz_localize(None)
+        return pd.DataFrame({col: np.array(self.column(col, lo, hi)) for col in self.columns},
+                            index=pd.DatetimeIndex(dates, name='Date'))
+
+# Column names accepted by the importer, matched case-insensitively with spaces, dashes and underscores ignored
+BAR_COLUMN_ALIASES = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'adjclose': 'Adj Close',
+                      'volume': 'Volume', 'o': 'Open', 'h': 'High', 'l': 'Low', 'c': 'Close', 'v': 'Volume'}
+DATE_COLUMN_NAMES = ('date', 'datetime', 'time', 'timestamp')
+
+def _normalize_bars(chunk, date_column=None):
+    keys = {col: re.sub(r'[\s_-]', '', str(col)).lower() for col in chunk.columns}
+    if date_column is None:
+        date_column = next((col for col, key in keys.items() if key in DATE_COLUMN_NAMES), chunk.columns[0])
+    dates = pd.to_datetime(chunk[date_column])
+    bars = pd.DataFrame({BAR_COLUMN_ALIASES[key]: pd.to_numeric(chunk[col], errors='coerce')
+                         for col, key in keys.items() if key in BAR_COLUMN_ALIASES and col != date_column})
+    bars.index = pd.DatetimeIndex(dates, name='Date')
+    return bars
+
+# Reads a local CSV or Parquet file of bars chunk by chunk as normalized frames (naive dates localized to `tz`)
+def read_bar_chunks(source, chunk_rows=500000, date_column=None, tz=None):
+    if source.lower().endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Reading Parquet files requires pyarrow (pip install pyarrow)")
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows))
+    else:
+        chunks = pd.read_csv(source, chunksize=chunk_rows)
+    for chunk in chunks:
+        bars = _normalize_bars(chunk, date_column)
+        if bars.index.tz is None and tz:
+            bars.index = bars.index.tz_localize(tz)
+        yield bars
+
+# Imports a local CSV or Parquet file into a BarStore without holding the whole file in memory
+def import_bars(source, path, chunk_rows=500000, date_column=None, tz=None, name=None):
+    store = None
+    for bars in read_bar_chunks(source, chunk_rows, date_column, tz):
+        if store is None:
+            columns = [col for col in OHLCV_COLUMNS if col in bars.columns]
+            if not {'Open', 'High', 'Low', 'Close'} <= set(columns):
+                raise ValueError(f"{source} needs Open, High, Low and Close columns, found {list(bars.columns)}")
+            store = BarStore.create(path, columns, tz=str(bars.index.tz) if bars.index.tz is not None else None,
+                                    name=name or os.path.splitext(os.path.basename(source))[0])
+        store.append(bars)
+    if store is None:
+        raise ValueError(f"{source} contains no rows")
+    logger.info(f"Imported {len(store)} bars from {source} into {path}")
+    return store
+
+# Backtrader feed that streams a BarStore chunk by chunk. Run it with cerebro(preload=False, runonce=False,
+# exactbars=1) so neither the feed nor backtrader's line buffers hold more than a chunk of history.
+class BarStoreFeed(bt.feed.DataBase):
+    params = (('store', None), ('chunk_size', 100000), ('start', None), ('end', None))
+
+    # Backtrader stores datetimes as days since 0001-01-01 (plus one); 1970-01-01 is day 719163
+    EPOCH_DAYS = 719163.0
+
+    def start(self):
+        super().start()
+        self.chunk_iter = self.p.store.chunks(self.p.chunk_size, self.p.start, self.p.end)
+        self.rows = iter(())
+
+    def _next_chunk(self):
+        chunk = next(self.chunk_iter, None)
+        if chunk is None:
+            return False
+        index, columns = chunk
+        days = (index / 86400e9 + self.EPOCH_DAYS).tolist()
+        fields = [columns[col].tolist() if col in columns else [0.0] * len(days)
+                  for col in ('Open', 'High', 'Low', 'Close', 'Volume')]
+        self.rows = zip(days, *fields)
+        return True
+
+    def _load(self):
+        row = next(self.rows, None)
+        if row is None:
+            if not self._next_chunk():
+                return False
+            row = next(self.rows)
+        lines = self.lines
+        lines.datetime[0], lines.open[0], lines.high[0], lines.low[0], lines.close[0], lines.volume[0] = row
+        lines.openinterest[0] = 0.0
+        return True
+
+# Vectorized Indicators (NumPy equivalents of the backtrader indicators used by the built-in strategies)
+def sma(values, period):
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if 0 < period <= len(values):
+        out[period - 1:] = np.lib.stride_tricks.sliding_window_view(values, period, axis=0).sum(axis=-1) / period
+    return out
+
+def ema(values, period):
+    # Seeded with the simple average of the first full window, like bt.indicators.EMA
+    from scipy.signal import lfilter
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 2:
+        # Each column of a panel may start at a different bar, so seed them separately
+        out = np.full(values.shape, np.nan)
+        for j in range(values.shape[1]):
+            out[:, j] = ema(values[:, j], period)
+        return out
+    out = np.full(values.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if not len(valid) or valid[0] + period > len(values):
+        return out
+    seed = valid[0] + period - 1
+    out[seed] = math.fsum(values[valid[0]:seed + 1]) / period
+    alpha = 2.0 / (1.0 + period)
+    alpha1 = 1.0 - alpha
+    if seed + 1 < len(values):
+        out[seed + 1:], _ = lfilter([alpha], [1.0, -alpha1], values[seed + 1:], zi=[out[seed] * alpha1])
+    return out
+
+def rsi_sma(close, period):
+    close = np.asarray(close, dtype=np.float64)
+    delta = np.full(close.shape, np.nan)
+    delta[1:] = close[1:] - close[:-1]
+    maup = sma(np.maximum(delta, 0.0), period)
+    madown = sma(np.maximum(-delta, 0.0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100.0 - 100.0 / (1.0 + maup / madown)
+
+def bollinger_bands(close, period, devfactor):
+    close = np.asarray(close, dtype=np.float64)
+    mid = sma(close, period)
+    stddev = devfactor * np.abs(sma(close ** 2, period) - mid ** 2) ** 0.5
+    return mid, mid + stddev, mid - stddev
+
+def macd(close, period_me1, period_me2, period_signal):
+    line = ema(close, period_me1) - ema(close, period_me2)
+    return line, ema(line, period_signal)
+
+# Indicators that can be memoized, with the bar on which backtrader's equivalent first produces a value
+INDICATORS = {
+    'sma': (sma, lambda period: period),
+    'ema': (ema, lambda period: period),
+    'rsi_sma': (rsi_sma, lambda period: period + 1),
+    'bollinger_bands': (bollinger_bands, lambda period, devfactor: period),
+    'macd': (macd, lambda period_me1, period_me2, period_signal: max(period_me1, period_me2) + period_signal - 1),
+}
+
+# Indicator Cache: each indicator is computed once per (dataset fingerprint, indicator, parameters) and shared by
+# every run that asks for it. Entries are evicted least recently used once max_bytes is exceeded; with a
+# spill_dir they are written to .npy files on eviction and memory-mapped back instead of being recomputed.
+class IndicatorCache:
+    def __init__(self, max_bytes=256 * 2**20, spill_dir=None, enabled=True):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        # When disabled, cerebro runs build backtrader's own indicators instead of reading cached arrays
+        self.enabled = enabled
+        self.entries = collections.OrderedDict()
+        self.nbytes = 0
+        self.hits = self.misses = self.spilled = self.reloaded = 0
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def fingerprint(values):
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        digest = hashlib.blake2b(values.view(np.uint8), digest_size=16)
+        digest.update(repr(values.shape).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(fingerprint, name, args):
+        return hashlib.blake2b(repr((fingerprint, name, tuple(args))).encode(), digest_size=16).hexdigest()
+
+    def get(self, name, values, *args, fingerprint=None):
+        key = self.key(fingerprint or self.fingerprint(values), name, args)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            result = self._load_spilled(key)
+            if result is None:
+                self.misses += 1
+                result = INDICATORS[name][0](values, *args)
+                for out in self._outputs(result):
+                    out.flags.writeable = False
+            self._store(key, result)
+            return result
+
+    @staticmethod
+    def _outputs(result):
+        return result if isinstance(result, tuple) else (result,)
+
+    def _store(self, key, result):
+        self.entries[key] = result
+        self.nbytes += sum(out.nbytes for out in self._outputs(result))
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            old_key, old = self.entries.popitem(last=False)
+            self.nbytes -= sum(out.nbytes for out in self._outputs(old))
+            if self.spill_dir:
+                self._spill(old_key, old)
+
+    def _spill_path(self, key, multi):
+        # Multi-output indicators (bands, MACD) are stacked into one file with a leading output axis
+        return os.path.join(self.spill_dir, f"{key}.tuple.npy" if multi else f"{key}.npy")
+
+    def _spill(self, key, result):
+        path = self._spill_path(key, isinstance(result, tuple))
+        if os.path.exists(path):
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        # Written under a temporary name so a concurrent reader never maps a partial file
+        tmp = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp, np.stack(result) if isinstance(result, tuple) else result)
+        os.replace(tmp, path)
+        self.spilled += 1
+
+    def _load_spilled(self, key):
+        if not self.spill_dir:
+            return None
+        for multi in (True, False):
+            path = self._spill_path(key, multi)
+            if not os.path.exists(path):
+                continue
+            try:
+                stored = np.load(path, mmap_mode='r')
+            except (OSError, ValueError) as exc:
+                logger.warning(f"Ignoring unreadable spilled indicator {path}: {exc}")
+                return None
+            self.reloaded += 1
+            return tuple(stored) if multi else stored
+        return None
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        return {'entries': len(self.entries), 'bytes': self.nbytes, 'hits': self.hits, 'misses': self.misses,
+                'spilled': self.spilled, 'reloaded': self.reloaded}
+
+# Process-wide cache used by the built-in strategies (each sweep worker process has its own)
+indicator_cache = IndicatorCache()
+
+# Backtrader indicators whose lines are copied from indicator_cache. They need the whole series up front, so they
+# are only used when cerebro has preloaded the data; otherwise the native backtrader indicator is built.
+class CachedIndicator(bt.Indicator):
+    params = (('args', ()),)
+    indicator = None
+
+    def __init__(self):
+        _, minperiod = INDICATORS[self.indicator]
+        self.addminperiod(minperiod(*self.p.args))
+        values = np.frombuffer(self.data.array, dtype=np.float64)
+        result = indicator_cache.get(self.indicator, values, *self.p.args)
+        self.outputs = result if isinstance(result, tuple) else (result,)
+
+    def next(self):
+        i = len(self) - 1
+        for line, values in zip(self.lines, self.outputs):
+            line[0] = values[i]
+
+    def once(self, start, end):
+        for line, values in zip(self.lines, self.outputs):
+            line.array[start:end] = array.array('d', values[start:end])
+
+class CachedSMA(CachedIndicator):
+    indicator = 'sma'
+    lines = ('sma',)
+
+class CachedRSI(CachedIndicator):
+    indicator = 'rsi_sma'
+    lines = ('rsi',)
+
+class CachedBollingerBands(CachedIndicator):
+    indicator = 'bollinger_bands'
+    lines = ('mid', 'top', 'bot')
+
+class CachedMACD(CachedIndicator):
+    indicator = 'macd'
+    lines = ('macd', 'signal')
+
+# Native backtrader indicator and cached counterpart for each memoizable indicator used by the strategies
+STRATEGY_INDICATORS = {
+    'sma': (lambda data, period: bt.indicators.SimpleMovingAverage(data, period=period), CachedSMA),
+    'rsi_sma': (lambda data, period: bt.indicators.RSI_SMA(data, period=period), CachedRSI),
+    'bollinger_bands': (lambda data, period, devfactor: bt.indicators.BollingerBands(data, period=period, devfactor=devfactor),
+                        CachedBollingerBands),
+    'macd': (lambda data, me1, me2, signal: bt.indicators.MACD(data, period_me1=me1, period_me2=me2, period_signal=signal),
+             CachedMACD),
+}
+
+def strategy_indicator(data, name, *args):
+    native, cached = STRATEGY_INDICATORS[name]
+    if indicator_cache.enabled and len(data.array) and len(data.array) == data.buflen():
+        return cached(data, args=args)
+    return native(data, *args)
+
+# Streaming Indicators: O(1) updates per bar that reproduce the vectorized indicators above, NaN gaps included.
+# Window sums are re-added exactly (math.fsum) once per window length so rounding cannot drift; NaNs are counted
+# rather than summed, so the average is NaN exactly while a NaN is inside the window, as with sma().
+class RollingSMA:
+    def __init__(self, period):
+        self.period = period
+        self.window = collections.deque(maxlen=period)
+        self.total = 0.0
+        self.nans = 0
+        self.count = 0
+
+    def update(self, value):
+        if len(self.window) == self.period:
+            old = self.window[0]
+            if old != old:
+                self.nans -= 1
+            else:
+                self.total -= old
+        self.window.append(value)
+        if value != value:
+            self.nans += 1
+        else:
+            self.total += value
+        self.count += 1
+        if self.count % self.period == 0:
+            self.total = math.fsum(item for item in self.window if item == item)
+        return self.total / self.period if len(self.window) == self.period and not self.nans else math.nan
+
+    def state(self):
+        return {'window': list(self.window), 'total': self.total, 'nans': self.nans, 'count': self.count}
+
+    def load_state(self, state):
+        if len(state['window']) > self.period:
+            raise ValueError(f"Window of {len(state['window'])} values for a period of {self.period}")
+        self.window = collections.deque(state['window'], maxlen=self.period)
+        self.total, self.nans, self.count = state['total'], state['nans'], state['count']
+
+class RollingEMA:
+    def __init__(self, period):
+        self.seed = RollingSMA(period)
+        self.alpha = 2.0 / (1.0 + period)
+        self.alpha1 = 1.0 - self.alpha
+        self.value = math.nan
+        self.seeded = False
+
+    def update(self, value):
+        # As in ema(): leading NaNs are skipped, the seed is the average of the first full window from the first
+        # number (NaN if that window has a gap), and once seeded a NaN input leaves the average NaN for good
+        if self.seeded:
+            self.value = self.alpha * value + self.alpha1 * self.value
+        elif value == value or self.seed.count:
+            self.value = self.seed.update(value)
+            self.seeded = self.seed.count == self.seed.period
+        return self.value
+
+    def state(self):
+        return {'seed': self.seed.state(), 'value': self.value, 'seeded': self.seeded}
+
+    def load_state(self, state):
+        self.seed.load_state(state['seed'])
+        self.value, self.seeded = state['value'], state['seeded']
+
+class RollingRSI:
+    def __init__(self, period):
+        self.up = RollingSMA(period)
+        self.down = RollingSMA(period)
+        self.last = None
+
+    def update(self, close):
+        if self.last is None:
+            self.last = close
+            return math.nan
+        delta = close - self.last
+        self.last = close
+        up, down = self.up.update(max(delta, 0.0)), self.down.update(max(-delta, 0.0))
+        if down == 0.0:
+            return 100.0 if up > 0.0 else math.nan
+        return 100.0 - 100.0 / (1.0 + up / down)
+
+    def state(self):
+        return {'up': self.up.state(), 'down': self.down.state(), 'last': self.last}
+
+    def load_state(self, state):
+        self.up.load_state(state['up'])
+        self.down.load_state(state['down'])
+        self.last = state['last']
+
+class RollingBollingerBands:
+    def __init__(self, period, devfactor):
+        self.mid = RollingSMA(period)
+        self.mean_sq = RollingSMA(period)
+        self.devfactor = devfactor
+
+    def update(self, close):
+        mid = self.mid.update(close)
+        stddev = self.devfactor * abs(self.mean_sq.update(close ** 2) - mid ** 2) ** 0.5
+        return mid, mid + stddev, mid - stddev
+
+    def state(self):
+        return {'mid': self.mid.state(), 'mean_sq': self.mean_sq.state()}
+
+    def load_state(self, state):
+        self.mid.load_state(state['mid'])
+        self.mean_sq.load_state(state['mean_sq'])
+
+class RollingMACD:
+    def __init__(self, period_me1, period_me2, period_signal):
+        self.me1 = RollingEMA(period_me1)
+        self.me2 = RollingEMA(period_me2)
+        self.signal = RollingEMA(period_signal)
+
+    def update(self, close):
+        line = self.me1.update(close) - self.me2.update(close)
+        # The signal line skips the leading NaNs itself, so it starts on the first bar with a MACD value
+        return line, self.signal.update(line)
+
+    def state(self):
+        return {'me1': self.me1.state(), 'me2': self.me2.state(), 'signal': self.signal.state()}
+
+    def load_state(self, state):
+        for name in ('me1', 'me2', 'signal'):
+            getattr(self, name).load_state(state[name])
+
+# A strategy's streaming signals: `step(close) -> (buy, sell)` plus the named indicators it updates. Their state is
+# saved and restored explicitly under a version, so a checkpoint taken before stream_signals changed is rejected
+# rather than restored into indicators it no longer matches.
+class StreamSignals:
+    # Bump when a strategy's streaming indicators change meaning without changing names
+    VERSION = 1
+
+    def __init__(self, step, **indicators):
+        self.step = step
+        self.indicators = indicators
+
+    def __call__(self, close):
+        return self.step(close)
+
+    def state(self):
+        return {'version': self.VERSION, 'indicators': {name: {'type': type(indicator).__name__, 'state': indicator.state()}
+                                                        for name, indicator in self.indicators.items()}}
+
+    def load_state(self, state):
+        saved = state.get('indicators', {})
+        expected = {name: type(indicator).__name__ for name, indicator in self.indicators.items()}
+        if state.get('version') != self.VERSION or {name: item['type'] for name, item in saved.items()} != expected:
+            raise ValueError("Streaming state was saved by a different version of the strategy")
+        for name, indicator in self.indicators.items():
+            indicator.load_state(saved[name]['state'])
+
 # Moving Average Strategy for Backtrader with Hyperparameters
 class MovingAverageStrategy(bt.Strategy):
     params = (
@@ -92,8 +1017,8 @@ class MovingAverageStrategy(bt.Strategy):
     def __init__(self):
         self.dataclose = self.datas[0].close
         self.order = None
-        self.short_ma = bt.indicators.SimpleMovingAverage(self.datas[0], period=self.params.short_period)
-        self.long_ma = bt.indicators.SimpleMovingAverage(self.datas[0], period=self.params.long_period)
+        self.short_ma = strategy_indicator(self.datas[0], 'sma', self.params.short_period)
+        self.long_ma = strategy_indicator(self.datas[0], 'sma', self.params.long_period)
 
     def log(self, txt, dt=None):
         if self.params.printlog:
@@ -133,94 +1058,2010 @@ class MovingAverageStrategy(bt.Strategy):
             elif self.dataclose[0] <= self.position.price * (1 - self.params.stop_loss):
                 self.sell()
 
-# Example RSI Strategy
-class RSIStrategy(bt.Strategy):
-    params = (
-        ('rsi_period', 14),
-        ('rsi_lower', 30),
-        ('rsi_upper', 70),
-    )
+    # Entry/exit conditions for the vectorized engine (stop loss and take profit are applied by the engine)
+    @classmethod
+    def vector_signals(cls, close, p):
+        fingerprint = indicator_cache.fingerprint(close)
+        short_ma = indicator_cache.get('sma', close, p.short_period, fingerprint=fingerprint)
+        long_ma = indicator_cache.get('sma', close, p.long_period, fingerprint=fingerprint)
+        return short_ma > long_ma, short_ma < long_ma
+
+    # The same conditions one bar at a time for paper trading: returns a close -> (buy, sell) function
+    @classmethod
+    def stream_signals(cls, p):
+        short_ma, long_ma = RollingSMA(p.short_period), RollingSMA(p.long_period)
+
+        def step(close):
+            short, long_ = short_ma.update(close), long_ma.update(close)
+            return short > long_, short < long_
+        return StreamSignals(step, short_ma=short_ma, long_ma=long_ma)
+
+# Example RSI Strategy
+class RSIStrategy(bt.Strategy):
+    params = (
+        ('rsi_period', 14),
+        ('rsi_lower', 30),
+        ('rsi_upper', 70),
+    )
+
+    def __init__(self):
+        self.dataclose = self.datas[0].close
+        self.order = None
+        self.rsi = strategy_indicator(self.data.close, 'rsi_sma', self.params.rsi_period)
+
+    def notify_order(self, order):
+        if order.status in [order.Submitted, order.Accepted]:
+            return
+        self.order = None
+
+    def next(self):
+        if self.order:
+            return
+        if self.rsi < self.params.rsi_lower:
+            if self.position.size == 0:
+                self.order = self.buy()
+        elif self.rsi > self.params.rsi_upper:
+            if self.position.size > 0:
+                self.order = self.sell()
+
+    @classmethod
+    def vector_signals(cls, close, p):
+        rsi = indicator_cache.get('rsi_sma', close, p.rsi_period)
+        return rsi < p.rsi_lower, rsi > p.rsi_upper
+
+    @classmethod
+    def stream_signals(cls, p):
+        rsi = RollingRSI(p.rsi_period)
+
+        def step(close):
+            value = rsi.update(close)
+            return value < p.rsi_lower, value > p.rsi_upper
+        return StreamSignals(step, rsi=rsi)
+
+# Example Bollinger Bands Strategy
+class BollingerBandsStrategy(bt.Strategy):
+    params = (
+        ('bbands_period', 20),
+        ('bbands_devfactor', 2.0),
+    )
+
+    def __init__(self):
+        self.dataclose = self.datas[0].close
+        self.order = None
+        self.bbands = strategy_indicator(self.datas[0], 'bollinger_bands', self.params.bbands_period, self.params.bbands_devfactor)
+
+    def notify_order(self, order):
+        if order.status in [order.Submitted, order.Accepted]:
+            return
+        self.order = None
+
+    def next(self):
+        if self.order:
+            return
+        if self.dataclose < self.bbands.lines.bot:
+            if self.position.size == 0:
+                self.order = self.buy()
+        elif self.dataclose > self.bbands.lines.top:
+            if self.position.size > 0:
+                self.order = self.sell()
+
+    @classmethod
+    def vector_signals(cls, close, p):
+        _, top, bot = indicator_cache.get('bollinger_bands', close, p.bbands_period, p.bbands_devfactor)
+        return close < bot, close > top
+
+    @classmethod
+    def stream_signals(cls, p):
+        bbands = RollingBollingerBands(p.bbands_period, p.bbands_devfactor)
+
+        def step(close):
+            _, top, bot = bbands.update(close)
+            return close < bot, close > top
+        return StreamSignals(step, bbands=bbands)
+
+# Example MACD Strategy
+class MACDStrategy(bt.Strategy):
+    params = (
+        ('macd1', 12),
+        ('macd2', 26),
+        ('signal', 9),
+    )
+
+    def __init__(self):
+        self.dataclose = self.datas[0].close
+        self.order = None
+        self.macd = strategy_indicator(self.datas[0], 'macd', self.params.macd1, self.params.macd2, self.params.signal)
+
+    def notify_order(self, order):
+        if order.status in [order.Submitted, order.Accepted]:
+            return
+        self.order = None
+
+    def next(self):
+        if self.order:
+            return
+        if self.macd.lines.macd > self.macd.lines.signal:
+            if self.position.size == 0:
+                self.order = self.buy()
+        elif self.macd.lines.macd < self.macd.lines.signal:
+            if self.position.size > 0:
+                self.order = self.sell()
+
+    @classmethod
+    def vector_signals(cls, close, p):
+        macd_line, signal_line = indicator_cache.get('macd', close, p.macd1, p.macd2, p.signal)
+        return macd_line > signal_line, macd_line < signal_line
+
+    @classmethod
+    def stream_signals(cls, p):
+        macd = RollingMACD(p.macd1, p.macd2, p.signal)
+
+        def step(close):
+            macd_line, signal_line = macd.update(close)
+            return macd_line > signal_line, macd_line < signal_line
+        return StreamSignals(step, macd=macd)
+
+# Example Buy and Hold Strategy
+class BuyAndHoldStrategy(bt.Strategy):
+    def __init__(self):
+        self.dataclose = self.datas[0].close
+        self.order = None
+
+    def notify_order(self, order):
+        if order.status in [order.Submitted, order.Accepted]:
+            return
+        self.order = None
+
+    def next(self):
+        if self.order:
+            return
+        if self.position.size == 0:
+            self.order = self.buy()
+
+    @classmethod
+    def vector_signals(cls, close, p):
+        return np.ones(np.shape(close), dtype=bool), np.zeros(np.shape(close), dtype=bool)
+
+    @classmethod
+    def stream_signals(cls, p):
+        return StreamSignals(lambda close: (True, False))
+
+# Strategies selectable in the GUI
+STRATEGIES = {
+    'Moving Average': MovingAverageStrategy,
+    'RSI': RSIStrategy,
+    'Bollinger Bands': BollingerBandsStrategy,
+    'MACD': MACDStrategy,
+    'Buy and Hold': BuyAndHoldStrategy,
+}
+
+def resolve_strategy_params(strategy_cls, **params):
+    defaults = dict(strategy_cls.params._getitems())
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {strategy_cls.__name__}: {sorted(unknown)}")
+    defaults.update(params)
+    return types.SimpleNamespace(**defaults)
+
+# Records closed trades from a cerebro run in the same shape as the vectorized engine
+class TradeList(bt.Analyzer):
+    def start(self):
+        self.trades = []
+
+    def notify_trade(self, trade):
+        if trade.isclosed:
+            self.trades.append({'entry_bar': trade.baropen - 1, 'exit_bar': trade.barclose - 1,
+                                'entry_price': trade.price, 'pnl': trade.pnl})
+
+    def get_analysis(self):
+        return self.trades
+
+# Result of a vectorized backtest run
+class BacktestResult:
+    def __init__(self, dates, position, cash, value, trades, initial_cash):
+        self.dates = dates
+        self.position = position
+        self.cash = cash
+        self.value = value
+        self.trades = trades
+        self.initial_cash = initial_cash
+        self.final_value = float(value[-1]) if len(value) else float(initial_cash)
+
+# Vectorized Backtest Engine: reproduces cerebro's default broker (fixed 1 unit stake, market orders
+# filled at the next bar's open, no commission) for strategies that implement vector_signals
+class VectorizedBacktest:
+    def __init__(self, strategy_cls, initial_cash=100000, **params):
+        self.strategy_cls = strategy_cls
+        self.initial_cash = initial_cash
+        self.params = resolve_strategy_params(strategy_cls, **params)
+
+    def run(self, data):
+        open_ = data['Open'].to_numpy(dtype=np.float64)
+        close = data['Close'].to_numpy(dtype=np.float64)
+        buy, sell = self.strategy_cls.vector_signals(close, self.params)
+        stop_loss = getattr(self.params, 'stop_loss', None)
+        take_profit = getattr(self.params, 'take_profit', None)
+        if stop_loss is None and take_profit is None:
+            position = self._positions_from_signals(buy, sell)
+        else:
+            position = self._positions_with_stops(buy, sell, close, open_, stop_loss, take_profit)
+        return self._settle(data.index, position, open_, close)
+
+    @staticmethod
+    def desired_from_signals(buy, sell):
+        # The desired state after each bar is the last signal seen (works on 1-D series and 2-D panels)
+        signal = np.where(buy, 1, np.where(sell, -1, 0))
+        bars = np.arange(len(signal)).reshape((-1,) + (1,) * (signal.ndim - 1))
+        last = np.maximum.accumulate(np.where(signal != 0, bars, -1), axis=0)
+        return np.where(last >= 0, np.take_along_axis(signal, np.maximum(last, 0), axis=0), 0) == 1
+
+    @staticmethod
+    def _positions_from_signals(buy, sell):
+        # Orders fill one bar after the signal
+        desired = VectorizedBacktest.desired_from_signals(buy, sell)
+        position = np.zeros(desired.shape)
+        position[1:] = desired[:-1]
+        return position
+
+    @staticmethod
+    def _positions_with_stops(buy, sell, close, open_, stop_loss, take_profit):
+        # Walks trade by trade: entry and exit bars are located with array searches, never bar by bar
+        n = len(close)
+        position = np.zeros(n)
+        entries = np.flatnonzero(buy)
+        exits = np.flatnonzero(sell & ~buy)
+        take_profit = np.inf if take_profit is None else take_profit
+        stop_loss = np.inf if stop_loss is None else stop_loss
+        bar = 0
+        while True:
+            k = np.searchsorted(entries, bar)
+            if k == len(entries) or entries[k] + 1 >= n:
+                break
+            entry = entries[k] + 1
+            entry_price = open_[entry]
+            k = np.searchsorted(exits, entry)
+            signal_exit = exits[k] if k < len(exits) else n
+            window = close[entry:signal_exit + 1]
+            hits = np.flatnonzero((window >= entry_price * (1 + take_profit)) | (window <= entry_price * (1 - stop_loss)))
+            decision = entry + hits[0] if len(hits) else signal_exit
+            if decision >= n - 1:
+                position[entry:] = 1
+                break
+            position[entry:decision + 1] = 1
+            if decision == signal_exit and len(hits):
+                # Crossover and stop exits fire on the same bar: both sells fill and the strategy is left short
+                position[decision + 1:] = -1
+                break
+            bar = decision + 1
+        return position
+
+    def _settle(self, dates, position, open_, close):
+        change = np.diff(position, prepend=0.0)
+        cash = self.initial_cash - np.cumsum(change * open_)
+        value = cash + position * close
+        prev = position - change
+        entries = np.flatnonzero((prev == 0) & (position == 1))
+        exits = np.flatnonzero((prev == 1) & (position != 1))
+        trades = [{'entry_bar': int(entry), 'exit_bar': int(exit_), 'entry_price': float(open_[entry]),
+                   'pnl': float(open_[exit_] - open_[entry])}
+                  for entry, exit_ in zip(entries, exits)]
+        return BacktestResult(dates, position, cash, value, trades, self.initial_cash)
+
+# Runs a strategy through both cerebro and the vectorized engine and reports any difference
+def check_engine_parity(data, strategy_cls, initial_cash=100000, tolerance=1e-6, **params):
+    cerebro = bt.Cerebro()
+    cerebro.addstrategy(strategy_cls, **params)
+    cerebro.adddata(bt.feeds.PandasData(dataname=data))
+    cerebro.broker.setcash(initial_cash)
+    cerebro.addanalyzer(TradeList, _name='trades')
+    # Backtrader's own indicators are used here so the check also covers the NumPy indicator code
+    enabled, indicator_cache.enabled = indicator_cache.enabled, False
+    try:
+        strat = cerebro.run()[0]
+    finally:
+        indicator_cache.enabled = enabled
+    expected_trades = strat.analyzers.trades.get_analysis()
+    expected_value = cerebro.broker.getvalue()
+
+    result = VectorizedBacktest(strategy_cls, initial_cash, **params).run(data)
+    mismatches = []
+    if abs(result.final_value - expected_value) > tolerance:
+        mismatches.append(f"final value {result.final_value} != {expected_value}")
+    if len(result.trades) != len(expected_trades):
+        mismatches.append(f"{len(result.trades)} trades != {len(expected_trades)}")
+    for got, expected in zip(result.trades, expected_trades):
+        if (got['entry_bar'], got['exit_bar']) != (expected['entry_bar'], expected['exit_bar']) \
+                or abs(got['pnl'] - expected['pnl']) > tolerance:
+            mismatches.append(f"trade {got} != {expected}")
+    for mismatch in mismatches:
+        logger.warning(f"{strategy_cls.__name__} parity mismatch: {mismatch}")
+    return not mismatches
+
+# Multi-Asset Portfolio Backtest: one strategy over a basket of tickers sharing cash. Target weights come
+# from the strategy's per-ticker signals and the allocation rule; holdings are rebalanced at the next open
+# on a fixed schedule and whenever the targets change. Stop loss / take profit are single-asset rules and
+# are not applied here.
+class PortfolioBacktest:
+    def __init__(self, strategy_cls=None, initial_cash=100000, allocation='equal', weights=None, rebalance=21, **params):
+        if allocation not in ('equal', 'fixed'):
+            raise ValueError(f"Unknown allocation '{allocation}', expected 'equal' or 'fixed'")
+        if allocation == 'fixed' and not weights:
+            raise ValueError("Fixed allocation needs a weight per ticker")
+        self.strategy_cls = strategy_cls
+        self.initial_cash = initial_cash
+        self.allocation = allocation
+        self.weights = weights or {}
+        self.rebalance = rebalance
+        self.params = resolve_strategy_params(strategy_cls, **params) if strategy_cls else None
+
+    def target_weights(self, panel):
+        close = panel['Close']
+        listed = ~np.isnan(close)
+        if self.strategy_cls is None:
+            active = listed
+        else:
+            buy, sell = self.strategy_cls.vector_signals(close, self.params)
+            active = VectorizedBacktest.desired_from_signals(buy, sell) & listed
+        if self.allocation == 'equal':
+            count = active.sum(axis=1, keepdims=True)
+            return np.divide(active, count, out=np.zeros(active.shape), where=count > 0)
+        return active * np.array([self.weights.get(ticker, 0.0) for ticker in panel.tickers])
+
+    def run(self, panel):
+        n, k = panel.shape
+        open_ = panel['Open']
+        # Holdings are marked at the last known close while a ticker has no bar
+        mark = pd.DataFrame(panel['Close']).ffill().fillna(0.0).to_numpy()
+        weights = self.target_weights(panel)
+
+        due = np.zeros(n, dtype=bool)
+        due[0] = weights[0].any()
+        due[1:] = (weights[1:] != weights[:-1]).any(axis=1)
+        if self.rebalance:
+            due[::self.rebalance] = True
+        decisions = np.flatnonzero(due[:-1])
+
+        holdings = np.zeros(k)
+        cash = float(self.initial_cash)
+        deltas = np.zeros((n, k))
+        flows = np.zeros(n)
+        ledger = []
+        for bar in decisions:
+            fill = bar + 1
+            price = open_[fill]
+            tradable = ~np.isnan(price) & (mark[bar] > 0)
+            value = cash + holdings @ mark[bar]
+            target = np.where(tradable, np.floor(value * weights[bar] / np.where(tradable, mark[bar], 1.0)), holdings)
+            delta = target - holdings
+            price = np.where(tradable, price, 0.0)
+            proceeds = -(np.minimum(delta, 0.0) * price).sum()
+            cost = (np.maximum(delta, 0.0) * price).sum()
+            if cost > cash + proceeds:
+                # Buys are scaled down when the open gapped above the close they were sized on
+                buys = delta > 0
+                delta[buys] = np.floor(delta[buys] * (cash + proceeds) / cost)
+                cost = (np.maximum(delta, 0.0) * price).sum()
+            traded = np.flatnonzero(delta)
+            if not len(traded):
+                continue
+            cash += proceeds - cost
+            holdings += delta
+            deltas[fill] = delta
+            flows[fill] = proceeds - cost
+            ledger.append((np.full(len(traded), fill), traded, delta[traded], price[traded]))
+
+        held = np.cumsum(deltas, axis=0)
+        cash_curve = self.initial_cash + np.cumsum(flows)
+        value = cash_curve + (held * mark).sum(axis=1)
+        bars, columns, shares, prices = (np.concatenate(parts) for parts in zip(*ledger)) if ledger else ([], [], [], [])
+        trades = pd.DataFrame({'date': panel.dates[np.asarray(bars, dtype=np.int64)],
+                               'ticker': np.asarray(panel.tickers, dtype=object)[np.asarray(columns, dtype=np.int64)],
+                               'shares': np.asarray(shares, dtype=np.float64), 'price': np.asarray(prices, dtype=np.float64)})
+        return BacktestResult(panel.dates, held, cash_curve, value, trades, self.initial_cash)
+
+# Records the broker value, cash and position size on every bar of a cerebro run
+class ValueRecorder(bt.Analyzer):
+    def start(self):
+        self.values = []
+        self.positions = []
+        self.cash = []
+
+    def next(self):
+        self.values.append(self.strategy.broker.getvalue())
+        self.positions.append(self.strategy.position.size)
+        self.cash.append(self.strategy.broker.getcash())
+
+    def get_analysis(self):
+        return self.values
+
+# Peak resident memory of this process. On Linux the high-water mark can be reset, so each phase gets its own peak;
+# elsewhere it is the process-wide peak so far.
+def peak_rss():
+    try:
+        with open('/proc/self/status', 'r') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+    except OSError:
+        pass
+
+# Run Instrumentation: wall time, CPU time (of the calling thread) and peak memory for each phase of a run. Phases
+# can nest. memory='rss' is nearly free; memory='traced' counts Python allocations exactly with tracemalloc but makes
+# a cerebro run several times slower. next_calls adds per-strategy next() and analyzer call counts and timings, and
+# profile captures a cProfile of everything run inside a phase.
+class PhaseTimer:
+    def __init__(self, memory='rss', next_calls=False, profile=False):
+        self.memory = memory
+        self.next_calls = next_calls
+        self.profiler = None
+        if profile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+        self.phases = []
+        self.calls = {}
+        self.stack = []
+        self.origin = time.perf_counter()
+
+    def _peak(self):
+        if self.memory == 'traced':
+            import tracemalloc
+            return tracemalloc.get_traced_memory()[1]
+        return peak_rss() if self.memory == 'rss' else None
+
+    def _reset_peak(self):
+        if self.memory == 'traced':
+            import tracemalloc
+            tracemalloc.reset_peak()
+        elif self.memory == 'rss':
+            reset_peak_rss()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if not self.stack:
+            if self.memory == 'traced':
+                import tracemalloc
+                tracemalloc.start()
+            if self.profiler is not None:
+                self.profiler.enable()
+        else:
+            # The parent's peak so far is kept before the high-water mark is reset for this phase
+            parent = self.stack[-1]
+            parent['peak'] = max(filter(None, (parent['peak'], self._peak())), default=None)
+        self._reset_peak()
+        frame = {'name': name, 'peak': None, 'started': time.perf_counter(), 'cpu': time.thread_time()}
+        self.stack.append(frame)
+        try:
+            yield frame
+        finally:
+            wall = time.perf_counter() - frame['started']
+            cpu = time.thread_time() - frame['cpu']
+            peak = max(filter(None, (frame['peak'], self._peak())), default=None)
+            self.stack.pop()
+            self.phases.append({'name': name, 'depth': len(self.stack), 'start': frame['started'] - self.origin,
+                                'wall': wall, 'cpu': cpu, 'peak_memory': peak, 'thread': threading.get_ident()})
+            if self.stack:
+                parent = self.stack[-1]
+                parent['peak'] = max(filter(None, (parent['peak'], peak)), default=None)
+                self._reset_peak()
+            else:
+                if self.profiler is not None:
+                    self.profiler.disable()
+                if self.memory == 'traced':
+                    import tracemalloc
+                    tracemalloc.stop()
+
+    def wrap(self, obj, method, name):
+        # Times every call of obj.method as a phase, e.g. a feed's preload inside cerebro.run
+        original = getattr(obj, method)
+
+        def timed_call(*args, **kwargs):
+            with self.phase(name):
+                return original(*args, **kwargs)
+
+        setattr(obj, method, timed_call)
+        return obj
+
+    def instrument(self, strategy_cls):
+        # Subclass that counts and times next() and the per-bar analyzer updates (unchanged when next_calls is off)
+        if not self.next_calls:
+            return strategy_cls
+        calls = self.calls.setdefault(strategy_cls.__name__, {'next': [0, 0.0], 'analyzers': [0, 0.0]})
+
+        def next(strategy):
+            started = time.perf_counter()
+            strategy_cls.next(strategy)
+            calls['next'][0] += 1
+            calls['next'][1] += time.perf_counter() - started
+
+        def _next_analyzers(strategy, minperstatus, once=False):
+            started = time.perf_counter()
+            strategy_cls._next_analyzers(strategy, minperstatus, once)
+            calls['analyzers'][0] += 1
+            calls['analyzers'][1] += time.perf_counter() - started
+
+        return type(strategy_cls)(strategy_cls.__name__, (strategy_cls,),
+                                  {'__module__': strategy_cls.__module__, 'next': next, '_next_analyzers': _next_analyzers})
+
+    def to_dict(self):
+        phases = sorted(self.phases, key=lambda phase: phase['start'])
+        calls = {strategy: {kind: {'calls': count, 'seconds': seconds} for kind, (count, seconds) in kinds.items()}
+                 for strategy, kinds in self.calls.items()}
+        return {'phases': [{key: value for key, value in phase.items() if key != 'thread'} for phase in phases],
+                'calls': calls, 'memory': self.memory}
+
+    def summary(self):
+        lines = ["Timings (wall / CPU / peak memory):"]
+        for phase in sorted(self.phases, key=lambda phase: phase['start']):
+            memory = f" / {phase['peak_memory'] / 2**20:.1f} MB" if phase['peak_memory'] is not None else ""
+            lines.append(f"{'  ' * (phase['depth'] + 1)}{phase['name']}: {phase['wall']:.3f}s / {phase['cpu']:.3f}s{memory}")
+        for strategy, kinds in self.calls.items():
+            for kind, (count, seconds) in kinds.items():
+                if count:
+                    lines.append(f"  {strategy} {kind}: {count} calls, {seconds / count * 1e6:.1f} us per call")
+        return '\n'.join(lines)
+
+    def chrome_trace(self):
+        # Complete ('X') events in microseconds, viewable in chrome://tracing or Perfetto
+        pid = os.getpid()
+        events = [{'name': phase['name'], 'ph': 'X', 'ts': phase['start'] * 1e6, 'dur': phase['wall'] * 1e6,
+                   'pid': pid, 'tid': phase['thread'],
+                   'args': {'cpu_ms': phase['cpu'] * 1e3, 'peak_memory_mb': phase['peak_memory'] / 2**20
+                            if phase['peak_memory'] is not None else None}}
+                  for phase in self.phases]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': self.to_dict()['calls']}
+
+    def profile_summary(self, limit=20):
+        import io
+        import pstats
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats('cumulative').print_stats(limit)
+        return stream.getvalue()
+
+    def export(self, path):
+        # `.prof` writes the cProfile capture (pstats format), `.trace.json` a Chrome trace, anything else JSON
+        if path.endswith('.prof'):
+            if self.profiler is None:
+                raise ValueError("No profile was captured (enable profiling for the run)")
+            self.profiler.dump_stats(path)
+            return
+        report = self.chrome_trace() if path.endswith('.trace.json') else self.to_dict()
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2)
+
+# Times a phase when a timer is given
+def timed(timer, name):
+    return timer.phase(name) if timer is not None else contextlib.nullcontext()
+
+# Runs one strategy configuration with either engine; cerebro runs are recorded into the same BacktestResult
+# shape as the vectorized engine (a job gets bar-level progress and cancellation)
+def run_strategy(data, strategy_cls, params, initial_cash=100000, engine='vectorized', timer=None, job=None):
+    if engine == 'vectorized':
+        with timed(timer, 'run'):
+            return VectorizedBacktest(strategy_cls, initial_cash, **params).run(data)
+    with timed(timer, 'feed'):
+        cerebro = bt.Cerebro()
+        cerebro.addstrategy(timer.instrument(strategy_cls) if timer else strategy_cls, **params)
+        data_feed = bt.feeds.PandasData(dataname=data)
+        if timer is not None:
+            timer.wrap(data_feed, 'preload', 'feed.preload')
+        cerebro.adddata(data_feed)
+        cerebro.broker.setcash(initial_cash)
+        cerebro.addanalyzer(ValueRecorder, _name='values')
+        cerebro.addanalyzer(TradeList, _name='trades')
+        if job is not None:
+            cerebro.addanalyzer(ProgressReporter, job=job)
+    with timed(timer, 'run'):
+        strat = cerebro.run()[0]
+    with timed(timer, 'analyzers'):
+        recorder = strat.analyzers.values
+        value = np.asarray(recorder.values, dtype=np.float64)
+        return BacktestResult(data.index[:len(value)], np.asarray(recorder.positions, dtype=np.float64),
+                              np.asarray(recorder.cash, dtype=np.float64), value,
+                              strat.analyzers.trades.get_analysis(), initial_cash)
+
+def run_strategy_values(data, strategy_cls, params, initial_cash=100000, engine='vectorized', timer=None):
+    return run_strategy(data, strategy_cls, params, initial_cash, engine, timer).value
+
+# Batched Metrics: every column of an equity matrix (bars x runs) is evaluated in one vectorized pass.
+# Ratios are annualised with the number of bars per year for the data interval.
+TRADING_DAYS = 252
+# Annual risk-free rate behind every Sharpe and Sortino ratio (dashboard, CLI, stores, bootstrap), so one run
+# reports the same ratios wherever it is shown
+RISK_FREE_RATE = 0.0
+PERIODS_PER_YEAR = {'1m': 252 * 390, '2m': 252 * 195, '5m': 252 * 78, '15m': 252 * 26, '30m': 252 * 13,
+                    '60m': 252 * 6.5, '90m': 252 * 6.5 / 1.5, '1h': 252 * 6.5, '1d': TRADING_DAYS,
+                    '5d': TRADING_DAYS / 5, '1wk': 52, '1mo': 12, '3mo': 4}
+METRIC_NAMES = ['Total Return', 'Annual Return', 'Volatility', 'Sharpe Ratio', 'Sortino Ratio', 'Calmar Ratio',
+                'Max Drawdown', 'Drawdown Duration', 'Win Rate', 'Turnover']
+
+def _safe_ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros(np.broadcast(numerator, denominator).shape),
+                     where=denominator != 0)
+
+def batch_metrics(equity, periods_per_year=TRADING_DAYS, risk_free_rate=RISK_FREE_RATE, initial=None, traded_value=None):
+    # Returns {metric: array with one value per column}. Turnover (annualised traded value / mean equity)
+    # needs the value traded per bar for each run; without it it is reported as 0.
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.ndim == 1:
+        equity = equity[:, None]
+    bars, runs = equity.shape
+    start = equity[0] if initial is None else np.broadcast_to(np.asarray(initial, dtype=np.float64), (runs,))
+    returns = np.diff(equity, axis=0) / equity[:-1]
+    excess = returns - risk_free_rate / periods_per_year
+    scale = np.sqrt(periods_per_year)
+    periods = max(bars - 1, 1)
+
+    total_return = equity[-1] / start - 1
+    annual_return = np.where(total_return > -1, np.abs(1 + total_return) ** (periods_per_year / periods) - 1, -1.0)
+    volatility = returns.std(axis=0) * scale if bars > 1 else np.zeros(runs)
+    mean_excess = excess.mean(axis=0) if bars > 1 else np.zeros(runs)
+    std_excess = excess.std(axis=0) if bars > 1 else np.zeros(runs)
+    downside = np.sqrt((np.minimum(excess, 0.0) ** 2).mean(axis=0)) if bars > 1 else np.zeros(runs)
+
+    peaks = np.maximum.accumulate(equity, axis=0)
+    max_drawdown = (equity / peaks - 1).min(axis=0)
+    # Longest stretch of bars spent below a previous peak
+    index = np.arange(bars)[:, None]
+    last_peak = np.maximum.accumulate(np.where(equity >= peaks, index, 0), axis=0)
+    drawdown_duration = (index - last_peak).max(axis=0)
+
+    wins = (returns > 0).sum(axis=0)
+    active = (returns != 0).sum(axis=0)
+
+    if traded_value is not None:
+        turnover = _safe_ratio(np.asarray(traded_value, dtype=np.float64).sum(axis=0), equity.mean(axis=0)) * periods_per_year / periods
+    else:
+        turnover = np.zeros(runs)
+
+    return {
+        'Total Return': total_return,
+        'Annual Return': annual_return,
+        'Volatility': volatility,
+        'Sharpe Ratio': _safe_ratio(mean_excess, std_excess) * scale,
+        'Sortino Ratio': _safe_ratio(mean_excess, downside) * scale,
+        'Calmar Ratio': _safe_ratio(annual_return, np.abs(max_drawdown)),
+        'Max Drawdown': max_drawdown,
+        'Drawdown Duration': drawdown_duration.astype(np.float64),
+        'Win Rate': _safe_ratio(wins, active),
+        'Turnover': turnover,
+    }
+
+def rolling_metrics(equity, window, periods_per_year=TRADING_DAYS, risk_free_rate=RISK_FREE_RATE):
+    # Trailing-window return, Sharpe and Sortino for every bar and column, from running sums (O(1) per bar)
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.ndim == 1:
+        equity = equity[:, None]
+    excess = np.diff(equity, axis=0) / equity[:-1] - risk_free_rate / periods_per_year
+    zero = np.zeros((1, equity.shape[1]))
+
+    def trailing_sum(values):
+        sums = np.concatenate([zero, np.cumsum(values, axis=0)])
+        out = np.full(values.shape, np.nan)
+        out[window - 1:] = sums[window:] - sums[:-window]
+        return out
+
+    mean = trailing_sum(excess) / window
+    variance = np.maximum(trailing_sum(excess ** 2) / window - mean ** 2, 0.0)
+    downside = np.sqrt(trailing_sum(np.minimum(excess, 0.0) ** 2) / window)
+    scale = np.sqrt(periods_per_year)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.full(equity.shape, np.nan)
+        returns[window:] = equity[window:] / equity[:-window] - 1
+        return {'Return': returns[1:], 'Sharpe Ratio': mean / np.sqrt(variance) * scale,
+                'Sortino Ratio': mean / downside * scale}
+
+# Streaming Metrics: updated one bar at a time in O(1), with optional trailing-window Sharpe/Sortino
+class StreamingMetrics:
+    def __init__(self, periods_per_year=TRADING_DAYS, risk_free_rate=RISK_FREE_RATE, window=None):
+        self.periods_per_year = periods_per_year
+        self.risk_free = risk_free_rate / periods_per_year
+        self.window = window
+        self.recent = collections.deque()
+        self.first = None
+        self.last = None
+        self.count = 0
+        self.sum = self.sum_sq = self.down_sq = 0.0
+        self.window_sum = self.window_sum_sq = self.window_down_sq = 0.0
+        self.wins = self.active = 0
+        self.peak = -math.inf
+        self.max_drawdown = 0.0
+        self.underwater = self.drawdown_duration = 0
+
+    def update(self, value):
+        if self.last is None:
+            self.first = value
+        else:
+            r = value / self.last - 1
+            x = r - self.risk_free
+            down = min(x, 0.0) ** 2
+            self.count += 1
+            self.sum += x
+            self.sum_sq += x * x
+            self.down_sq += down
+            self.wins += r > 0
+            self.active += r != 0
+            if self.window:
+                self.recent.append((x, down))
+                self.window_sum += x
+                self.window_sum_sq += x * x
+                self.window_down_sq += down
+                if len(self.recent) > self.window:
+                    old, old_down = self.recent.popleft()
+                    self.window_sum -= old
+                    self.window_sum_sq -= old * old
+                    self.window_down_sq -= old_down
+        self.last = value
+        if value >= self.peak:
+            self.peak = value
+            self.underwater = 0
+        else:
+            self.underwater += 1
+            self.drawdown_duration = max(self.drawdown_duration, self.underwater)
+        self.max_drawdown = min(self.max_drawdown, value / self.peak - 1)
+
+    def _ratios(self, total, total_sq, down_sq, count):
+        if not count:
+            return 0.0, 0.0
+        mean = total / count
+        std = math.sqrt(max(total_sq / count - mean * mean, 0.0))
+        downside = math.sqrt(down_sq / count)
+        scale = math.sqrt(self.periods_per_year)
+        return (mean / std * scale if std else 0.0), (mean / downside * scale if downside else 0.0)
+
+    def metrics(self):
+        sharpe, sortino = self._ratios(self.sum, self.sum_sq, self.down_sq, self.count)
+        total_return = self.last / self.first - 1 if self.first else 0.0
+        annual_return = (1 + total_return) ** (self.periods_per_year / max(self.count, 1)) - 1 if total_return > -1 else -1.0
+        return {'Total Return': total_return, 'Annual Return': annual_return, 'Sharpe Ratio': sharpe,
+                'Sortino Ratio': sortino, 'Calmar Ratio': annual_return / abs(self.max_drawdown) if self.max_drawdown else 0.0,
+                'Max Drawdown': self.max_drawdown, 'Drawdown Duration': self.drawdown_duration,
+                'Win Rate': self.wins / self.active if self.active else 0.0}
+
+    def rolling(self):
+        sharpe, sortino = self._ratios(self.window_sum, self.window_sum_sq, self.window_down_sq, len(self.recent))
+        return {'Sharpe Ratio': sharpe, 'Sortino Ratio': sortino}
+
+    def state(self):
+        return dict(vars(self), recent=[list(item) for item in self.recent])
+
+    def load_state(self, state):
+        self.__dict__.update(state)
+        self.recent = collections.deque(tuple(item) for item in state['recent'])
+
+# Feeds the broker value of every bar into StreamingMetrics instead of keeping the whole equity curve
+class StreamingMetricsAnalyzer(bt.Analyzer):
+    params = (('periods_per_year', TRADING_DAYS), ('risk_free_rate', RISK_FREE_RATE))
+
+    def start(self):
+        self.stream = StreamingMetrics(self.p.periods_per_year, self.p.risk_free_rate)
+        self.bars = 0
+
+    def next(self):
+        self.stream.update(self.strategy.broker.getvalue())
+        self.bars += 1
+
+    def get_analysis(self):
+        return self.stream.metrics()
+
+# Out-of-core backtest over a BarStore: bars are streamed in chunks and backtrader keeps only the bars its indicators
+# need (exactbars=1), so memory stays flat however long the history is
+def run_bar_store(store, strategy_cls, params=None, initial_cash=100000, periods_per_year=TRADING_DAYS,
+                  chunk_size=100000, start=None, end=None):
+    cerebro = bt.Cerebro(preload=False, runonce=False, exactbars=1, stdstats=False)
+    cerebro.addstrategy(strategy_cls, **(params or {}))
+    cerebro.adddata(BarStoreFeed(store=store, chunk_size=chunk_size, start=start, end=end), name=store.meta['name'])
+    cerebro.broker.setcash(initial_cash)
+    cerebro.addanalyzer(StreamingMetricsAnalyzer, _name='metrics', periods_per_year=periods_per_year)
+    cerebro.addanalyzer(TradeList, _name='trades')
+    strat = cerebro.run()[0]
+    metrics = strat.analyzers.metrics.get_analysis()
+    metrics['Final Value'] = cerebro.broker.getvalue()
+    metrics['Bars'] = strat.analyzers.metrics.bars
+    metrics['Trades'] = len(strat.analyzers.trades.get_analysis())
+    return metrics
+
+# (epoch-ns dates, opens, closes) chunks of a replay source: a bar store directory, a CSV/Parquet file or a DataFrame
+def iter_bar_columns(source, chunk_rows=100000, tz=None):
+    if isinstance(source, pd.DataFrame):
+        dates = source.index if source.index.tz is not None else source.index.tz_localize(tz or 'UTC')
+        stamps = _to_epoch_ns(dates)
+        for row in range(0, len(source), chunk_rows):
+            rows = slice(row, row + chunk_rows)
+            yield stamps[rows], source['Open'].to_numpy(dtype=np.float64)[rows], source['Close'].to_numpy(dtype=np.float64)[rows]
+    elif os.path.isdir(source):
+        for index, columns in BarStore(source).chunks(chunk_rows):
+            yield index, columns['Open'], columns['Close']
+    else:
+        for bars in read_bar_chunks(source, chunk_rows, tz=tz):
+            dates = bars.index if bars.index.tz is not None else bars.index.tz_localize('UTC')
+            yield _to_epoch_ns(dates), bars['Open'].to_numpy(dtype=np.float64), bars['Close'].to_numpy(dtype=np.float64)
+
+# Local replay standing in for a live feed: publishes one source's bars onto the queue, paced so that `speed` seconds
+# of market time pass per wall-clock second (0 or None: as fast as the consumer keeps up). Chunks are read on a
+# thread so file I/O does not stall the other feeds. The last message has no date and carries any error.
+async def replay_bars(ticker, source, queue, speed=None, clock=None, chunk_rows=100000, tz=None):
+    loop = asyncio.get_running_loop()
+    clock = {} if clock is None else clock
+    try:
+        chunks = iter_bar_columns(source, chunk_rows, tz)
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                break
+            for stamp, open_, close in zip(*(column.tolist() for column in chunk)):
+                if speed:
+                    # Feeds share one clock: the first bar published by any of them maps to "now"
+                    origin_stamp, origin_time = clock.setdefault('origin', (stamp, loop.time()))
+                    delay = origin_time + (stamp - origin_stamp) / 1e9 / speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await queue.put((ticker, stamp, open_, close, time.perf_counter()))
+    except Exception as exc:
+        await queue.put((ticker, None, exc, None, None))
+        return
+    await queue.put((ticker, None, None, None, None))
+
+# Paper Trading: bars arrive one at a time and go through each strategy's stream_signals (O(1) indicator updates).
+# Orders fill at the next bar's open with the stop loss / take profit rules of the vectorized engine, so replaying
+# a history reproduces VectorizedBacktest bar for bar. Every ticker trades one unit on its own book (cash and value
+# as if it ran alone) and all fills are booked into one shared Portfolio.
+class PaperTrader:
+    def __init__(self, strategy_cls, initial_cash=100000, periods_per_year=TRADING_DAYS, record=False, **params):
+        self.strategy_cls = strategy_cls
+        self.initial_cash = initial_cash
+        self.periods_per_year = periods_per_year
+        self.params = resolve_strategy_params(strategy_cls, **params)
+        stop_loss = getattr(self.params, 'stop_loss', None)
+        take_profit = getattr(self.params, 'take_profit', None)
+        self.stop_loss = math.inf if stop_loss is None else stop_loss
+        self.take_profit = math.inf if take_profit is None else take_profit
+        # With record=True every book keeps its value, cash and position curves and its closed trades
+        self.record = record
+        self.portfolio = Portfolio(initial_cash, log_trades=False)
+        self.books = {}
+        self.ticks = 0
+        self.elapsed = 0.0
+        self.started = None
+        # Per bar: publish-to-processed latency (includes time queued behind earlier bars) and on_bar time alone
+        self.latencies = array.array('d')
+        self.processing = array.array('d')
+
+    # Book fields saved as they are in a checkpoint; the indicators and metrics save their own state, the curves
+    # are saved as arrays
+    BOOK_FIELDS = ['position', 'target', 'entry_price', 'entry_bar', 'locked', 'flows', 'cash', 'value', 'close', 'bars',
+                   'fills', 'trades']
+    CURVES = ['values', 'cash_curve', 'positions']
+
+    def _book(self, ticker):
+        signals = self.strategy_cls.stream_signals(self.params)
+        book = self.books[ticker] = {'signals': signals, 'step': signals.step, 'position': 0.0,
+                                     'target': None, 'entry_price': 0.0, 'entry_bar': 0, 'locked': False, 'flows': 0.0,
+                                     'cash': float(self.initial_cash), 'value': float(self.initial_cash), 'close': math.nan,
+                                     'bars': 0, 'fills': 0, 'metrics': StreamingMetrics(self.periods_per_year),
+                                     'values': array.array('d') if self.record else None,
+                                     'cash_curve': array.array('d') if self.record else None,
+                                     'positions': array.array('d') if self.record else None,
+                                     'trades': [] if self.record else None}
+        self.portfolio.add_ticker(ticker)
+        return book
+
+    def on_bar(self, ticker, date, open_, close):
+        book = self.books.get(ticker) or self._book(ticker)
+        # Fill the order placed on the previous bar at this bar's open
+        if book['target'] is not None:
+            change = book['target'] - book['position']
+            # Cash is the starting cash less the running sum of trade flows, exactly as VectorizedBacktest settles it
+            book['flows'] += change * open_
+            book['cash'] = self.initial_cash - book['flows']
+            if self.record and book['position'] == 1:
+                book['trades'].append({'entry_bar': book['entry_bar'], 'exit_bar': book['bars'],
+                                       'entry_price': book['entry_price'], 'pnl': open_ - book['entry_price']})
+            book['position'] = book['target']
+            book['target'] = None
+            book['entry_price'] = open_
+            book['entry_bar'] = book['bars']
+            book['fills'] += 1
+            self.portfolio.record_trades([date], [ticker], [open_], [change])
+        buy, sell = book['step'](close)
+        if book['locked']:
+            pass
+        elif book['position'] == 1:
+            entry_price = book['entry_price']
+            stopped = close >= entry_price * (1 + self.take_profit) or close <= entry_price * (1 - self.stop_loss)
+            exit_signal = sell and not buy
+            if stopped or exit_signal:
+                # A stop and a crossover exit on the same bar both sell, leaving the book short (as in the vectorized engine)
+                book['locked'] = stopped and exit_signal
+                book['target'] = -1.0 if book['locked'] else 0.0
+        elif buy:
+            book['target'] = 1.0
+        book['value'] = book['cash'] + book['position'] * close
+        book['close'] = close
+        book['bars'] += 1
+        book['metrics'].update(book['value'])
+        if self.record:
+            book['values'].append(book['value'])
+            book['cash_curve'].append(book['cash'])
+            book['positions'].append(book['position'])
+
+    async def run(self, sources, speed=None, chunk_rows=100000, tz=None, on_progress=None, progress_every=10000):
+        # `sources` maps tickers to replay sources; on_progress(trader) is called every `progress_every` bars and may
+        # raise to stop the replay
+        queue = asyncio.Queue(maxsize=1024)
+        clock = {}
+        feeds = [asyncio.create_task(replay_bars(ticker, source, queue, speed, clock, chunk_rows, tz))
+                 for ticker, source in sources.items()]
+        remaining = len(feeds)
+        self.started = time.perf_counter()
+        try:
+            while remaining:
+                ticker, date, open_, close, published = await queue.get()
+                if date is None:
+                    if open_ is not None:
+                        raise open_
+                    remaining -= 1
+                    continue
+                received = time.perf_counter()
+                self.on_bar(ticker, date, open_, close)
+                done = time.perf_counter()
+                self.latencies.append(done - published)
+                self.processing.append(done - received)
+                self.ticks += 1
+                if on_progress is not None and self.ticks % progress_every == 0:
+                    on_progress(self)
+        finally:
+            for feed in feeds:
+                feed.cancel()
+            await asyncio.gather(*feeds, return_exceptions=True)
+            self.elapsed += time.perf_counter() - self.started
+            self.started = None
+        return self.report()
+
+    def replay(self, sources, speed=None, chunk_rows=100000, tz=None, on_progress=None, progress_every=10000):
+        return asyncio.run(self.run(sources, speed, chunk_rows, tz, on_progress, progress_every))
+
+    def values(self, ticker):
+        return np.frombuffer(self.books[ticker]['values'], dtype=np.float64)
+
+    def result(self, ticker, dates):
+        # A recorded book as a BacktestResult over `dates` (one per bar it has processed)
+        book = self.books[ticker]
+        return BacktestResult(dates, np.frombuffer(book['positions'], dtype=np.float64).copy(),
+                              np.frombuffer(book['cash_curve'], dtype=np.float64).copy(),
+                              np.frombuffer(book['values'], dtype=np.float64).copy(), list(book['trades']), self.initial_cash)
+
+    def checkpoint(self):
+        # Explicit state of every book (indicator windows, pending order, position, cash, metrics) and of the shared
+        # portfolio: a JSON-serialisable dict, plus the recorded curves and the trade ledger as NumPy arrays
+        tickers = list(self.books)
+        books, arrays = [], {}
+        for i, ticker in enumerate(tickers):
+            book = self.books[ticker]
+            books.append(dict({field: book[field] for field in self.BOOK_FIELDS},
+                              signals=book['signals'].state(), metrics=book['metrics'].state()))
+            if self.record:
+                for curve in self.CURVES:
+                    arrays[f"book{i}_{curve}"] = np.frombuffer(book[curve], dtype=np.float64)
+        arrays.update({f"ledger_{name}": column for name, column in self.portfolio.ledger.columns().items()})
+        state = {'strategy': self.strategy_cls.__name__, 'params': vars(self.params), 'initial_cash': self.initial_cash,
+                 'periods_per_year': self.periods_per_year, 'record': self.record, 'ticks': self.ticks, 'tickers': tickers,
+                 'books': books, 'portfolio': {'cash': self.portfolio.cash, 'tickers': self.portfolio.tickers,
+                                               'positions': self.portfolio.positions.tolist()}}
+        return state, arrays
+
+    @classmethod
+    def restore(cls, strategy_cls, state, arrays):
+        # Raises ValueError when the state was saved for another strategy or another version of its indicators
+        if state['strategy'] != strategy_cls.__name__:
+            raise ValueError(f"State of {state['strategy']} cannot be restored into {strategy_cls.__name__}")
+        trader = cls(strategy_cls, state['initial_cash'], state['periods_per_year'], state['record'], **state['params'])
+        trader.ticks = state['ticks']
+        for i, (ticker, saved) in enumerate(zip(state['tickers'], state['books'])):
+            book = trader._book(ticker)
+            book.update({field: saved[field] for field in cls.BOOK_FIELDS})
+            book['signals'].load_state(saved['signals'])
+            book['metrics'].load_state(saved['metrics'])
+            if trader.record:
+                for curve in cls.CURVES:
+                    book[curve] = array.array('d', np.asarray(arrays[f"book{i}_{curve}"], dtype=np.float64).tobytes())
+        portfolio = trader.portfolio
+        portfolio.cash = state['portfolio']['cash']
+        for ticker in state['portfolio']['tickers']:
+            portfolio.add_ticker(ticker)
+        portfolio.positions = np.array(state['portfolio']['positions'], dtype=np.float64)
+        portfolio.ledger.extend(arrays['ledger_date'], arrays['ledger_ticker_id'], arrays['ledger_price'], arrays['ledger_amount'])
+        return trader
+
+    def stats(self):
+        elapsed = self.elapsed + (time.perf_counter() - self.started if self.started is not None else 0.0)
+        stats = {'ticks': self.ticks, 'seconds': elapsed, 'ticks_per_second': self.ticks / elapsed if elapsed else 0.0}
+        for name, samples in (('latency_us', self.latencies), ('processing_us', self.processing)):
+            samples = np.frombuffer(samples, dtype=np.float64) * 1e6
+            if len(samples):
+                p50, p99 = np.percentile(samples, [50, 99])
+                stats[name] = {'mean': float(samples.mean()), 'p50': float(p50), 'p99': float(p99), 'max': float(samples.max())}
+        return stats
+
+    def report(self):
+        prices = {ticker: book['close'] for ticker, book in self.books.items()}
+        tickers = {ticker: dict(book['metrics'].metrics(), **{'Final Value': book['value'], 'Bars': book['bars'],
+                                                               'Fills': book['fills'], 'Position': book['position']})
+                   for ticker, book in self.books.items()}
+        return {'strategy': self.strategy_cls.__name__, 'stats': self.stats(), 'cash': self.portfolio.cash,
+                'holdings': self.portfolio.holdings, 'portfolio_value': float(self.portfolio.portfolio_value(prices)),
+                'tickers': tickers}
+
+# Metrics used to rank sweep results (higher is better for all three)
+SWEEP_METRICS = ['Total Return', 'Sharpe Ratio', 'Max Drawdown']
+
+def compute_run_metrics(values, initial_cash, periods_per_year=TRADING_DAYS, risk_free_rate=RISK_FREE_RATE, traded_value=None):
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return {metric: 0.0 for metric in METRIC_NAMES}
+    batch = batch_metrics(values[:, None], periods_per_year, risk_free_rate, initial=initial_cash,
+                          traded_value=None if traded_value is None else np.asarray(traded_value)[:, None])
+    return {metric: float(column[0]) for metric, column in batch.items()}
+
+def traded_value(position, prices):
+    # Value traded on each bar from a position series (bars) or holdings matrix (bars x tickers)
+    position = np.asarray(position, dtype=np.float64)
+    traded = np.abs(np.diff(position, axis=0, prepend=0.0)) * np.nan_to_num(np.asarray(prices, dtype=np.float64))
+    return traded.sum(axis=1) if traded.ndim == 2 else traded
+
+# Bootstrap Robustness: resamples a run's per-bar (or per-trade) returns into `paths` alternative histories and
+# reports confidence intervals for total return, Sharpe ratio and max drawdown. Paths are drawn in batches of whole
+# arrays, with no Python loop per path. block_size > 1 resamples contiguous (circular) blocks so autocorrelation
+# survives; block_size=0 picks n ** (1/3).
+BOOTSTRAP_METRICS = ['Total Return', 'Sharpe Ratio', 'Max Drawdown']
+# Working memory of one batch of paths (indices, the two resampled blocks and the running peaks). Batches that fit
+# in a core's L2 cache run faster than one large block, and memory stays flat however many paths are drawn.
+BOOTSTRAP_BATCH_BYTES = 2 * 2 ** 20
+
+def _bootstrap_paths(excess, growth, peaks, scale):
+    # Metrics of each row of resampled excess returns and log growth factors (the path starts at a value of 1);
+    # growth and peaks are overwritten. Sums instead of mean()/std(): one pass each over the (paths x bars) block
+    mean = excess.sum(axis=1) / excess.shape[1]
+    std = np.sqrt(np.maximum(np.einsum('ij,ij->i', excess, excess) / excess.shape[1] - mean ** 2, 0.0))
+    np.cumsum(growth, axis=1, out=growth)
+    np.maximum.accumulate(growth, axis=1, out=peaks)
+    np.maximum(peaks, 0.0, out=peaks)
+    np.subtract(growth, peaks, out=peaks)
+    return {'Total Return': np.expm1(growth[:, -1]), 'Sharpe Ratio': _safe_ratio(mean, std) * scale,
+            'Max Drawdown': np.expm1(peaks.min(axis=1))}
+
+def bootstrap_metrics(returns, paths=10000, block_size=None, confidence=0.95, periods_per_year=TRADING_DAYS,
+                      risk_free_rate=RISK_FREE_RATE, seed=None, batch_bytes=BOOTSTRAP_BATCH_BYTES):
+    returns = np.asarray(returns, dtype=np.float64)
+    returns = returns[np.isfinite(returns)]
+    n = len(returns)
+    if n < 2:
+        raise ValueError("At least two returns are needed for a bootstrap")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    block_size = min(max(1, round(n ** (1 / 3))) if block_size == 0 else block_size or 1, n)
+    excess = returns - risk_free_rate / periods_per_year
+    growth = np.log1p(np.maximum(returns, -1.0))
+    scale = np.sqrt(periods_per_year)
+    observed = {name: float(values[0]) for name, values in
+                _bootstrap_paths(excess[None, :], growth[None, :].copy(), np.empty((1, n)), scale).items()}
+
+    # Blocks that start near the end wrap around to the start: the series is extended instead of taking a modulo
+    excess = np.concatenate([excess, excess[:block_size - 1]])
+    growth = np.concatenate([growth, growth[:block_size - 1]])
+    blocks = -(-n // block_size)
+    offsets = np.arange(block_size)
+    rng = np.random.default_rng(seed)
+    samples = {name: np.empty(paths) for name in BOOTSTRAP_METRICS}
+    # The buffers are reused by every batch; the random draws do not depend on the batch size
+    batch = max(1, min(paths, batch_bytes // (4 * 8 * n)))
+    sampled_excess, sampled_growth, peaks = np.empty((batch, n)), np.empty((batch, n)), np.empty((batch, n))
+    for lo in range(0, paths, batch):
+        count = min(batch, paths - lo)
+        index = rng.integers(0, n, (count, blocks))
+        if block_size > 1:
+            index = (index[:, :, None] + offsets).reshape(count, -1)[:, :n]
+        np.take(excess, index, out=sampled_excess[:count])
+        np.take(growth, index, out=sampled_growth[:count])
+        for name, values in _bootstrap_paths(sampled_excess[:count], sampled_growth[:count], peaks[:count], scale).items():
+            samples[name][lo:lo + count] = values
+
+    tail = (1 - confidence) / 2
+    report = {'paths': paths, 'returns': n, 'block_size': block_size, 'confidence': confidence}
+    for name, values in samples.items():
+        lower, median, upper = np.quantile(values, [tail, 0.5, 1 - tail])
+        report[name] = {'observed': observed[name], 'mean': float(values.mean()), 'median': float(median),
+                        'lower': float(lower), 'upper': float(upper)}
+    report['Probability of Loss'] = float((samples['Total Return'] < 0).mean())
+    return report
+
+# Per-trade returns: each closed trade's P&L relative to the account value on the bar it was opened
+def trade_returns(result):
+    value = np.asarray(result.value, dtype=np.float64)
+    return np.array([trade['pnl'] / value[min(trade['entry_bar'], len(value) - 1)] for trade in result.trades])
+
+def bootstrap_result(result, periods_per_year=TRADING_DAYS, on='returns', **options):
+    if on == 'trades':
+        returns = trade_returns(result)
+        # Trades per year replaces bars per year when annualising the Sharpe ratio
+        periods_per_year = len(returns) * periods_per_year / max(len(result.value) - 1, 1)
+    else:
+        value = np.asarray(result.value, dtype=np.float64)
+        returns = value[1:] / value[:-1] - 1
+    report = bootstrap_metrics(returns, periods_per_year=periods_per_year, **options)
+    report['on'] = on
+    return report
+
+# Metrics stored with every run: the batched set plus turnover from the recorded positions
+def backtest_metrics(result, data, initial_cash, periods_per_year=TRADING_DAYS):
+    opens = data['Open'].to_numpy(dtype=np.float64)[:len(result.position)]
+    metrics = compute_run_metrics(result.value, initial_cash, periods_per_year, traded_value=traded_value(result.position, opens))
+    metrics.update({'Final Value': result.final_value, 'Bars': len(data), 'Trades': len(result.trades)})
+    return metrics
+
+# Default location of the results store
+RESULTS_DIR = os.path.join(os.path.expanduser('~'), '.flint_steel', 'results')
+TRADE_FIELDS = ['entry_bar', 'exit_bar', 'entry_price', 'pnl']
+
+# Results Store: finished runs keyed by a hash of the dataset, the strategy class (including its source) and every
+# setting that changes the result. Curves and trades live in one .npz per run; an SQLite index holds the run settings
+# and metrics so past runs can be queried by ticker, strategy or metric.
+class ResultStore:
+    # Bump when the engines change in a way that alters results, so stale runs are not reused
+    VERSION = 1
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (key TEXT PRIMARY KEY, ticker TEXT, strategy TEXT, params TEXT, engine TEXT,
+                                         cash REAL, start TEXT, end TEXT, interval TEXT, created TEXT);
+        CREATE TABLE IF NOT EXISTS metrics (key TEXT, name TEXT, value REAL, PRIMARY KEY (key, name));
+        CREATE INDEX IF NOT EXISTS runs_ticker ON runs (ticker);
+        CREATE INDEX IF NOT EXISTS runs_strategy ON runs (strategy);
+        CREATE INDEX IF NOT EXISTS metrics_value ON metrics (name, value);
+    """
+
+    def __init__(self, path=RESULTS_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.db_file = os.path.join(path, 'index.sqlite')
+        with self._db() as db:
+            db.executescript(self.SCHEMA)
+
+    @contextlib.contextmanager
+    def _db(self):
+        # One connection per call, so the store can be used from worker threads
+        import sqlite3
+        db = sqlite3.connect(self.db_file, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.npz")
+
+    @staticmethod
+    def dataset_fingerprint(data):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(getattr(data.index, 'tz', None)).encode())
+        digest.update(np.ascontiguousarray(data.index.to_numpy(dtype='datetime64[ns]')).view(np.uint8))
+        for col in OHLCV_COLUMNS:
+            if col in data.columns:
+                digest.update(col.encode())
+                digest.update(np.ascontiguousarray(data[col].to_numpy(dtype=np.float64)).view(np.uint8))
+        return digest.hexdigest()
+
+    # Fingerprints by class: inspect.getsource parses the whole module, which costs more than most vectorized runs
+    _strategy_fingerprints = {}
+
+    @classmethod
+    def strategy_fingerprint(cls, strategy_cls):
+        # Editing a strategy's code gives it a new fingerprint, so its stored runs are not reused
+        fingerprint = cls._strategy_fingerprints.get(strategy_cls)
+        if fingerprint is None:
+            import inspect
+            try:
+                source = inspect.getsource(strategy_cls)
+            except (OSError, TypeError):
+                source = ''
+            fingerprint = cls._strategy_fingerprints[strategy_cls] = \
+                f"{strategy_cls.__module__}.{strategy_cls.__qualname__}:{hashlib.blake2b(source.encode(), digest_size=16).hexdigest()}"
+        return fingerprint
+
+    def key(self, data, strategy_cls, params, initial_cash, engine, periods_per_year=TRADING_DAYS):
+        settings = {'version': self.VERSION, 'data': self.dataset_fingerprint(data),
+                    'strategy': self.strategy_fingerprint(strategy_cls),
+                    'params': vars(resolve_strategy_params(strategy_cls, **params)),
+                    'cash': float(initial_cash), 'engine': engine, 'periods_per_year': float(periods_per_year)}
+        return hashlib.blake2b(json.dumps(settings, sort_keys=True, default=str).encode(), digest_size=20).hexdigest()
+
+    def metrics(self, key):
+        with self._db() as db:
+            rows = db.execute("SELECT name, value FROM metrics WHERE key = ? ORDER BY rowid", (key,)).fetchall()
+        if not rows or not os.path.exists(self._file(key)):
+            return None
+        return {name: int(value) if name in ('Bars', 'Trades') else value for name, value in rows}
+
+    def load(self, key):
+        # The stored BacktestResult and metrics, or None when the run has not been stored
+        metrics = self.metrics(key)
+        if metrics is None:
+            return None
+        with np.load(self._file(key)) as stored:
+            tz = str(stored['tz'])
+            dates = pd.to_datetime(stored['dates'], utc=True)
+            dates = pd.DatetimeIndex(dates.tz_convert(tz) if tz else dates.tz_localize(None), name='Date')
+            trades = [dict(zip(TRADE_FIELDS, (int(entry), int(exit_), float(price), float(pnl))))
+                      for entry, exit_, price, pnl in zip(*(stored[f"trade_{field}"] for field in TRADE_FIELDS))]
+            result = BacktestResult(dates, stored['position'], stored['cash'], stored['value'], trades, float(stored['initial_cash']))
+        logger.info(f"Loaded stored run {key}")
+        return result, metrics
+
+    def save(self, key, result, metrics, ticker=None, strategy=None, params=None, engine=None, start=None, end=None, interval=None):
+        dates = pd.DatetimeIndex(result.dates)
+        trades = {f"trade_{field}": np.array([trade[field] for trade in result.trades],
+                                             dtype=np.int64 if field.endswith('_bar') else np.float64)
+                  for field in TRADE_FIELDS}
+        tmp_file = os.path.join(self.path, f"{key}.tmp.npz")
+        np.savez(tmp_file, dates=dates.to_numpy(dtype='datetime64[ns]').view(np.int64), tz=str(dates.tz or ''),
+                 position=np.asarray(result.position, dtype=np.float64), cash=np.asarray(result.cash, dtype=np.float64),
+                 value=np.asarray(result.value, dtype=np.float64), initial_cash=result.initial_cash, **trades)
+        os.replace(tmp_file, self._file(key))
+        with self._db() as db:
+            db.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                       (key, ticker, strategy, json.dumps(params or {}, sort_keys=True, default=str), engine,
+                        result.initial_cash, start, end, interval, datetime.datetime.now().isoformat(timespec='seconds')))
+            db.execute("DELETE FROM metrics WHERE key = ?", (key,))
+            db.executemany("INSERT INTO metrics VALUES (?, ?, ?)", [(key, name, float(value)) for name, value in metrics.items()])
+
+    def query(self, ticker=None, strategy=None, metric=None, minimum=None, maximum=None, limit=100):
+        # Stored runs matching the filters, best first by `metric` when one is given (newest first otherwise)
+        sql = "SELECT runs.*, metrics.value FROM runs LEFT JOIN metrics ON metrics.key = runs.key AND metrics.name = ?"
+        clauses, args = [], [metric]
+        if ticker:
+            clauses.append("runs.ticker = ?")
+            args.append(ticker)
+        if strategy:
+            clauses.append("runs.strategy = ?")
+            args.append(strategy)
+        if metric:
+            clauses.append("metrics.value IS NOT NULL")
+        if minimum is not None:
+            clauses.append("metrics.value >= ?")
+            args.append(minimum)
+        if maximum is not None:
+            clauses.append("metrics.value <= ?")
+            args.append(maximum)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY metrics.value DESC LIMIT ?" if metric else " ORDER BY runs.created DESC LIMIT ?"
+        args.append(limit)
+        with self._db() as db:
+            columns = [column[1] for column in db.execute("PRAGMA table_info(runs)")]
+            rows = db.execute(sql, args).fetchall()
+            runs = [dict(zip(columns, row[:-1])) for row in rows]
+            for run in runs:
+                run['params'] = json.loads(run['params'])
+                run['metrics'] = {name: int(value) if name in ('Bars', 'Trades') else value
+                                  for name, value in db.execute("SELECT name, value FROM metrics WHERE key = ? ORDER BY rowid", (run['key'],))}
+        return runs
+
+# Default location of backtest checkpoints
+CHECKPOINT_DIR = os.path.join(os.path.expanduser('~'), '.flint_steel', 'checkpoints')
+
+# Checkpoint Store: the streaming engine's state at the end of a run (indicator windows, pending order, position,
+# cash and the curves so far), one .npz per ticker, strategy, parameters, cash and start date. The state is explicit
+# JSON next to plain arrays, read back without pickle. The end date is left out of the key, so a run over a later end
+# date finds the checkpoint of the shorter one.
+class CheckpointStore:
+    # Bump when the saved state changes shape; checkpoints of another version are discarded
+    VERSION = 2
+
+    def __init__(self, path=CHECKPOINT_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.npz")
+
+    def key(self, ticker, strategy_cls, params, initial_cash, start, interval='1d', periods_per_year=TRADING_DAYS):
+        settings = {'ticker': ticker, 'strategy': ResultStore.strategy_fingerprint(strategy_cls),
+                    'params': vars(resolve_strategy_params(strategy_cls, **params)), 'cash': float(initial_cash),
+                    'start': str(start), 'interval': interval, 'periods_per_year': float(periods_per_year)}
+        return hashlib.blake2b(json.dumps(settings, sort_keys=True, default=str).encode(), digest_size=20).hexdigest()
+
+    def load(self, key):
+        # (state, arrays), or None when there is no checkpoint or it cannot be used; unusable files are removed
+        try:
+            with np.load(self._file(key), allow_pickle=False) as saved:
+                state = json.loads(str(saved['state']))
+                if state.get('version') != self.VERSION:
+                    raise ValueError(f"version {state.get('version')}, expected {self.VERSION}")
+                return state, {name: saved[name] for name in saved.files if name != 'state'}
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            logger.warning(f"Discarding checkpoint {key}: {exc}")
+            self.discard(key)
+            return None
+
+    def save(self, key, state, arrays):
+        tmp_file = self._file(key) + '.tmp'
+        with open(tmp_file, 'wb') as file:
+            np.savez(file, state=np.array(json.dumps(dict(state, version=self.VERSION))), **arrays)
+        os.replace(tmp_file, self._file(key))
+
+    def discard(self, key):
+        try:
+            os.remove(self._file(key))
+        except FileNotFoundError:
+            pass
+
+# Checkpointed backtest on the streaming engine, which steps bar by bar like cerebro and reproduces its default broker
+# (fixed 1 unit stake, fills at the next open), so it stands in for Backtrader runs of strategies with stream_signals.
+# The state at the last bar is saved; when the checkpoint's bars are still the first bars of `data`, unchanged, the
+# next run restores it and processes only the new bars. Returns the BacktestResult and the number of bars taken from
+# the checkpoint.
+def run_checkpointed(data, strategy_cls, params=None, initial_cash=100000, periods_per_year=TRADING_DAYS, store=None,
+                     ticker='data', start=None, interval='1d', timer=None, job=None):
+    params = params or {}
+    if not len(data):
+        return BacktestResult(data.index, np.zeros(0), np.zeros(0), np.zeros(0), [], initial_cash), 0
+    dates = data.index if data.index.tz is not None else data.index.tz_localize('UTC')
+    stamps = _to_epoch_ns(dates)
+    key = store.key(ticker, strategy_cls, params, initial_cash, start or data.index[0], interval, periods_per_year) \
+        if store is not None else None
+    trader, done = None, 0
+    with timed(timer, 'checkpoint'):
+        checkpoint = store.load(key) if store is not None else None
+        if checkpoint is not None:
+            state, arrays = checkpoint
+            done = state['bars']
+            if 0 < done <= len(data) and int(stamps[done - 1]) == state['last'] \
+                    and ResultStore.dataset_fingerprint(data.iloc[:done]) == state['data']:
+                try:
+                    trader = PaperTrader.restore(strategy_cls, state['trader'], arrays)
+                    logger.info(f"Resuming {strategy_cls.__name__} on {ticker} after bar {done}: {len(data) - done} new bars")
+                except (KeyError, TypeError, ValueError) as exc:
+                    logger.warning(f"Discarding checkpoint for {ticker}: {exc}")
+                    store.discard(key)
+            else:
+                logger.info(f"Checkpoint for {ticker} does not match the bars fetched; replaying the full history")
+            if trader is None:
+                done = 0
+    if trader is None:
+        trader = PaperTrader(strategy_cls, initial_cash, periods_per_year, record=True, **params)
+    with timed(timer, 'run'):
+        opens = data['Open'].to_numpy(dtype=np.float64)
+        closes = data['Close'].to_numpy(dtype=np.float64)
+        for bar, stamp, open_, close in zip(range(done, len(data)), stamps[done:].tolist(), opens[done:].tolist(),
+                                            closes[done:].tolist()):
+            trader.on_bar(ticker, stamp, open_, close)
+            if job is not None and bar % 1000 == 0:
+                job.check_cancelled()
+                job.progress(bar / len(data), f"Bar {bar}/{len(data)}")
+    if store is not None and done < len(data):
+        with timed(timer, 'checkpoint'):
+            trader_state, arrays = trader.checkpoint()
+            store.save(key, {'bars': len(data), 'last': int(stamps[-1]), 'data': ResultStore.dataset_fingerprint(data),
+                             'trader': trader_state}, arrays)
+    return trader.result(ticker, data.index), done
+
+# Parses a hyperparameter range typed into the GUI: "10:50:10" (inclusive), "10,20,30" or a single value
+def parse_param_range(text, cast):
+    text = text.strip()
+    if ':' in text:
+        parts = [cast(part) for part in text.split(':')]
+        start, stop, step = parts[0], parts[1], parts[2] if len(parts) > 2 else cast(1)
+        if step <= 0:
+            raise ValueError(f"Step must be positive in range '{text}'")
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return [cast(round(start + i * step, 10)) for i in range(max(count, 0))]
+    return [cast(part) for part in text.split(',') if part.strip()]
+
+def expand_param_grid(param_ranges):
+    names = list(param_ranges)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(param_ranges[name] for name in names))]
+
+def _open_shared_memory(name):
+    # Attaching processes must not unlink the block on exit (the creator does), so tracking is off where supported
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+# Shared Memory Price Data: one copy of the OHLCV arrays that every sweep worker maps without pickling
+class SharedPriceData:
+    def __init__(self, data):
+        self.columns = [col for col in OHLCV_COLUMNS if col in data.columns]
+        self.length = len(data)
+        index = data.index
+        self.tz = str(index.tz) if index.tz is not None else None
+        self.index_name = index.name
+        self.shm = shared_memory.SharedMemory(create=True, size=max(8 * self.length * (1 + len(self.columns)), 1))
+        dates, block = self._views(self.shm, self.length, len(self.columns))
+        dates[:] = _to_epoch_ns(index if index.tz is not None else index.tz_localize('UTC'))
+        block[:] = data[self.columns].to_numpy(dtype=np.float64).T
+
+    @staticmethod
+    def _views(shm, length, width):
+        dates = np.ndarray((length,), dtype=np.int64, buffer=shm.buf)
+        block = np.ndarray((width, length), dtype=np.float64, buffer=shm.buf, offset=8 * length)
+        return dates, block
+
+    @property
+    def spec(self):
+        return {'name': self.shm.name, 'length': self.length, 'columns': self.columns,
+                'tz': self.tz, 'index_name': self.index_name}
+
+    @staticmethod
+    def attach(spec):
+        shm = _open_shared_memory(spec['name'])
+        dates, block = SharedPriceData._views(shm, spec['length'], len(spec['columns']))
+        index = pd.to_datetime(dates, utc=True)
+        index = index.tz_convert(spec['tz']) if spec['tz'] else index.tz_localize(None)
+        data = pd.DataFrame(block.T, columns=spec['columns'], index=pd.DatetimeIndex(index, name=spec['index_name']), copy=False)
+        return shm, data
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+# Per-process state of a sweep worker, set once by the pool initializer
+_SWEEP_WORKER = {}
+
+def _init_sweep_worker(spec, strategy_cls, initial_cash, engine, indicator_settings):
+    shm, data = SharedPriceData.attach(spec)
+    # Every configuration in this process shares one indicator cache (and the spill directory, if any)
+    indicator_cache.max_bytes, indicator_cache.spill_dir, indicator_cache.enabled = indicator_settings
+    _SWEEP_WORKER.update(shm=shm, data=data, strategy_cls=strategy_cls, initial_cash=initial_cash, engine=engine)
+
+def _run_sweep_chunk(chunk):
+    # Equity curves of a chunk of configurations are scored together in one batch_metrics call
+    state = _SWEEP_WORKER
+    done, curves, failed = [], [], []
+    for params in chunk:
+        try:
+            curves.append(run_strategy_values(state['data'], state['strategy_cls'], params, state['initial_cash'], state['engine']))
+            done.append(params)
+        except Exception as exc:
+            failed.append((params, None, f"{type(exc).__name__}: {exc}"))
+    if not done:
+        return failed
+    batch = batch_metrics(np.column_stack(curves), initial=state['initial_cash'])
+    return [(params, {metric: float(column[i]) for metric, column in batch.items()}, None)
+            for i, params in enumerate(done)] + failed
+
+# Parallel Hyperparameter Sweep over a grid of parameter values
+class ParameterSweep:
+    def __init__(self, strategy_cls, param_ranges, initial_cash=100000, engine='vectorized', processes=None):
+        self.strategy_cls = strategy_cls
+        self.param_ranges = param_ranges
+        self.initial_cash = initial_cash
+        self.engine = engine
+        self.processes = processes or os.cpu_count() or 1
+        resolve_strategy_params(strategy_cls, **{name: values[0] for name, values in param_ranges.items() if values})
+
+    def run(self, data):
+        # Yields (params, metrics) in completion order; failed configurations are logged and skipped
+        combos = expand_param_grid(self.param_ranges)
+        logger.info(f"Sweeping {len(combos)} {self.strategy_cls.__name__} configurations on {self.processes} processes")
+        shared = SharedPriceData(data)
+        try:
+            with multiprocessing.Pool(self.processes, initializer=_init_sweep_worker,
+                                      initargs=(shared.spec, self.strategy_cls, self.initial_cash, self.engine,
+                                                (indicator_cache.max_bytes, indicator_cache.spill_dir, indicator_cache.enabled))) as pool:
+                size = max(1, min(64, len(combos) // (self.processes * 8)))
+                chunks = [combos[i:i + size] for i in range(0, len(combos), size)]
+                for results in pool.imap_unordered(_run_sweep_chunk, chunks):
+                    for params, metrics, error in results:
+                        if error:
+                            logger.warning(f"Sweep run {params} failed: {error}")
+                            continue
+                        yield params, metrics
+        finally:
+            shared.close()
+
+    @staticmethod
+    def rank(results, metric='Total Return'):
+        return sorted(results, key=lambda result: result[1][metric], reverse=True)
+
+# Surrogate-Guided Optimizer: searches the same grid as ParameterSweep within a fixed number of backtests. A random
+# initial sample is evaluated, then a random forest fitted to the metric proposes each next batch, scored by the
+# mean plus the spread of its trees' predictions so uncertain regions of the grid still get explored.
+class SurrogateOptimizer:
+    # Grids larger than this are scored on a fresh random subset of unevaluated configurations each round
+    MAX_CANDIDATES = 20000
+
+    def __init__(self, strategy_cls, param_ranges, initial_cash=100000, metric='Sharpe Ratio', budget=None,
+                 initial_samples=None, batch_size=None, exploration=1.0, engine='vectorized', processes=None, seed=None):
+        self.strategy_cls = strategy_cls
+        self.param_names = list(param_ranges)
+        self.param_values = [list(param_ranges[name]) for name in self.param_names]
+        self.shape = tuple(len(values) for values in self.param_values)
+        self.grid_size = math.prod(self.shape)
+        self.initial_cash = initial_cash
+        self.metric = metric
+        self.budget = min(budget or max(10, math.ceil(self.grid_size / 10)), self.grid_size)
+        self.initial_samples = min(initial_samples or max(len(self.param_names) + 2, self.budget // 4), self.budget)
+        self.processes = processes or os.cpu_count() or 1
+        self.batch_size = batch_size or max(4, self.processes)
+        self.exploration = exploration
+        self.engine = engine
+        self.rng = np.random.default_rng(seed)
+        resolve_strategy_params(strategy_cls, **{name: values[0] for name, values in param_ranges.items() if values})
+
+    def _params(self, flat_index):
+        coords = np.unravel_index(flat_index, self.shape)
+        return {name: values[int(i)] for name, values, i in zip(self.param_names, self.param_values, coords)}
+
+    def _features(self, flat_indices):
+        coords = np.unravel_index(np.asarray(flat_indices), self.shape)
+        return np.column_stack([np.asarray(values, dtype=np.float64)[i] for values, i in zip(self.param_values, coords)])
+
+    def _unevaluated(self, evaluated):
+        taken = np.fromiter(evaluated, dtype=np.int64, count=len(evaluated))
+        if self.grid_size - len(evaluated) <= self.MAX_CANDIDATES:
+            return np.setdiff1d(np.arange(self.grid_size), taken)
+        return np.setdiff1d(self.rng.integers(0, self.grid_size, self.MAX_CANDIDATES), taken)
+
+    def propose(self, evaluated, scores, count):
+        # Flat grid indices of the next configurations to backtest
+        from sklearn.ensemble import RandomForestRegressor
+        candidates = self._unevaluated(evaluated)
+        if len(candidates) <= count:
+            return candidates
+        observed = np.fromiter(evaluated, dtype=np.int64)
+        y = np.array([scores[i] for i in observed])
+        finite = np.isfinite(y)
+        if finite.sum() < 2:
+            return self.rng.choice(candidates, count, replace=False)
+        # Failed or undefined runs are scored as the worst observed value so the forest steers away from them
+        y[~finite] = y[finite].min()
+        forest = RandomForestRegressor(n_estimators=100, min_samples_leaf=2, random_state=int(self.rng.integers(2**31)), n_jobs=1)
+        forest.fit(self._features(observed), y)
+        features = self._features(candidates)
+        per_tree = np.stack([tree.predict(features) for tree in forest.estimators_])
+        acquisition = per_tree.mean(axis=0) + self.exploration * per_tree.std(axis=0)
+        return candidates[np.argsort(-acquisition)[:count]]
+
+    def run(self, data):
+        # Yields (params, metrics) for every evaluated configuration; at most `budget` backtests are run
+        logger.info(f"Optimizing {self.strategy_cls.__name__} by {self.metric}: {self.budget} of {self.grid_size} "
+                    f"configurations on {self.processes} processes")
+        evaluated, scores = set(), {}
+        self.history = []
+        shared = SharedPriceData(data)
+        try:
+            with multiprocessing.Pool(self.processes, initializer=_init_sweep_worker,
+                                      initargs=(shared.spec, self.strategy_cls, self.initial_cash, self.engine,
+                                                (indicator_cache.max_bytes, indicator_cache.spill_dir, indicator_cache.enabled))) as pool:
+                candidates = self._unevaluated(evaluated)
+                batch = self.rng.choice(candidates, min(self.initial_samples, len(candidates)), replace=False)
+                while len(batch):
+                    lookup = {}
+                    for flat_index in batch:
+                        lookup[tuple(sorted(self._params(flat_index).items()))] = int(flat_index)
+                        evaluated.add(int(flat_index))
+                        scores[int(flat_index)] = np.nan
+                    chunks = [[self._params(i) for i in part] for part in np.array_split(batch, min(self.processes, len(batch)))]
+                    for results in pool.imap_unordered(_run_sweep_chunk, chunks):
+                        for params, metrics, error in results:
+                            if error:
+                                logger.warning(f"Optimizer run {params} failed: {error}")
+                                continue
+                            scores[lookup[tuple(sorted(params.items()))]] = metrics[self.metric]
+                            self.history.append((params, metrics))
+                            yield params, metrics
+                    remaining = self.budget - len(evaluated)
+                    batch = self.propose(evaluated, scores, min(self.batch_size, remaining)) if remaining > 0 else []
+        finally:
+            shared.close()
+
+    def best(self):
+        return ParameterSweep.rank(self.history, self.metric)[0] if self.history else None
+
+# Shared Memory Price Panel: a whole PricePanel (dates x tickers per field) in one block that screening workers map
+class SharedPricePanel:
+    def __init__(self, panel):
+        self.columns = list(panel.fields)
+        self.tickers = list(panel.tickers)
+        self.length = len(panel.dates)
+        dates = panel.dates
+        self.tz = str(dates.tz) if dates.tz is not None else None
+        self.index_name = dates.name
+        self.shm = shared_memory.SharedMemory(create=True, size=max(8 * self.length * (1 + len(self.columns) * len(self.tickers)), 1))
+        stamps, block = self._views(self.shm, self.length, len(self.columns), len(self.tickers))
+        stamps[:] = _to_epoch_ns(dates if dates.tz is not None else dates.tz_localize('UTC'))
+        for i, col in enumerate(self.columns):
+            block[i] = panel[col]
+
+    @staticmethod
+    def _views(shm, length, width, count):
+        stamps = np.ndarray((length,), dtype=np.int64, buffer=shm.buf)
+        block = np.ndarray((width, length, count), dtype=np.float64, buffer=shm.buf, offset=8 * length)
+        return stamps, block
+
+    @property
+    def spec(self):
+        return {'name': self.shm.name, 'length': self.length, 'columns': self.columns, 'tickers': self.tickers,
+                'tz': self.tz, 'index_name': self.index_name}
+
+    @staticmethod
+    def attach(spec):
+        shm = _open_shared_memory(spec['name'])
+        stamps, block = SharedPricePanel._views(shm, spec['length'], len(spec['columns']), len(spec['tickers']))
+        dates = pd.to_datetime(stamps, utc=True)
+        dates = dates.tz_convert(spec['tz']) if spec['tz'] else dates.tz_localize(None)
+        return shm, PricePanel(pd.DatetimeIndex(dates, name=spec['index_name']), spec['tickers'], dict(zip(spec['columns'], block)))
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+# Per-process state of a screening worker, set once by the pool initializer
+_SCREEN_WORKER = {}
+
+def _init_screen_worker(spec, strategy_cls, params, initial_cash, engine, periods_per_year):
+    shm, panel = SharedPricePanel.attach(spec)
+    _SCREEN_WORKER.update(shm=shm, panel=panel, strategy_cls=strategy_cls, params=params, initial_cash=initial_cash,
+                          engine=engine, periods_per_year=periods_per_year)
+
+def _run_screen_chunk(tickers):
+    state = _SCREEN_WORKER
+    results = []
+    for ticker in tickers:
+        try:
+            data = state['panel'].to_frame(ticker)
+            result = run_strategy(data, state['strategy_cls'], state['params'], state['initial_cash'], state['engine'])
+            results.append((ticker, backtest_metrics(result, data, state['initial_cash'], state['periods_per_year']), None))
+        except Exception as exc:
+            results.append((ticker, None, f"{type(exc).__name__}: {exc}"))
+    return results
+
+# Universe Screening: one fixed strategy configuration run independently on every ticker of a universe, spread over a
+# process pool. Prices are bulk-loaded once into a PricePanel that the workers share instead of each fetching its own.
+class UniverseScreen:
+    def __init__(self, strategy_cls, params=None, initial_cash=100000, engine='vectorized', periods_per_year=TRADING_DAYS,
+                 processes=None):
+        self.strategy_cls = strategy_cls
+        self.params = params or {}
+        self.initial_cash = initial_cash
+        self.engine = engine
+        self.periods_per_year = periods_per_year
+        self.processes = processes or os.cpu_count() or 1
+        self.failed = {}
+        resolve_strategy_params(strategy_cls, **self.params)
+
+    def run(self, panel):
+        # Yields (ticker, metrics) in completion order; failed tickers are logged and kept in `failed`
+        self.failed = {}
+        tickers = list(panel.tickers)
+        logger.info(f"Screening {self.strategy_cls.__name__} on {len(tickers)} tickers with {self.processes} processes")
+        shared = SharedPricePanel(panel)
+        try:
+            with multiprocessing.Pool(min(self.processes, len(tickers)), initializer=_init_screen_worker,
+                                      initargs=(shared.spec, self.strategy_cls, self.params, self.initial_cash, self.engine,
+                                                self.periods_per_year)) as pool:
+                # Small chunks so the ranking fills in steadily rather than in a few large jumps
+                size = max(1, min(16, len(tickers) // (self.processes * 8)))
+                chunks = [tickers[i:i + size] for i in range(0, len(tickers), size)]
+                for results in pool.imap_unordered(_run_screen_chunk, chunks):
+                    for ticker, metrics, error in results:
+                        if error:
+                            logger.warning(f"Screening {ticker} failed: {error}")
+                            self.failed[ticker] = error
+                            continue
+                        yield ticker, metrics
+        finally:
+            shared.close()
+
+    @staticmethod
+    def rank(results, metric='Sharpe Ratio'):
+        # Tickers whose metric is undefined (e.g. a flat equity curve) go last
+        return sorted(results, key=lambda result: screen_score(result[1], metric), reverse=True)
+
+def screen_score(metrics, metric):
+    value = metrics[metric]
+    return value if np.isfinite(value) else -np.inf
+
+SCREEN_COLUMNS = SWEEP_METRICS + ['Trades']
+PERCENT_METRICS = {'Total Return', 'Annual Return', 'Volatility', 'Max Drawdown', 'Win Rate'}
+
+def format_screen_table(ranked, metric, limit=None):
+    columns = SCREEN_COLUMNS if metric in SCREEN_COLUMNS else [metric] + SCREEN_COLUMNS
+    lines = [f"{'#':>4}  {'Ticker':<10}" + ''.join(f"{name:>15}" for name in columns)]
+    for position, (ticker, metrics) in enumerate(ranked[:limit], 1):
+        cells = []
+        for name in columns:
+            value = metrics[name]
+            cells.append(f"{value:>15d}" if isinstance(value, int) else f"{value:>15.2%}" if name in PERCENT_METRICS else f"{value:>15.2f}")
+        lines.append(f"{position:>4}  {ticker:<10}" + ''.join(cells))
+    return '\n'.join(lines)
+
+# Custom Strategy Scripts: a script defines a bt.Strategy subclass (or names one in STRATEGY) and is run in a pool of
+# warm worker processes, never in the GUI process. Workers keep each script's compiled class keyed by its hash,
+# read prices from shared memory, and run under per-run CPU-time and memory limits.
+class ScriptError(Exception):
+    pass
+
+# Namespace every script starts with, so simple strategies need no imports
+SCRIPT_GLOBALS = {'bt': bt, 'np': np, 'pd': pd, 'math': math}
+
+def load_script_strategy(source, filename='<script>', module_name='flint_script'):
+    # Backtrader looks classes up in sys.modules by __module__, so the script gets a registered module of its own
+    module = types.ModuleType(module_name)
+    module.__file__ = filename
+    module.__dict__.update(SCRIPT_GLOBALS)
+    sys.modules[module_name] = module
+    namespace = module.__dict__
+    exec(compile(source, filename, 'exec'), namespace)
+    if isinstance(namespace.get('STRATEGY'), type) and issubclass(namespace['STRATEGY'], bt.Strategy):
+        return namespace['STRATEGY']
+    # Classes defined by the script itself, not ones it imported
+    defined = [value for value in namespace.values() if isinstance(value, type) and issubclass(value, bt.Strategy)
+               and value.__module__ == module_name]
+    if len(defined) != 1:
+        raise ScriptError(f"{filename} must define exactly one bt.Strategy subclass (or set STRATEGY), found {len(defined)}")
+    return defined[0]
+
+# Per-process state of a script worker: compiled strategies by source hash and the limits set at start-up
+_SCRIPT_WORKER = {'strategies': {}}
+
+def _init_script_worker(memory_mb):
+    _SCRIPT_WORKER['strategies'].clear()
+    try:
+        import resource
+        import signal
+    except ImportError:
+        logger.warning("CPU and memory limits for scripts are not available on this platform")
+        return
+    if memory_mb and os.path.exists('/proc/self/statm'):
+        # Address-space limit on top of what the interpreter and libraries already map; exceeding it raises MemoryError
+        with open('/proc/self/statm') as file:
+            baseline = int(file.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+        limit = baseline + memory_mb * 2**20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    def cpu_exceeded(signum, frame):
+        raise ScriptError("CPU time limit exceeded")
+    signal.signal(signal.SIGXCPU, cpu_exceeded)
+
+def _run_script_task(source, digest, filename, spec, params, initial_cash, periods_per_year, cpu_seconds):
+    try:
+        import resource
+    except ImportError:
+        resource, cpu_seconds = None, None
+    strategies = _SCRIPT_WORKER['strategies']
+    if digest not in strategies:
+        strategies[digest] = load_script_strategy(source, filename, f"flint_script_{digest[:16]}")
+    strategy_cls = strategies[digest]
+    shm, data = SharedPriceData.attach(spec)
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU) if resource else (None, None)
+    try:
+        if cpu_seconds:
+            # RLIMIT_CPU counts the whole process, so the soft limit is moved to "CPU used so far + this run's
+            # allowance"; crossing it sends SIGXCPU, which the worker turns into a ScriptError
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            used = math.ceil(usage.ru_utime + usage.ru_stime)
+            resource.setrlimit(resource.RLIMIT_CPU, (used + cpu_seconds, hard))
+        cerebro = bt.Cerebro()
+        cerebro.addstrategy(strategy_cls, **cast_strategy_params(strategy_cls, params))
+        cerebro.adddata(bt.feeds.PandasData(dataname=data))
+        cerebro.broker.setcash(initial_cash)
+        cerebro.addanalyzer(ValueRecorder, _name='values')
+        strat = cerebro.run()[0]
+        recorder = strat.analyzers.values
+        values = np.asarray(recorder.values, dtype=np.float64)
+        positions = np.asarray(recorder.positions, dtype=np.float64)
+        cash = np.asarray(recorder.cash, dtype=np.float64)
+        metrics = compute_run_metrics(values, initial_cash, periods_per_year,
+                                      traded_value=traded_value(positions, data['Open'].to_numpy()[:len(positions)]))
+        metrics.update({'Final Value': float(values[-1]) if len(values) else float(initial_cash), 'Bars': len(values)})
+        return {'strategy': strategy_cls.__name__, 'metrics': metrics, 'values': values, 'positions': positions, 'cash': cash}
+    finally:
+        if cpu_seconds:
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+        del data
+        shm.close()
+
+class ScriptRunner:
+    # wall_seconds bounds a run in real time, which the CPU limit does not (a script can block or sleep)
+    def __init__(self, processes=2, cpu_seconds=120, memory_mb=2048, wall_seconds=600):
+        self.processes = processes
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.wall_seconds = wall_seconds
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def _executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = concurrent.futures.ProcessPoolExecutor(self.processes, initializer=_init_script_worker,
+                                                                       initargs=(self.memory_mb,))
+            return self.executor
+
+    def submit(self, source, data, params=None, initial_cash=100000, periods_per_year=TRADING_DAYS, filename='<script>'):
+        # Syntax errors are reported here, before anything runs; the script itself only ever executes in a worker
+        compile(source, filename, 'exec')
+        digest = hashlib.sha256(source.encode()).hexdigest()
+        shared = SharedPriceData(data)
+        try:
+            future = self._executor().submit(_run_script_task, source, digest, filename, shared.spec, params or {},
+                                             initial_cash, periods_per_year, self.cpu_seconds)
+        except Exception:
+            shared.close()
+            raise
+        future.add_done_callback(lambda _: shared.close())
+        return future
+
+    def run(self, source, data, params=None, initial_cash=100000, periods_per_year=TRADING_DAYS, filename='<script>', job=None):
+        # A cancelled or timed-out run cannot be interrupted inside its worker, so the pool's workers are killed (runs
+        # still in flight on them fail with ScriptError) and the next run starts a fresh pool
+        future = self.submit(source, data, params, initial_cash, periods_per_year, filename)
+        deadline = time.monotonic() + self.wall_seconds if self.wall_seconds else None
+        try:
+            while True:
+                try:
+                    return future.result(timeout=0.1)
+                except concurrent.futures.TimeoutError:
+                    if job is not None and job.cancelled:
+                        self.terminate()
+                        job.check_cancelled()
+                    if deadline is not None and time.monotonic() > deadline:
+                        self.terminate()
+                        raise ScriptError(f"The script did not finish within {self.wall_seconds} seconds")
+        except concurrent.futures.BrokenExecutor:
+            # A worker died (crash or hard CPU limit); start a fresh pool for the next run
+            with self.lock:
+                self.executor = None
+            raise ScriptError("The script's worker process died (crash, or CPU/memory limit exceeded)")
+
+    def terminate(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            for process in list((executor._processes or {}).values()):
+                process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+# Background Jobs: work that runs off the Tk event thread and reports back through a queue
+class JobCancelled(Exception):
+    pass
+
+class BackgroundJob:
+    def __init__(self, name, func, on_done=None, on_partial=None):
+        self.name = name
+        self.func = func
+        self.on_done = on_done
+        self.on_partial = on_partial
+        self.events = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled(self.name)
+
+    def progress(self, fraction, message=''):
+        self.events.put(('progress', self, (fraction, message)))
+
+    def post(self, payload):
+        self.events.put(('partial', self, payload))
 
+# Runs submitted jobs one at a time on a daemon thread; the GUI drains `events` from its own thread
+class BackgroundWorker:
     def __init__(self):
-        self.dataclose = self.datas[0].close
-        self.order = None
-        self.rsi = bt.indicators.RSI_SMA(self.data.close, period=self.params.rsi_period)
+        self.jobs = queue.Queue()
+        self.events = queue.Queue()
+        self.pending = []
+        self.current = None
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name='backtest-worker', daemon=True)
+        self.thread.start()
 
-    def next(self):
-        if self.order:
-            return
-        if self.rsi < self.params.rsi_lower:
-            if self.position.size == 0:
-                self.order = self.buy()
-        elif self.rsi > self.params.rsi_upper:
-            if self.position.size > 0:
-                self.order = self.sell()
+    def submit(self, job):
+        job.events = self.events
+        with self.lock:
+            self.pending.append(job)
+        self.jobs.put(job)
+        self.events.put(('queued', job, None))
+        return job
 
-# Example Bollinger Bands Strategy
-class BollingerBandsStrategy(bt.Strategy):
-    params = (
-        ('bbands_period', 20),
-        ('bbands_devfactor', 2.0),
-    )
+    def cancel_current(self):
+        job = self.current
+        if job is not None:
+            job.cancel()
 
-    def __init__(self):
-        self.dataclose = self.datas[0].close
-        self.order = None
-        self.bbands = bt.indicators.BollingerBands(self.datas[0], period=self.params.bbands_period, devfactor=self.params.bbands_devfactor)
+    def cancel_all(self):
+        with self.lock:
+            jobs = list(self.pending)
+        for job in jobs + [self.current]:
+            if job is not None:
+                job.cancel()
 
-    def next(self):
-        if self.order:
-            return
-        if self.dataclose < self.bbands.lines.bot:
-            if self.position.size == 0:
-                self.order = self.buy()
-        elif self.dataclose > self.bbands.lines.top:
-            if self.position.size > 0:
-                self.order = self.sell()
+    def queued_count(self):
+        with self.lock:
+            return len(self.pending)
 
-# Example MACD Strategy
-class MACDStrategy(bt.Strategy):
-    params = (
-        ('macd1', 12),
-        ('macd2', 26),
-        ('signal', 9),
-    )
+    def stop(self):
+        self.cancel_all()
+        self.jobs.put(None)
 
-    def __init__(self):
-        self.dataclose = self.datas[0].close
-        self.order = None
-        self.macd = bt.indicators.MACD(self.datas[0], period_me1=self.params.macd1, period_me2=self.params.macd2, period_signal=self.params.signal)
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            with self.lock:
+                self.pending.remove(job)
+            if job.cancelled:
+                self.events.put(('cancelled', job, None))
+                continue
+            self.current = job
+            self.events.put(('started', job, None))
+            try:
+                result = job.func(job)
+                kind = 'cancelled' if job.cancelled else 'done'
+            except JobCancelled:
+                kind, result = 'cancelled', None
+            except Exception as exc:
+                logger.exception(f"Job '{job.name}' failed")
+                kind, result = 'error', exc
+            self.current = None
+            self.events.put((kind, job, result))
 
-    def next(self):
-        if self.order:
-            return
-        if self.macd.lines.macd > self.macd.lines.signal:
-            if self.position.size == 0:
-                self.order = self.buy()
-        elif self.macd.lines.macd < self.macd.lines.signal:
-            if self.position.size > 0:
-                self.order = self.sell()
+# Reports bar-level progress of a cerebro run to a BackgroundJob and stops the run when it is cancelled
+class ProgressReporter(bt.Analyzer):
+    params = (('job', None),)
 
-# Example Buy and Hold Strategy
-class BuyAndHoldStrategy(bt.Strategy):
-    def __init__(self):
-        self.dataclose = self.datas[0].close
-        self.order = None
+    def start(self):
+        self.step = None
 
     def next(self):
-        if self.order:
-            return
-        if self.position.size == 0:
-            self.order = self.buy()
+        total = self.data.buflen()
+        if self.step is None:
+            self.step = max(1, total // 100)
+        bar = len(self.data)
+        if bar % self.step == 0 or bar == total:
+            self.p.job.progress(bar / total, f"Bar {bar}/{total}")
+        if self.p.job.cancelled:
+            self.strategy.env.runstop()
 
 # Metrics Dashboard
 class MetricsDashboard:
     def __init__(self):
         self.metrics = {}
 
-    def calculate_sharpe_ratio(self, returns, risk_free_rate=0.01):
-        excess_returns = returns - risk_free_rate
-        sharpe_ratio = np.mean(excess_returns) / np.std(excess_returns)
+    def calculate_sharpe_ratio(self, returns, risk_free_rate=RISK_FREE_RATE, periods_per_year=TRADING_DAYS):
+        # `returns` are the strategy's per-bar returns; the risk-free rate is annual
+        excess_returns = np.asarray(returns) - risk_free_rate / periods_per_year
+        std = np.std(excess_returns)
+        sharpe_ratio = np.mean(excess_returns) / std * np.sqrt(periods_per_year) if std > 0 else 0.0
         logger.info(f"Sharpe Ratio: {sharpe_ratio:.2f}")
         self.metrics['Sharpe Ratio'] = sharpe_ratio
         return sharpe_ratio
@@ -238,6 +3079,15 @@ class MetricsDashboard:
         self.metrics['Total Return'] = total_return
         return total_return
 
+    def calculate_all(self, portfolio_values, risk_free_rate=RISK_FREE_RATE, periods_per_year=TRADING_DAYS, traded=None):
+        # Full metric set for one equity curve via the batched metrics engine
+        metrics = compute_run_metrics(portfolio_values, portfolio_values[0], periods_per_year, risk_free_rate, traded)
+        if traded is None:
+            metrics.pop('Turnover')
+        self.metrics.update(metrics)
+        logger.info(f"Sharpe Ratio: {metrics['Sharpe Ratio']:.2f}, Max Drawdown: {metrics['Max Drawdown']:.2%}")
+        return metrics
+
     def display_metrics(self, text_widget):
         text_widget.delete(1.0, tk.END)
         text_widget.insert(tk.END, "Metrics Summary:\n\n")
@@ -248,18 +3098,141 @@ class MetricsDashboard:
                 text_widget.insert(tk.END, f"{metric}: {value:.2f} (Risk-adjusted return)\n")
             elif metric == 'Total Return':
                 text_widget.insert(tk.END, f"{metric}: {value:.2%} (Overall portfolio growth)\n")
+            elif metric in ('Annual Return', 'Volatility', 'Win Rate'):
+                text_widget.insert(tk.END, f"{metric}: {value:.2%}\n")
+            elif metric == 'Drawdown Duration':
+                text_widget.insert(tk.END, f"{metric}: {int(value)} bars (Longest time below a peak)\n")
+            elif metric == 'Turnover':
+                text_widget.insert(tk.END, f"{metric}: {value:.2f}x per year\n")
             else:
                 text_widget.insert(tk.END, f"{metric}: {value:.2f}\n")
         logger.info("Metrics Dashboard updated")
 
+# Largest-Triangle-Three-Buckets downsampling: indices of `threshold` points that keep the visual shape of the series
+# (first and last points always included). Each bucket keeps the point forming the largest triangle with the point
+# kept from the previous bucket and the average of the next bucket.
+def lttb(x, y, threshold):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    filled = np.nan_to_num(y)
+    sums_x = np.concatenate([[0.0], np.cumsum(x)])
+    sums_y = np.concatenate([[0.0], np.cumsum(filled)])
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_lo, next_hi = hi, edges[i + 2]
+            cx = (sums_x[next_hi] - sums_x[next_lo]) / (next_hi - next_lo)
+            cy = (sums_y[next_hi] - sums_y[next_lo]) / (next_hi - next_lo)
+        else:
+            cx, cy = x[n - 1], filled[n - 1]
+        area = np.abs((x[a] - cx) * (filled[lo:hi] - filled[a]) - (x[a] - x[lo:hi]) * (cy - filled[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+# Chart Panel embedded in the main window: price with exact buy/sell markers above the cash and portfolio value curves.
+# Only the visible x-range is drawn, downsampled with LTTB to about max_points per line, and it is redrawn whenever
+# the toolbar zooms or pans, so drawing cost does not grow with the number of bars.
+class ChartPanel:
+    def __init__(self, parent, max_points=1500):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        self.max_points = max_points
+        self.figure = Figure(figsize=(8, 6))
+        self.price_ax, self.value_ax = self.figure.subplots(2, 1, sharex=True, gridspec_kw={'height_ratios': [3, 1]})
+        self.canvas = FigureCanvasTkAgg(self.figure, master=parent)
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.toolbar = NavigationToolbar2Tk(self.canvas, parent)
+        self.toolbar.update()
+        self.x = None
+        self.lines = []
+        self.markers = []
+
+    def show(self, dates, value, cash, price=None, buys=None, sells=None, title=''):
+        # buys/sells: (bar indices, fill prices). Without a price series the top panel shows the portfolio value.
+        import matplotlib.dates as mdates
+        index = pd.DatetimeIndex(dates)
+        self.x = mdates.date2num((index.tz_localize(None) if index.tz is not None else index).to_numpy())
+        for ax in (self.price_ax, self.value_ax):
+            ax.clear()
+        # clear() also drops callbacks, so the zoom/pan hook is connected again for each chart
+        self.price_ax.callbacks.connect('xlim_changed', lambda ax: self.refresh())
+        top = (price, 'Price', 'black') if price is not None else (value, 'Portfolio Value', 'blue')
+        self.lines = []
+        for ax, values, label, color in [(self.price_ax, *top), (self.value_ax, cash, 'Cash', 'red'),
+                                          (self.value_ax, value, 'Portfolio Value', 'blue')]:
+            line, = ax.plot([], [], color=color, linewidth=1, label=label)
+            self.lines.append((ax, line, np.asarray(values, dtype=np.float64)))
+        self.markers = []
+        for trades, marker, color, label in [(buys, '^', 'green', 'Buy'), (sells, 'v', 'red', 'Sell')]:
+            if trades is not None and len(trades[0]):
+                bars, prices = np.asarray(trades[0]), np.asarray(trades[1], dtype=np.float64)
+                points = self.price_ax.scatter(self.x[bars], prices, marker=marker, color=color, label=label, zorder=3)
+                self.markers.append((points, self.x[bars], prices))
+        self.price_ax.set_title(title)
+        self.price_ax.legend(loc='upper left')
+        self.value_ax.legend(loc='upper left')
+        self.price_ax.xaxis_date()
+        self.figure.autofmt_xdate()
+        self.price_ax.set_xlim(self.x[0], self.x[-1] if len(self.x) > 1 else self.x[0] + 1)
+        self.toolbar.update()
+
+    def refresh(self):
+        if self.x is None or not len(self.x):
+            return
+        left, right = self.price_ax.get_xlim()
+        lo = max(int(np.searchsorted(self.x, left)) - 1, 0)
+        hi = min(int(np.searchsorted(self.x, right, side='right')) + 1, len(self.x))
+        x = self.x[lo:hi]
+        limits = {}
+        for ax, line, values in self.lines:
+            visible = values[lo:hi]
+            keep = lttb(x, visible, self.max_points)
+            line.set_data(x[keep], visible[keep])
+            if np.isfinite(visible).any():
+                low, high = limits.get(ax, (np.inf, -np.inf))
+                limits[ax] = (min(low, np.nanmin(visible)), max(high, np.nanmax(visible)))
+        # Markers are never downsampled, only limited to the visible range
+        for points, marker_x, prices in self.markers:
+            inside = (marker_x >= x[0]) & (marker_x <= x[-1])
+            points.set_offsets(np.column_stack([marker_x[inside], prices[inside]]))
+        for ax, (low, high) in limits.items():
+            pad = (high - low) * 0.05 or abs(high) * 0.05 or 1.0
+            ax.set_ylim(low - pad, high + pad)
+        self.canvas.draw_idle()
+
+# Hyperparameter entry widgets per strategy: (strategy param, widget key, type)
+HYPERPARAMETER_FIELDS = {
+    'Moving Average': [('short_period', 'short_ma_entry', int), ('long_period', 'long_ma_entry', int),
+                       ('risk_percentage', 'risk_entry', float), ('stop_loss', 'stop_loss_entry', float),
+                       ('take_profit', 'take_profit_entry', float)],
+    'RSI': [('rsi_period', 'rsi_period_entry', int), ('rsi_lower', 'rsi_lower_entry', int),
+            ('rsi_upper', 'rsi_upper_entry', int)],
+    'Bollinger Bands': [('bbands_period', 'bbands_period_entry', int), ('bbands_devfactor', 'bbands_devfactor_entry', float)],
+    'MACD': [('macd1', 'macd1_entry', int), ('macd2', 'macd2_entry', int), ('signal', 'signal_entry', int)],
+}
+
 # GUI Setup with Tkinter
 class TradingPlatformGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Flint&Steel Backtesting Platform")
         self.portfolio = Portfolio(initial_cash=100000)
+        self.data_cache = OHLCVCache()
+        self.results_store = ResultStore()
+        self.checkpoints = CheckpointStore()
         self.custom_script = None
+        self.worker = BackgroundWorker()
+        self.script_runner = ScriptRunner()
         self.setup_gui()
+        self.root.after(100, self.poll_worker_events)
 
     def setup_gui(self):
         # Main Frame
@@ -290,8 +3263,20 @@ class TradingPlatformGUI:
                                         foreground='white', borderwidth=2, year=2023, month=9, day=1)
         self.end_date_entry.grid(row=2, column=1, padx=5, pady=5)
 
+        # Several comma-separated tickers run as one portfolio sharing cash, rebalanced every N bars
+        self.rebalance_label = ttk.Label(self.ticker_frame, text="Rebalance (bars):")
+        self.rebalance_label.grid(row=3, column=0, padx=5, pady=5)
+
+        self.rebalance_entry = ttk.Entry(self.ticker_frame, width=12)
+        self.rebalance_entry.insert(0, '21')
+        self.rebalance_entry.grid(row=3, column=1, padx=5, pady=5)
+
         self.submit_button = ttk.Button(self.ticker_frame, text="Submit", command=self.submit_ticker)
-        self.submit_button.grid(row=3, column=1, padx=5, pady=5)
+        self.submit_button.grid(row=4, column=1, padx=5, pady=5)
+
+        self.watchlist_button = ttk.Button(self.ticker_frame, text="Watchlist Sentiment",
+                                           command=lambda: self.run_sentiment(self.get_ticker_list()))
+        self.watchlist_button.grid(row=5, column=1, padx=5, pady=5)
 
         # Strategy Selection Frame
         self.strategy_frame = ttk.LabelFrame(self.main_frame, text="Backtesting Strategy")
@@ -304,6 +3289,13 @@ class TradingPlatformGUI:
         self.strategy_options.grid(row=0, column=1, padx=5, pady=5)
         self.strategy_options.bind("<<ComboboxSelected>>", self.update_hyperparameters)
 
+        self.engine_label = ttk.Label(self.strategy_frame, text="Engine:")
+        self.engine_label.grid(row=1, column=0, padx=5, pady=5)
+
+        self.engine_options = ttk.Combobox(self.strategy_frame, values=['Backtrader', 'Vectorized'], state='readonly')
+        self.engine_options.set('Backtrader')
+        self.engine_options.grid(row=1, column=1, padx=5, pady=5)
+
         # Hyperparameters Frame
         self.hyperparameters_frame = ttk.LabelFrame(self.main_frame, text="Strategy Hyperparameters")
         self.hyperparameters_frame.grid(row=2, column=0, padx=10, pady=10, sticky=(tk.W, tk.E))
@@ -318,10 +3310,67 @@ class TradingPlatformGUI:
         self.metrics_text = tk.Text(self.metrics_frame, width=60, height=10)
         self.metrics_text.grid(row=0, column=0, padx=10, pady=10)
 
+        # Run timings: phases are always timed; profiling adds next() counts and a cProfile capture
+        self.timing_frame = ttk.Frame(self.metrics_frame)
+        self.timing_frame.grid(row=1, column=0, padx=10, pady=(0, 10), sticky=tk.W)
+
+        self.profile_var = tk.BooleanVar(value=False)
+        self.profile_check = ttk.Checkbutton(self.timing_frame, text="Profile Run", variable=self.profile_var)
+        self.profile_check.grid(row=0, column=0, padx=5)
+
+        self.export_timings_button = ttk.Button(self.timing_frame, text="Export Timings", command=self.export_timings)
+        self.export_timings_button.grid(row=0, column=1, padx=5)
+        self.last_timer = None
+
+        # Bootstrap confidence intervals of the last run (block bootstrap of its per-bar returns)
+        self.bootstrap_button = ttk.Button(self.timing_frame, text="Bootstrap", command=self.run_bootstrap)
+        self.bootstrap_button.grid(row=0, column=2, padx=5)
+        self.last_result = None
+
         # Backtest Button
         self.backtest_button = ttk.Button(self.main_frame, text="Run Backtest", command=self.run_predefined_backtest)
         self.backtest_button.grid(row=4, column=0, padx=10, pady=10)
 
+        # Hyperparameter Sweep Frame (hyperparameter entries accept ranges such as 10:50:10 or 10,20,30)
+        self.sweep_frame = ttk.LabelFrame(self.main_frame, text="Hyperparameter Sweep")
+        self.sweep_frame.grid(row=5, column=0, padx=10, pady=10, sticky=(tk.W, tk.E))
+
+        self.rank_by_label = ttk.Label(self.sweep_frame, text="Rank By:")
+        self.rank_by_label.grid(row=0, column=0, padx=5, pady=5)
+
+        self.rank_by_options = ttk.Combobox(self.sweep_frame, values=SWEEP_METRICS, state='readonly')
+        self.rank_by_options.set(SWEEP_METRICS[0])
+        self.rank_by_options.grid(row=0, column=1, padx=5, pady=5)
+
+        self.sweep_button = ttk.Button(self.sweep_frame, text="Run Sweep", command=self.run_sweep)
+        self.sweep_button.grid(row=0, column=2, padx=5, pady=5)
+
+        # Surrogate-guided search over the same ranges; an empty budget means a tenth of the grid
+        self.budget_label = ttk.Label(self.sweep_frame, text="Budget:")
+        self.budget_label.grid(row=1, column=0, padx=5, pady=5)
+
+        self.budget_entry = ttk.Entry(self.sweep_frame, width=10)
+        self.budget_entry.grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
+
+        self.optimize_button = ttk.Button(self.sweep_frame, text="Optimize", command=self.run_optimizer)
+        self.optimize_button.grid(row=1, column=2, padx=5, pady=5)
+
+        # Run Queue Frame: progress of the current run, number of queued runs and cancellation
+        self.progress_frame = ttk.LabelFrame(self.main_frame, text="Run Queue")
+        self.progress_frame.grid(row=6, column=0, padx=10, pady=10, sticky=(tk.W, tk.E))
+
+        self.progress_bar = ttk.Progressbar(self.progress_frame, orient=tk.HORIZONTAL, length=300, mode='determinate', maximum=1.0)
+        self.progress_bar.grid(row=0, column=0, columnspan=3, padx=5, pady=5, sticky=(tk.W, tk.E))
+
+        self.status_label = ttk.Label(self.progress_frame, text="Idle")
+        self.status_label.grid(row=1, column=0, padx=5, pady=5, sticky=tk.W)
+
+        self.cancel_button = ttk.Button(self.progress_frame, text="Cancel", command=self.worker.cancel_current)
+        self.cancel_button.grid(row=1, column=1, padx=5, pady=5)
+
+        self.cancel_all_button = ttk.Button(self.progress_frame, text="Cancel All", command=self.worker.cancel_all)
+        self.cancel_all_button.grid(row=1, column=2, padx=5, pady=5)
+
         # Custom Script Section
         self.custom_script_frame = ttk.LabelFrame(self.main_frame, text="Custom Backtest Script")
         self.custom_script_frame.grid(row=0, column=1, rowspan=4, padx=10, pady=10, sticky=(tk.N, tk.S, tk.E, tk.W))
@@ -335,16 +3384,84 @@ class TradingPlatformGUI:
         self.run_custom_backtest_button = ttk.Button(self.custom_script_frame, text="Run Custom Backtest", command=self.run_custom_backtest)
         self.run_custom_backtest_button.grid(row=2, column=0, padx=5, pady=5, sticky=(tk.W, tk.E))
 
+        # Paper Trading Frame: replays a local bar file through the selected strategy one bar at a time
+        self.paper_frame = ttk.LabelFrame(self.main_frame, text="Paper Trading")
+        self.paper_frame.grid(row=5, column=1, padx=10, pady=10, sticky=(tk.W, tk.E))
+
+        self.speed_label = ttk.Label(self.paper_frame, text="Speed (0 = max):")
+        self.speed_label.grid(row=0, column=0, padx=5, pady=5)
+
+        self.speed_entry = ttk.Entry(self.paper_frame, width=10)
+        self.speed_entry.insert(0, '0')
+        self.speed_entry.grid(row=0, column=1, padx=5, pady=5)
+
+        self.paper_button = ttk.Button(self.paper_frame, text="Replay File", command=self.run_paper_trading)
+        self.paper_button.grid(row=0, column=2, padx=5, pady=5)
+
+        # Universe Screen Frame: the selected strategy and hyperparameters on every ticker of a file, ranked by Rank By
+        self.screen_frame = ttk.LabelFrame(self.main_frame, text="Universe Screen")
+        self.screen_frame.grid(row=6, column=1, padx=10, pady=10, sticky=(tk.W, tk.E))
+
+        self.screen_button = ttk.Button(self.screen_frame, text="Screen Ticker File", command=self.run_screen)
+        self.screen_button.grid(row=0, column=0, padx=5, pady=5)
+        self.universe = None
+
+        # Chart Panel: results of the last backtest, zoom and pan with the toolbar
+        self.chart_frame = ttk.LabelFrame(self.main_frame, text="Chart")
+        self.chart_frame.grid(row=0, column=2, rowspan=7, padx=10, pady=10, sticky=(tk.N, tk.S, tk.E, tk.W))
+        self.chart_panel = ChartPanel(self.chart_frame)
+
     def get_ticker_list(self):
-        return ['SOXL', 'VFV.TO', 'VOO', 'NVDA', 'TSLA', 'META', 'MSFT']
+        # The last screened universe replaces the default watchlist
+        return self.universe or ['SOXL', 'VFV.TO', 'VOO', 'NVDA', 'TSLA', 'META', 'MSFT']
+
+    def poll_worker_events(self):
+        # Worker events are applied here, on the Tk thread, since Tk widgets are not thread-safe
+        try:
+            while True:
+                kind, job, payload = self.worker.events.get_nowait()
+                if kind == 'progress':
+                    fraction, message = payload
+                    self.progress_bar['value'] = fraction
+                    self.status_label['text'] = f"{job.name}: {message}" if message else job.name
+                elif kind == 'partial':
+                    if job.on_partial:
+                        job.on_partial(payload)
+                elif kind == 'started':
+                    self.progress_bar['value'] = 0
+                    self.status_label['text'] = f"Running {job.name}"
+                elif kind == 'done':
+                    self.status_label['text'] = f"Finished {job.name}"
+                    if job.on_done:
+                        job.on_done(payload)
+                elif kind == 'cancelled':
+                    self.status_label['text'] = f"Cancelled {job.name}"
+                elif kind == 'error':
+                    self.status_label['text'] = f"Failed {job.name}"
+                    self.metrics_text.insert(tk.END, f"{job.name} failed: {payload}\n")
+                queued = self.worker.queued_count()
+                if queued:
+                    self.status_label['text'] += f" ({queued} queued)"
+        except queue.Empty:
+            pass
+        self.root.after(100, self.poll_worker_events)
 
     def submit_ticker(self):
-        ticker = self.ticker_entry.get().upper()
-        start_date = self.start_date_entry.get_date().strftime('%Y-%m-%d')
-        end_date = self.end_date_entry.get_date().strftime('%Y-%m-%d')
-        sentiment = SentimentAnalysis(ticker).analyze_sentiment()
-        self.metrics_text.insert(tk.END, f"Sentiment Score for {ticker}: {sentiment}\n")
-        logger.info(f"Ticker submitted: {ticker}")
+        # A comma-separated entry scores every ticker from one concurrent news fetch
+        tickers = [ticker.strip() for ticker in self.ticker_entry.get().upper().split(',') if ticker.strip()]
+        self.run_sentiment(tickers)
+        logger.info(f"Ticker submitted: {', '.join(tickers)}")
+
+    def run_sentiment(self, tickers):
+        def show_sentiment(scores):
+            for ticker in tickers:
+                if ticker in scores:
+                    self.metrics_text.insert(tk.END, f"Sentiment Score for {ticker}: {scores[ticker]}\n")
+                else:
+                    self.metrics_text.insert(tk.END, f"Sentiment Score for {ticker}: news unavailable\n")
+
+        self.worker.submit(BackgroundJob(f"Sentiment for {', '.join(tickers)}", lambda job: SentimentAnalysis.analyze_many(tickers),
+                                         on_done=show_sentiment))
 
     def update_hyperparameters(self, event):
         strategy = self.strategy_options.get()
@@ -421,79 +3538,292 @@ class TradingPlatformGUI:
             self.hyperparameter_widgets['signal_entry'] = ttk.Entry(self.hyperparameters_frame)
             self.hyperparameter_widgets['signal_entry'].grid(row=2, column=1, padx=5, pady=5)
 
+    def get_strategy_params(self):
+        # Raises ValueError naming the field when an entry is empty or not a number; the callers report it
+        strategy_cls = STRATEGIES[self.strategy_options.get()]
+        params = {}
+        for param, entry, cast in HYPERPARAMETER_FIELDS.get(self.strategy_options.get(), []):
+            if entry in self.hyperparameter_widgets:
+                text = self.hyperparameter_widgets[entry].get().strip()
+                try:
+                    params[param] = cast(text)
+                except ValueError:
+                    raise ValueError(f"{param} must be {'an integer' if cast is int else 'a number'}, got '{text}'") from None
+        return strategy_cls, params
+
+    def report_input_error(self, exc):
+        self.metrics_text.insert(tk.END, f"Invalid input: {exc}\n")
+
     def run_predefined_backtest(self):
+        tickers = [ticker.strip() for ticker in self.ticker_entry.get().upper().split(',') if ticker.strip()]
+        if len(tickers) > 1:
+            return self.run_portfolio_backtest(tickers)
         ticker = self.ticker_entry.get().upper()
         start_date = self.start_date_entry.get_date().strftime('%Y-%m-%d')
         end_date = self.end_date_entry.get_date().strftime('%Y-%m-%d')
         initial_cash = 100000
+        try:
+            strategy_cls, params = self.get_strategy_params()
+        except ValueError as exc:
+            return self.report_input_error(exc)
+        engine = self.engine_options.get()
+        profile = self.profile_var.get()
+        timer = PhaseTimer(next_calls=profile, profile=profile)
 
-        data_handler = DataHandler([ticker], start_date, end_date)
-        data = data_handler.fetch_data()
+        # Runs on the worker thread: fetch and backtest only, no Tk or matplotlib calls. A run identical to a stored
+        # one (same data, strategy code and parameters) is read back from the results store instead, and a Backtrader
+        # run over a later end date resumes from the checkpoint of the earlier one on the streaming engine.
+        def work(job):
+            job.progress(0, f"Fetching {ticker}")
+            with timer.phase('fetch'):
+                data = DataHandler([ticker], start_date, end_date, cache=self.data_cache).fetch_data()
+            job.check_cancelled()
+            key = self.results_store.key(data, strategy_cls, params, initial_cash, engine.lower())
+            with timer.phase('store'):
+                stored = self.results_store.load(key)
+            if stored is not None:
+                job.progress(1.0, "Loaded from results store")
+                return ticker, data, stored[0], timer, True
+            if engine == 'Backtrader' and hasattr(strategy_cls, 'stream_signals'):
+                result, _ = run_checkpointed(data, strategy_cls, params, initial_cash, store=self.checkpoints,
+                                             ticker=ticker, start=start_date, timer=timer, job=job)
+            else:
+                result = run_strategy(data, strategy_cls, params, initial_cash, engine.lower(), timer, job)
+            job.check_cancelled()
+            with timer.phase('store'):
+                self.results_store.save(key, result, backtest_metrics(result, data, initial_cash), ticker=ticker,
+                                        strategy=strategy_cls.__name__, params=params, engine=engine.lower(),
+                                        start=start_date, end=end_date, interval='1d')
+            job.progress(1.0)
+            return ticker, data, result, timer, False
 
-        cerebro = bt.Cerebro()
+        self.worker.submit(BackgroundJob(f"{strategy_cls.__name__} on {ticker}", work, on_done=self.show_backtest_results))
 
-        strategy = self.strategy_options.get()
-        if strategy == 'Moving Average':
-            short_period = int(self.hyperparameter_widgets['short_ma_entry'].get()) if 'short_ma_entry' in self.hyperparameter_widgets else 50
-            long_period = int(self.hyperparameter_widgets['long_ma_entry'].get()) if 'long_ma_entry' in self.hyperparameter_widgets else 200
-            risk_percentage = float(self.hyperparameter_widgets['risk_entry'].get()) if 'risk_entry' in self.hyperparameter_widgets else 0.01
-            stop_loss = float(self.hyperparameter_widgets['stop_loss_entry'].get()) if 'stop_loss_entry' in self.hyperparameter_widgets else 0.02
-            take_profit = float(self.hyperparameter_widgets['take_profit_entry'].get()) if 'take_profit_entry' in self.hyperparameter_widgets else 0.05
+    def show_backtest_results(self, outcome):
+        ticker, data, result, timer, stored = outcome
+        logger.info(f"Final Portfolio Value after Backtest: {result.final_value}")
+        data = data.iloc[:len(result.value)]
 
-            cerebro.addstrategy(MovingAverageStrategy, short_period=short_period, long_period=long_period, 
-                                risk_percentage=risk_percentage, stop_loss=stop_loss, take_profit=take_profit)
+        # Update Metrics Dashboard
+        with timer.phase('metrics'):
+            dashboard = MetricsDashboard()
+            dashboard.calculate_total_return(result.initial_cash, result.final_value)
+            dashboard.calculate_all(result.value, traded=traded_value(result.position, data['Open'].to_numpy()))
 
-        elif strategy == 'RSI':
-            rsi_period = int(self.hyperparameter_widgets['rsi_period_entry'].get()) if 'rsi_period_entry' in self.hyperparameter_widgets else 14
-            rsi_lower = int(self.hyperparameter_widgets['rsi_lower_entry'].get()) if 'rsi_lower_entry' in self.hyperparameter_widgets else 30
-            rsi_upper = int(self.hyperparameter_widgets['rsi_upper_entry'].get()) if 'rsi_upper_entry' in self.hyperparameter_widgets else 70
+        # Annotated Backtesting Graph
+        with timer.phase('plot'):
+            self.show_chart(ticker, data, result.position, result.value, result.cash)
+        self.show_timings(dashboard, timer)
+        self.last_result = result
+        if stored:
+            self.metrics_text.insert(tk.END, "\nIdentical run found in the results store; nothing was recomputed\n")
+        self.display_backtest_summary()
 
-            cerebro.addstrategy(RSIStrategy, rsi_period=rsi_period, rsi_lower=rsi_lower, rsi_upper=rsi_upper)
+    def show_timings(self, dashboard, timer):
+        dashboard.display_metrics(self.metrics_text)
+        self.metrics_text.insert(tk.END, f"\n{timer.summary()}\n")
+        if timer.profiler is not None:
+            self.metrics_text.insert(tk.END, f"\n{timer.profile_summary(15)}")
+        self.last_timer = timer
 
-        elif strategy == 'Bollinger Bands':
-            bbands_period = int(self.hyperparameter_widgets['bbands_period_entry'].get()) if 'bbands_period_entry' in self.hyperparameter_widgets else 20
-            bbands_devfactor = float(self.hyperparameter_widgets['bbands_devfactor_entry'].get()) if 'bbands_devfactor_entry' in self.hyperparameter_widgets else 2.0
+    def export_timings(self):
+        if self.last_timer is None:
+            self.metrics_text.insert(tk.END, "Run a backtest before exporting timings\n")
+            return
+        filetypes = [("Timings JSON", "*.json"), ("Chrome Trace", "*.trace.json"), ("cProfile Stats", "*.prof")]
+        path = filedialog.asksaveasfilename(defaultextension='.json', filetypes=filetypes)
+        if not path:
+            return
+        try:
+            self.last_timer.export(path)
+        except (ValueError, OSError) as exc:
+            self.metrics_text.insert(tk.END, f"Export failed: {exc}\n")
+            return
+        logger.info(f"Timings exported to {path}")
 
-            cerebro.addstrategy(BollingerBandsStrategy, bbands_period=bbands_period, bbands_devfactor=bbands_devfactor)
+    def run_bootstrap(self):
+        if self.last_result is None:
+            self.metrics_text.insert(tk.END, "Run a backtest before bootstrapping it\n")
+            return
+        result = self.last_result
+        self.worker.submit(BackgroundJob("Bootstrap", lambda job: bootstrap_result(result, block_size=0), on_done=self.show_bootstrap))
 
-        elif strategy == 'MACD':
-            macd1 = int(self.hyperparameter_widgets['macd1_entry'].get()) if 'macd1_entry' in self.hyperparameter_widgets else 12
-            macd2 = int(self.hyperparameter_widgets['macd2_entry'].get()) if 'macd2_entry' in self.hyperparameter_widgets else 26
-            signal = int(self.hyperparameter_widgets['signal_entry'].get()) if 'signal_entry' in self.hyperparameter_widgets else 9
+    def show_bootstrap(self, report):
+        lines = [f"\nBootstrap: {report['paths']} paths, block size {report['block_size']}, "
+                 f"{report['confidence']:.0%} confidence intervals"]
+        for name in BOOTSTRAP_METRICS:
+            stats = report[name]
+            lines.append(f"{name}: {stats['observed']:.4f} [{stats['lower']:.4f}, {stats['upper']:.4f}]")
+        lines.append(f"Probability of Loss: {report['Probability of Loss']:.2%}\n")
+        self.metrics_text.insert(tk.END, "\n".join(lines))
 
-            cerebro.addstrategy(MACDStrategy, macd1=macd1, macd2=macd2, signal=signal)
+    def show_chart(self, ticker, data, position, value, cash):
+        # Fills happen at the bar's open, so markers sit where the position changed at that bar's open price
+        change = np.diff(np.asarray(position, dtype=np.float64), prepend=0.0)
+        open_ = data['Open'].to_numpy(dtype=np.float64)
+        buys, sells = np.flatnonzero(change > 0), np.flatnonzero(change < 0)
+        self.chart_panel.show(data.index, value, cash, price=data['Close'].to_numpy(dtype=np.float64),
+                              buys=(buys, open_[buys]), sells=(sells, open_[sells]), title=ticker)
 
-        elif strategy == 'Buy and Hold':
-            cerebro.addstrategy(BuyAndHoldStrategy)
+    def run_portfolio_backtest(self, tickers):
+        start_date = self.start_date_entry.get_date().strftime('%Y-%m-%d')
+        end_date = self.end_date_entry.get_date().strftime('%Y-%m-%d')
+        initial_cash = 100000
+        try:
+            strategy_cls, params = self.get_strategy_params()
+            rebalance = int(self.rebalance_entry.get()) if self.rebalance_entry.get().strip() else None
+            # Buy and Hold holds the whole basket, so no per-ticker signals are needed
+            backtest = PortfolioBacktest(None if strategy_cls is BuyAndHoldStrategy else strategy_cls, initial_cash,
+                                         rebalance=rebalance, **params)
+        except ValueError as exc:
+            return self.report_input_error(exc)
 
-        data_feed = bt.feeds.PandasData(dataname=data)
-        cerebro.adddata(data_feed)
+        def work(job):
+            job.progress(0, f"Fetching {len(tickers)} tickers")
+            panel = DataHandler(tickers, start_date, end_date, cache=self.data_cache).fetch_panel()
+            job.check_cancelled()
+            result = backtest.run(panel)
+            job.progress(1.0)
+            return panel, initial_cash, result
 
-        cerebro.broker.setcash(initial_cash)
-        cerebro.addanalyzer(bt.analyzers.TimeReturn, _name='returns')
-        strat = cerebro.run()
-        strat = strat[0]
+        self.worker.submit(BackgroundJob(f"{strategy_cls.__name__} on {len(tickers)} tickers", work,
+                                         on_done=self.show_portfolio_results))
 
-        # Retrieve the TimeReturn analyzer to get the returns
-        portfolio_returns = strat.analyzers.returns.get_analysis()
+    def show_portfolio_results(self, outcome):
+        panel, initial_cash, result = outcome
+        logger.info(f"Final Portfolio Value after Backtest: {result.final_value}")
+        dashboard = MetricsDashboard()
+        dashboard.calculate_total_return(initial_cash, result.final_value)
+        dashboard.calculate_all(result.value, traded=traded_value(result.position, panel['Open']))
+        dashboard.display_metrics(self.metrics_text)
+        self.metrics_text.insert(tk.END, f"Tickers: {len(panel.tickers)}, Trades: {len(result.trades)}\n")
+        self.chart_panel.show(result.dates, result.value, result.cash, title=f"Portfolio of {len(panel.tickers)} tickers")
 
-        # Convert the returns to a cumulative portfolio value
-        portfolio_values = np.cumprod([1 + r for r in portfolio_returns.values()]) * initial_cash
+    def get_sweep_ranges(self):
+        strategy_cls = STRATEGIES[self.strategy_options.get()]
+        ranges = {}
+        for param, entry, cast in HYPERPARAMETER_FIELDS.get(self.strategy_options.get(), []):
+            text = self.hyperparameter_widgets[entry].get().strip() if entry in self.hyperparameter_widgets else ''
+            if text:
+                try:
+                    ranges[param] = parse_param_range(text, cast)
+                except ValueError as exc:
+                    raise ValueError(f"{param} range '{text}': {exc}") from None
+        return strategy_cls, ranges
 
-        final_value = cerebro.broker.getvalue()
-        logger.info(f"Final Portfolio Value after Backtest: {final_value}")
+    def run_sweep(self):
+        initial_cash = 100000
+        metric = self.rank_by_options.get()
+        try:
+            strategy_cls, ranges = self.get_sweep_ranges()
+            sweep = ParameterSweep(strategy_cls, ranges, initial_cash, engine=self.engine_options.get().lower())
+        except ValueError as exc:
+            return self.report_input_error(exc)
+        self.run_search(sweep, ranges, metric, len(expand_param_grid(ranges)), f"{strategy_cls.__name__} sweep")
 
-        # Update Metrics Dashboard
-        dashboard = MetricsDashboard()
-        dashboard.calculate_total_return(initial_cash, final_value)
-        returns = data['Close'].pct_change().dropna()
-        dashboard.calculate_sharpe_ratio(returns)
-        dashboard.calculate_max_drawdown(portfolio_values)
-        dashboard.display_metrics(self.metrics_text)
+    def run_optimizer(self):
+        metric = self.rank_by_options.get()
+        budget = self.budget_entry.get().strip()
+        try:
+            strategy_cls, ranges = self.get_sweep_ranges()
+            optimizer = SurrogateOptimizer(strategy_cls, ranges, 100000, metric=metric, budget=int(budget) if budget else None,
+                                           engine=self.engine_options.get().lower())
+        except ValueError as exc:
+            return self.report_input_error(exc)
+        self.run_search(optimizer, ranges, metric, optimizer.budget, f"{strategy_cls.__name__} optimization")
 
-        # Annotated Backtesting Graph
-        cerebro.plot(style='candlestick')
-        self.display_backtest_summary()
+    def run_search(self, search, ranges, metric, total, label):
+        # Runs a ParameterSweep or SurrogateOptimizer in the background, streaming results into a ranked table
+        ticker = self.ticker_entry.get().upper()
+        start_date = self.start_date_entry.get_date().strftime('%Y-%m-%d')
+        end_date = self.end_date_entry.get_date().strftime('%Y-%m-%d')
+        window, tree = self.create_sweep_window(list(ranges), metric)
+        ranked = []
+
+        def show_result(result):
+            # Keep the table ordered by the ranking metric as results stream in
+            params, metrics = result
+            key = -metrics[metric]
+            position = bisect.bisect(ranked, key)
+            ranked.insert(position, key)
+            tree.insert('', position, values=[params[name] for name in ranges] + self.sweep_cells(metrics))
+
+        def work(job):
+            job.progress(0, f"Fetching {ticker}")
+            data = DataHandler([ticker], start_date, end_date, cache=self.data_cache).fetch_data()
+            done = 0
+            for result in search.run(data):
+                job.check_cancelled()
+                done += 1
+                job.post(result)
+                job.progress(done / total, f"{done}/{total} configurations")
+            logger.info(f"{label} complete: {done} configurations ranked by {metric}")
+
+        self.worker.submit(BackgroundJob(f"{label} on {ticker}", work, on_partial=show_result))
+
+    def run_screen(self):
+        path = filedialog.askopenfilename(filetypes=[("Ticker Lists", "*.txt *.csv"), ("All Files", "*.*")])
+        if not path:
+            return
+        try:
+            tickers = list(dict.fromkeys(read_ticker_file(path)))
+        except OSError as exc:
+            self.metrics_text.insert(tk.END, f"Could not read {path}: {exc}\n")
+            return
+        if not tickers:
+            self.metrics_text.insert(tk.END, f"No tickers in {path}\n")
+            return
+        self.universe = tickers
+        self.ticker_entry['values'] = tickers
+        start_date = self.start_date_entry.get_date().strftime('%Y-%m-%d')
+        end_date = self.end_date_entry.get_date().strftime('%Y-%m-%d')
+        try:
+            strategy_cls, params = self.get_strategy_params()
+            screen = UniverseScreen(strategy_cls, params, 100000, engine=self.engine_options.get().lower())
+        except ValueError as exc:
+            return self.report_input_error(exc)
+        metric = self.rank_by_options.get()
+        window, tree = self.create_sweep_window(['Ticker'], metric, title="Universe Screen")
+        ranked = []
+
+        def show_result(result):
+            ticker, metrics = result
+            key = -screen_score(metrics, metric)
+            position = bisect.bisect(ranked, key)
+            ranked.insert(position, key)
+            tree.insert('', position, values=[ticker] + self.sweep_cells(metrics))
+
+        def work(job):
+            job.progress(0, f"Fetching {len(tickers)} tickers")
+            panel = DataHandler(tickers, start_date, end_date, cache=self.data_cache).fetch_panel()
+            job.check_cancelled()
+            done = 0
+            for result in screen.run(panel):
+                job.check_cancelled()
+                done += 1
+                job.post(result)
+                job.progress(done / len(panel.tickers), f"{done}/{len(panel.tickers)} tickers")
+            logger.info(f"Screen complete: {done} of {len(tickers)} tickers ranked by {metric}")
+
+        self.worker.submit(BackgroundJob(f"{strategy_cls.__name__} screen of {len(tickers)} tickers", work, on_partial=show_result))
+
+    @staticmethod
+    def sweep_cells(metrics):
+        return [f"{metrics['Total Return']:.2%}", f"{metrics['Sharpe Ratio']:.2f}", f"{metrics['Max Drawdown']:.2%}"]
+
+    def create_sweep_window(self, param_names, metric, title="Sweep Results"):
+        window = tk.Toplevel(self.root)
+        window.title(f"{title} (ranked by {metric})")
+        columns = param_names + SWEEP_METRICS
+        tree = ttk.Treeview(window, columns=columns, show='headings', height=20)
+        for column in columns:
+            tree.heading(column, text=column)
+            tree.column(column, width=110, anchor=tk.E)
+        scrollbar = ttk.Scrollbar(window, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.grid(row=0, column=0, sticky=(tk.N, tk.S, tk.E, tk.W))
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        return window, tree
 
     def display_backtest_summary(self):
         summary_window = tk.Toplevel(self.root)
@@ -529,36 +3859,905 @@ class TradingPlatformGUI:
             logger.info(f"Loaded script from {script_path}")
 
     def run_custom_backtest(self):
-        if self.custom_script:
-            exec(open(self.custom_script).read())
-        else:
+        # Runs the editor contents (a loaded script, possibly edited) in a script worker process
+        source = self.custom_script_editor.get(1.0, tk.END)
+        if not source.strip():
             logger.warning("No script loaded.")
+            return
+        filename = self.custom_script or '<editor>'
+        ticker = self.ticker_entry.get().upper()
+        start_date = self.start_date_entry.get_date().strftime('%Y-%m-%d')
+        end_date = self.end_date_entry.get_date().strftime('%Y-%m-%d')
+        initial_cash = 100000
+        try:
+            compile(source, filename, 'exec')
+        except SyntaxError as exc:
+            self.metrics_text.insert(tk.END, f"Script error: {exc}\n")
+            return
+
+        def work(job):
+            job.progress(0, f"Fetching {ticker}")
+            data = DataHandler([ticker], start_date, end_date, cache=self.data_cache).fetch_data()
+            job.check_cancelled()
+            job.progress(0.5, "Running script")
+            return ticker, data, self.script_runner.run(source, data, initial_cash=initial_cash, filename=filename, job=job)
+
+        def show(outcome):
+            ticker, data, result = outcome
+            dashboard = MetricsDashboard()
+            dashboard.calculate_total_return(initial_cash, result['metrics']['Final Value'])
+            dashboard.calculate_all(result['values'], traded=traded_value(result['positions'], data['Open'].to_numpy()[:len(result['positions'])]))
+            dashboard.display_metrics(self.metrics_text)
+            self.show_chart(f"{ticker} ({result['strategy']})", data.iloc[:len(result['values'])], result['positions'],
+                            result['values'], result['cash'])
+
+        self.worker.submit(BackgroundJob(f"Script {os.path.basename(filename)} on {ticker}", work, on_done=show))
+
+    def run_paper_trading(self):
+        path = filedialog.askopenfilename(filetypes=[("Bar Files", "*.csv *.parquet *.pq"), ("All Files", "*.*")])
+        if not path:
+            return
+        try:
+            speed = float(self.speed_entry.get() or 0)
+        except ValueError:
+            self.metrics_text.insert(tk.END, "Replay speed must be a number\n")
+            return
+        try:
+            strategy_cls, params = self.get_strategy_params()
+        except ValueError as exc:
+            return self.report_input_error(exc)
+        ticker = os.path.splitext(os.path.basename(path))[0].upper()
+        initial_cash = 100000
+
+        def work(job):
+            def progress(trader):
+                job.check_cancelled()
+                stats = trader.stats()
+                job.progress(0, f"{stats['ticks']} bars, {stats['ticks_per_second']:.0f} bars/s, "
+                                f"value {trader.books[ticker]['value']:.2f}")
+
+            trader = PaperTrader(strategy_cls, initial_cash, record=True, **params)
+            report = trader.replay({ticker: path}, speed, on_progress=progress, progress_every=100 if speed else 10000)
+            return trader, report
+
+        def show(outcome):
+            trader, report = outcome
+            values = trader.values(ticker)
+            dashboard = MetricsDashboard()
+            if len(values) > 1:
+                dashboard.calculate_all(values)
+            dashboard.display_metrics(self.metrics_text)
+            stats = report['stats']
+            self.metrics_text.insert(tk.END, f"\nPaper traded {stats['ticks']} bars of {ticker} at {stats['ticks_per_second']:.0f} bars/s\n")
+            if 'latency_us' in stats:
+                self.metrics_text.insert(tk.END, f"Per-bar latency p50 {stats['latency_us']['p50']:.1f} us, "
+                                                 f"p99 {stats['latency_us']['p99']:.1f} us\n")
+            self.metrics_text.insert(tk.END, f"Holdings: {report['holdings']}, Cash: {report['cash']:.2f}\n")
+
+        self.worker.submit(BackgroundJob(f"Paper trading {strategy_cls.__name__} on {ticker}", work, on_done=show))
+
+# News Fetching: headlines for many tickers fetched concurrently on a bounded thread pool. Each worker thread
+# keeps its own requests.Session (connection reuse), every request has a timeout, and results are kept in a
+# TTL cache so repeated lookups within `ttl` seconds do not touch the network.
+GOOGLE_NEWS_URL = "https://news.google.com/search?q={ticker}"
+
+def parse_google_news(content):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, 'html.parser')
+    return [h.text for h in soup.find_all('a', class_='DY5T1d RZIKme')]
+
+class NewsFetcher:
+    def __init__(self, url_template=GOOGLE_NEWS_URL, parser=parse_google_news, ttl=900, timeout=10, max_workers=16):
+        self.url_template = url_template
+        self.parser = parser
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.executor = None
+
+    def _session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            import requests
+            session = requests.Session()
+            session.headers['User-Agent'] = 'Mozilla/5.0 (Flint&Steel)'
+            self.local.session = session
+        return session
+
+    def _cached(self, ticker):
+        with self.lock:
+            entry = self.cache.get(ticker)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                return entry[1]
+        return None
+
+    def _download(self, ticker):
+        url = self.url_template.format(ticker=urllib.parse.quote(ticker))
+        response = self._session().get(url, timeout=self.timeout)
+        response.raise_for_status()
+        headlines = self.parser(response.content)
+        with self.lock:
+            self.cache[ticker] = (time.monotonic(), headlines)
+        return headlines
+
+    def fetch(self, ticker):
+        headlines = self._cached(ticker)
+        return headlines if headlines is not None else self._download(ticker)
+
+    def fetch_many(self, tickers):
+        # Returns {ticker: headlines}; tickers whose request failed are logged and left out (and not cached)
+        results, pending = {}, []
+        for ticker in dict.fromkeys(tickers):
+            headlines = self._cached(ticker)
+            if headlines is None:
+                pending.append(ticker)
+            else:
+                results[ticker] = headlines
+        if pending:
+            with self.lock:
+                if self.executor is None:
+                    self.executor = concurrent.futures.ThreadPoolExecutor(self.max_workers, thread_name_prefix='news')
+            futures = {self.executor.submit(self._download, ticker): ticker for ticker in pending}
+            for future in concurrent.futures.as_completed(futures):
+                ticker = futures[future]
+                try:
+                    results[ticker] = future.result()
+                except Exception as exc:
+                    logger.warning(f"News fetch for {ticker} failed: {exc}")
+            logger.info(f"Fetched news for {len(pending)} tickers ({len(results)} of {len(tickers)} available)")
+        return results
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+# Process-wide fetcher so the cache is shared by every SentimentAnalysis
+news_fetcher = NewsFetcher()
+
+# Sentiment Lexicon: term -> weight. Terms match whole words (or whole phrases), ignoring case
+SENTIMENT_LEXICON = {'up': 1.0, 'good': 1.0, 'down': -1.0, 'bad': -1.0}
+
+# Batch Sentiment Scorer: all headlines are joined into one string and scanned once with a single compiled
+# word-boundary pattern that also matches the separators, so each match's headline is the number of separators
+# before it. A headline scores the sum of the weights of the terms it contains; whole-word matching means
+# "update" or "download" no longer count as "up" or "down".
+class SentimentScorer:
+    def __init__(self, lexicon=None):
+        lexicon = SENTIMENT_LEXICON if lexicon is None else lexicon
+        self.weights = {self._normalize(term): float(weight) for term, weight in lexicon.items()}
+        # Longest terms first so a phrase wins over a word it starts with. NUL separates headlines: it is a word
+        # boundary and not whitespace, so a phrase never spans two headlines
+        terms = sorted(self.weights, key=len, reverse=True)
+        alternatives = '|'.join(r'\s+'.join(map(re.escape, term.split())) for term in terms)
+        self.pattern = re.compile(rf"\0|\b(?:{alternatives})\b" if terms else r"\0")
+
+    @staticmethod
+    def _normalize(term):
+        return ' '.join(term.lower().split())
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r') as file:
+            return cls(json.load(file))
+
+    def score(self, headlines):
+        # Returns one score per headline
+        headlines = list(headlines)
+        if not headlines:
+            return np.zeros(0)
+        text = '\0'.join(headlines)
+        if text.count('\0') != len(headlines) - 1:
+            text = '\0'.join(headline.replace('\0', ' ') for headline in headlines)
+        # Lower-casing once is much cheaper than a case-insensitive scan (offsets are not needed, only order)
+        found = self.pattern.findall(text.lower())
+        lookup = {term: self.weights[self._normalize(term)] for term in set(found) if term != '\0'}
+        lookup['\0'] = np.nan
+        values = np.array([lookup[term] for term in found])
+        separators = np.isnan(values)
+        headline = np.cumsum(separators)
+        return np.bincount(headline[~separators], weights=values[~separators], minlength=len(headlines))
+
+    def score_tickers(self, news):
+        # {ticker: headlines} -> {ticker: per-headline score array}, scored in one pass over every headline
+        tickers = list(news)
+        counts = [len(news[ticker]) for ticker in tickers]
+        scores = self.score(headline for ticker in tickers for headline in news[ticker])
+        return dict(zip(tickers, np.split(scores, np.cumsum(counts)[:-1]))) if tickers else {}
+
+# Scorer used by SentimentAnalysis
+sentiment_scorer = SentimentScorer()
 
 # Sentiment Analysis Module
 class SentimentAnalysis:
-    def __init__(self, ticker):
+    def __init__(self, ticker, fetcher=None):
         self.ticker = ticker
-    
+        self.fetcher = fetcher or news_fetcher
+
     def fetch_news(self):
-        url = f"https://news.google.com/search?q={self.ticker}"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        headlines = [h.text for h in soup.find_all('a', class_='DY5T1d RZIKme')]
-        return headlines
-    
+        return self.fetcher.fetch(self.ticker)
+
+    @staticmethod
+    def score_headlines(headlines, scorer=None):
+        return float((scorer or sentiment_scorer).score(headlines).sum())
+
     def analyze_sentiment(self):
-        headlines = self.fetch_news()
-        sentiment_score = 0
-        for headline in headlines:
-            if "up" in headline or "good" in headline:
-                sentiment_score += 1
-            elif "down" in headline or "bad" in headline:
-                sentiment_score -= 1
+        sentiment_score = self.score_headlines(self.fetch_news())
         logger.info(f"Sentiment score for {self.ticker}: {sentiment_score}")
         return sentiment_score
 
-# Example usage of the GUI
-if __name__ == "__main__":
+    @staticmethod
+    def analyze_many(tickers, fetcher=None, scorer=None):
+        # Scores a whole watchlist from one concurrent fetch; tickers whose news could not be fetched are omitted
+        news = (fetcher or news_fetcher).fetch_many(tickers)
+        scores = (scorer or sentiment_scorer).score_tickers({ticker: news[ticker] for ticker in tickers if ticker in news})
+        return {ticker: float(values.sum()) for ticker, values in scores.items()}
+
+# Benchmark Suite: times the strategies, metrics, portfolio bookkeeping and data loading on seeded synthetic data,
+# so runs are reproducible and need no network. Results are JSON; a stored baseline flags regressions.
+BENCHMARK_DIR = os.path.join(os.path.expanduser('~'), '.flint_steel', 'benchmarks')
+BENCHMARK_GROUPS = ['strategies', 'metrics', 'portfolio', 'data', 'checkpoint']
+
+# Seeded random-walk OHLCV bars (one frame per ticker, minute bars by default so 10M bars stay within pandas' date range)
+def synthetic_ohlcv(bars, tickers=1, seed=0, start='2000-01-03', freq='min'):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=bars, freq=freq, tz='UTC', name='Date')
+    frames = {}
+    for j in range(tickers):
+        close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.001, bars)))
+        open_ = np.empty(bars)
+        open_[0] = 100.0
+        open_[1:] = close[:-1] * np.exp(rng.normal(0.0, 0.0002, bars - 1))
+        high = np.maximum(open_, close) * (1 + rng.random(bars) * 0.001)
+        low = np.minimum(open_, close) * (1 - rng.random(bars) * 0.001)
+        volume = rng.integers(100, 10000, bars).astype(np.float64)
+        frames[f"SYN{j}"] = pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close,
+                                          'Adj Close': close, 'Volume': volume}, index=dates)
+    return frames
+
+class BenchmarkSuite:
+    def __init__(self, bars=100000, tickers=1, seed=0, repeat=3, backtrader_bars=20000, groups=None):
+        self.bars = bars
+        self.tickers = tickers
+        self.seed = seed
+        self.repeat = repeat
+        # Cerebro runs bar by bar in Python, so it is timed on the last `backtrader_bars` bars only (0 skips it)
+        self.backtrader_bars = min(backtrader_bars, bars)
+        self.groups = groups or BENCHMARK_GROUPS
+        self.results = {}
+        # Named pass/fail checks between timings (e.g. a resume beating a full run); a failed one fails the benchmark
+        self.checks = {}
+
+    def time(self, name, func, units, setup=None):
+        # Best and median wall time of `repeat` runs; `setup` runs untimed before each one
+        times = []
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - started)
+        best = min(times)
+        self.results[name] = {'seconds': best, 'median': float(np.median(times)), 'units': units,
+                              'ns_per_unit': best / max(units, 1) * 1e9}
+        logger.info(f"{name}: {best:.4f}s ({self.results[name]['ns_per_unit']:.1f} ns per unit)")
+
+    def run(self):
+        frames = synthetic_ohlcv(self.bars, self.tickers, self.seed)
+        for group in self.groups:
+            getattr(self, f"bench_{group}")(frames)
+        return self.report()
+
+    def bench_strategies(self, frames):
+        # The indicator cache is cleared before every run so each timing includes the indicator computation
+        units = self.bars * len(frames)
+        for name, strategy_cls in STRATEGIES.items():
+            self.time(f"strategy.vectorized.{name}",
+                      lambda: [VectorizedBacktest(strategy_cls).run(frame) for frame in frames.values()],
+                      units, setup=indicator_cache.clear)
+        if self.backtrader_bars:
+            tail = {ticker: frame.iloc[-self.backtrader_bars:] for ticker, frame in frames.items()}
+            for name, strategy_cls in STRATEGIES.items():
+                self.time(f"strategy.backtrader.{name}",
+                          lambda: [run_strategy_values(frame, strategy_cls, {}, engine='backtrader') for frame in tail.values()],
+                          self.backtrader_bars * len(tail), setup=indicator_cache.clear)
+        indicator_cache.clear()
+
+    def bench_metrics(self, frames):
+        equity = np.column_stack([frame['Close'].to_numpy() for frame in frames.values()]) * 1000.0
+        dashboard = MetricsDashboard()
+        self.time('metrics.calculate_all', lambda: [dashboard.calculate_all(equity[:, j], periods_per_year=PERIODS_PER_YEAR['1m'])
+                                                    for j in range(equity.shape[1])], equity.size)
+        self.time('metrics.batch_metrics', lambda: batch_metrics(equity, PERIODS_PER_YEAR['1m']), equity.size)
+        self.time('metrics.rolling_metrics', lambda: rolling_metrics(equity, 390, PERIODS_PER_YEAR['1m']), equity.size)
+
+    def bench_portfolio(self, frames):
+        tickers = list(frames)
+        closes = np.column_stack([frames[ticker]['Close'].to_numpy() for ticker in tickers])
+        dates = next(iter(frames.values())).index
+        # Alternating one-unit buys and sells, cycling through the tickers
+        trades = min(self.bars, 100000)
+        ticker_ids = np.arange(trades) % len(tickers)
+        amounts = np.where((np.arange(trades) // len(tickers)) % 2 == 0, 1.0, -1.0)
+        prices = closes[np.arange(trades), ticker_ids]
+
+        def trade_one_by_one():
+            portfolio = Portfolio(1e12, log_trades=False)
+            for i in range(trades):
+                if amounts[i] > 0:
+                    portfolio.buy(tickers[ticker_ids[i]], prices[i], 1.0, dates[i])
+                else:
+                    portfolio.sell(tickers[ticker_ids[i]], prices[i], 1.0, dates[i])
+
+        portfolio = Portfolio(1e12, log_trades=False)
+        trade_tickers = [tickers[i] for i in ticker_ids]
+        self.time('portfolio.buy_sell', trade_one_by_one, trades)
+        self.time('portfolio.record_trades', lambda: Portfolio(1e12, log_trades=False).record_trades(
+            dates[:trades], trade_tickers, prices, amounts), trades)
+        portfolio.record_trades(dates[:trades], trade_tickers, prices, amounts)
+        self.time('portfolio.portfolio_value', lambda: portfolio.portfolio_value(closes), closes.size)
+        self.time('portfolio.pnl', lambda: portfolio.pnl(closes[-1]), trades)
+
+    def bench_data(self, frames):
+        import tempfile
+        import shutil
+        units = self.bars * len(frames)
+        sample = next(iter(frames.values()))
+        start = sample.index[0].strftime('%Y-%m-%d')
+        end = (sample.index[-1] + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+
+        def synthetic_fetcher(ticker, lo, hi, interval):
+            frame = frames[ticker]
+            return frame[(frame.index >= pd.Timestamp(lo, tz='UTC')) & (frame.index < pd.Timestamp(hi, tz='UTC'))]
+
+        workdir = tempfile.mkdtemp(prefix='flint_bench_')
+        try:
+            cache_dir = os.path.join(workdir, 'cache')
+            reset_cache = lambda: shutil.rmtree(cache_dir, ignore_errors=True)
+            self.time('data.cache_cold', lambda: OHLCVCache(cache_dir, synthetic_fetcher).get_many(list(frames), start, end, '1m'),
+                      units, setup=reset_cache)
+            self.time('data.cache_warm', lambda: OHLCVCache(cache_dir, synthetic_fetcher).get_many(list(frames), start, end, '1m'), units)
+            self.time('data.price_panel', lambda: PricePanel.from_frames(frames), units)
+
+            csv_file = os.path.join(workdir, 'bars.csv')
+            sample.to_csv(csv_file)
+            store_dir = os.path.join(workdir, 'store')
+            self.time('data.import_csv', lambda: import_bars(csv_file, store_dir),
+                      self.bars, setup=lambda: shutil.rmtree(store_dir, ignore_errors=True))
+            store = BarStore(store_dir)
+            self.time('data.bar_store_frame', lambda: store.frame(), self.bars)
+            self.time('data.bar_store_chunks', lambda: sum(len(chunk[0]) for chunk in store.chunks(100000)), self.bars)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def bench_checkpoint(self, frames):
+        # A checkpointed run over the last `backtrader_bars` bars from scratch, against one resumed from the
+        # checkpoint of the same bars less one trading day (390 minute bars)
+        import tempfile
+        import shutil
+        if not self.backtrader_bars:
+            return
+        frame = next(iter(frames.values())).iloc[-self.backtrader_bars:]
+        new_bars = max(1, min(390, len(frame) // 10))
+        workdir = tempfile.mkdtemp(prefix='flint_bench_')
+        try:
+            store = CheckpointStore(workdir)
+            run = lambda bars: run_checkpointed(bars, MovingAverageStrategy, store=store, interval='1m',
+                                                periods_per_year=PERIODS_PER_YEAR['1m'])
+            reset = lambda: [os.remove(os.path.join(workdir, name)) for name in os.listdir(workdir)]
+            self.time('checkpoint.full_run', lambda: run(frame), len(frame), setup=reset)
+            self.time('checkpoint.resume', lambda: run(frame), new_bars, setup=lambda: (reset(), run(frame.iloc[:-new_bars])))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        full, resume = self.results['checkpoint.full_run']['seconds'], self.results['checkpoint.resume']['seconds']
+        self.results['checkpoint.resume']['speedup'] = full / resume if resume > 0 else math.inf
+        self.checks['checkpoint.resume_beats_full_run'] = resume < full
+
+    def report(self):
+        import platform
+        return {'config': {'bars': self.bars, 'tickers': self.tickers, 'seed': self.seed, 'repeat': self.repeat,
+                           'backtrader_bars': self.backtrader_bars},
+                'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                            'processor': platform.processor(), 'cpus': os.cpu_count(), 'numpy': np.__version__,
+                            'pandas': pd.__version__, 'backtrader': bt.__version__},
+                'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+                'results': self.results, 'checks': self.checks}
+
+# Benchmarks whose best time grew by more than `tolerance` (relative) over the baseline. Differences under
+# `min_seconds` are ignored since they are within timer noise.
+def compare_benchmarks(report, baseline, tolerance=0.2, min_seconds=0.001):
+    workload = ('bars', 'tickers', 'seed', 'backtrader_bars')
+    if any(report['config'][key] != baseline['config'].get(key) for key in workload):
+        raise ValueError(f"Baseline was recorded with {baseline['config']}, not {report['config']}")
+    if report['machine'] != baseline['machine']:
+        logger.warning("Baseline was recorded on a different machine or library versions; timings may not be comparable")
+    regressions = []
+    for name, result in report['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            continue
+        ratio = result['seconds'] / reference['seconds'] if reference['seconds'] > 0 else math.inf
+        result['baseline'] = reference['seconds']
+        result['change'] = ratio - 1
+        if ratio > 1 + tolerance and result['seconds'] - reference['seconds'] > min_seconds:
+            result['regression'] = True
+            regressions.append(name)
+    return regressions
+
+def benchmark_baseline_path(bars, tickers, seed):
+    return os.path.join(BENCHMARK_DIR, f"baseline_{bars}x{tickers}_seed{seed}.json")
+
+# Headless Backtest Runner
+def resolve_strategy(name):
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    for strategy_cls in STRATEGIES.values():
+        if name in (strategy_cls.__name__, strategy_cls.__name__[:-len('Strategy')]):
+            return strategy_cls
+    raise ValueError(f"Unknown strategy '{name}'. Choose from: {', '.join(STRATEGIES)}")
+
+def cast_strategy_params(strategy_cls, params):
+    # Values from the command line arrive as strings; cast them to the type of the strategy default
+    defaults = dict(strategy_cls.params._getitems())
+    cast = {}
+    for name, value in params.items():
+        if name not in defaults:
+            raise ValueError(f"Unknown parameter '{name}' for {strategy_cls.__name__}")
+        default = defaults[name]
+        if isinstance(value, str):
+            if isinstance(default, bool):
+                value = value.lower() in ('1', 'true', 'yes')
+            elif isinstance(default, int):
+                value = int(value)
+            elif isinstance(default, float):
+                value = float(value)
+        cast[name] = value
+    return cast
+
+# Metrics of one run, read from the results store when the identical run was stored before
+def run_backtest(data, strategy_cls, params=None, initial_cash=100000, engine='backtrader', periods_per_year=TRADING_DAYS,
+                 timer=None, store=None, bootstrap=None, checkpoints=None, **info):
+    # bootstrap: keyword arguments of bootstrap_result, adding its confidence intervals under 'Robustness'.
+    # checkpoints: a CheckpointStore that Backtrader runs of streaming strategies resume from (see run_checkpointed)
+    params = params or {}
+    result = metrics = None
+    if store is not None:
+        key = store.key(data, strategy_cls, params, initial_cash, engine, periods_per_year)
+        with timed(timer, 'store'):
+            if bootstrap is None:
+                metrics = store.metrics(key)
+            else:
+                result, metrics = store.load(key) or (None, None)
+    if metrics is None:
+        if checkpoints is not None and engine == 'backtrader' and hasattr(strategy_cls, 'stream_signals'):
+            result, _ = run_checkpointed(data, strategy_cls, params, initial_cash, periods_per_year, checkpoints,
+                                         info.get('ticker', 'data'), info.get('start'), info.get('interval', '1d'), timer)
+        else:
+            result = run_strategy(data, strategy_cls, params, initial_cash, engine, timer)
+        with timed(timer, 'metrics'):
+            metrics = backtest_metrics(result, data, initial_cash, periods_per_year)
+        if store is not None:
+            with timed(timer, 'store'):
+                store.save(key, result, metrics, strategy=strategy_cls.__name__, params=params, engine=engine, **info)
+    if bootstrap is not None:
+        with timed(timer, 'bootstrap'):
+            metrics['Robustness'] = bootstrap_result(result, periods_per_year, **bootstrap)
+    return metrics
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog='Flint&Steel.py', description="Flint&Steel Backtesting Platform")
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('gui', help="Launch the Tkinter GUI (default)")
+
+    backtest = subparsers.add_parser('backtest', help="Run a backtest headlessly and write the metrics as JSON")
+    backtest.add_argument('--config', help="JSON file with any of: strategy, tickers, start, end, params, cash, engine, interval")
+    backtest.add_argument('--strategy', help=f"One of: {', '.join(STRATEGIES)} (or the class name)")
+    backtest.add_argument('--tickers', nargs='+')
+    backtest.add_argument('--start', help="Start date (YYYY-MM-DD)")
+    backtest.add_argument('--end', help="End date (YYYY-MM-DD, exclusive)")
+    backtest.add_argument('--param', action='append', default=[], metavar='NAME=VALUE', help="Strategy parameter, repeatable")
+    backtest.add_argument('--cash', type=float)
+    backtest.add_argument('--engine', choices=['backtrader', 'vectorized'])
+    backtest.add_argument('--interval')
+    backtest.add_argument('--portfolio', action='store_true', help="Run all tickers as one portfolio sharing cash")
+    backtest.add_argument('--allocation', choices=['equal', 'fixed'], help="Portfolio allocation rule")
+    backtest.add_argument('--weight', action='append', default=[], metavar='TICKER=WEIGHT', help="Fixed allocation weight, repeatable")
+    backtest.add_argument('--rebalance', type=int, help="Portfolio rebalance period in bars (0 = only on signal changes)")
+    backtest.add_argument('--cache-dir', default=CACHE_DIR)
+    backtest.add_argument('--script', help="Python file defining a bt.Strategy subclass, run in an isolated worker process")
+    backtest.add_argument('--cpu-seconds', type=int, default=120, help="CPU time limit per --script run")
+    backtest.add_argument('--memory-mb', type=int, default=2048, help="Memory limit per --script run")
+    backtest.add_argument('--wall-seconds', type=int, default=600, help="Wall-clock limit per --script run (covers scripts that block)")
+    backtest.add_argument('--data', help="Stream bars from a local bar store (see `import`) instead of downloading")
+    backtest.add_argument('--chunk-size', type=int, default=100000, help="Bars read per chunk with --data")
+    backtest.add_argument('--results-dir', default=RESULTS_DIR, help="Results store; identical runs are read from it")
+    backtest.add_argument('--no-store', action='store_true', help="Always recompute and do not store the results")
+    backtest.add_argument('--checkpoint-dir', default=CHECKPOINT_DIR,
+                          help="Checkpoints of backtrader runs; a later --end resumes from them and runs only the new bars")
+    backtest.add_argument('--no-checkpoint', action='store_true', help="Replay the full history in cerebro")
+    backtest.add_argument('--bootstrap', type=int, metavar='PATHS', help="Add bootstrap confidence intervals from this many resampled paths")
+    backtest.add_argument('--bootstrap-on', choices=['returns', 'trades'], default='returns', help="Resample per-bar returns or per-trade returns")
+    backtest.add_argument('--block-size', type=int, help="Bootstrap block length in bars (0 = automatic, default: 1)")
+    backtest.add_argument('--confidence', type=float, default=0.95, help="Bootstrap confidence level")
+    backtest.add_argument('--seed', type=int, help="Bootstrap random seed")
+    backtest.add_argument('--timings', help="Write per-phase timings here (a Chrome trace if it ends in .trace.json, else JSON)")
+    backtest.add_argument('--profile', help="Write a cProfile capture (.prof) here and count strategy next() calls")
+    backtest.add_argument('--output', help="Write the JSON report here instead of stdout")
+    backtest.add_argument('--quiet', action='store_true', help="Only log warnings and errors")
+
+    importer = subparsers.add_parser('import', help="Import a local CSV or Parquet file of bars into a bar store")
+    importer.add_argument('source', help="CSV or Parquet file with a date column and open/high/low/close[/volume]")
+    importer.add_argument('dest', help="Directory of the bar store to create")
+    importer.add_argument('--date-column', help="Name of the date column (default: date/datetime/time/timestamp)")
+    importer.add_argument('--tz', help="Timezone of naive timestamps in the file (default: UTC)")
+    importer.add_argument('--name', help="Instrument name (default: the file name)")
+    importer.add_argument('--chunk-rows', type=int, default=500000, help="Rows read from the file at a time")
+    importer.add_argument('--quiet', action='store_true', help="Only log warnings and errors")
+
+    sentiment = subparsers.add_parser('sentiment', help="Score news sentiment for many tickers concurrently")
+    sentiment.add_argument('--tickers', nargs='+', default=[])
+    sentiment.add_argument('--tickers-file', help="File with one ticker per line (or comma separated)")
+    sentiment.add_argument('--url', default=GOOGLE_NEWS_URL, help="News search URL template containing {ticker}")
+    sentiment.add_argument('--timeout', type=float, default=10, help="Per-request timeout in seconds")
+    sentiment.add_argument('--workers', type=int, default=16, help="Maximum concurrent requests")
+    sentiment.add_argument('--lexicon', help="JSON file mapping words or phrases to weights")
+    sentiment.add_argument('--corpus', help="Score archived headlines from a CSV (ticker, headline) instead of fetching")
+    sentiment.add_argument('--output', help="Write the JSON report here instead of stdout")
+    sentiment.add_argument('--quiet', action='store_true', help="Only log warnings and errors")
+
+    paper = subparsers.add_parser('paper', help="Paper trade a strategy on bars replayed from local files")
+    paper.add_argument('--strategy', required=True, help=f"One of: {', '.join(STRATEGIES)} (or the class name)")
+    paper.add_argument('--source', action='append', required=True, metavar='[TICKER=]PATH',
+                       help="Bar store directory (see `import`) or CSV/Parquet file to replay, repeatable")
+    paper.add_argument('--speed', type=float, default=0, help="Seconds of market time replayed per second (0 = as fast as possible)")
+    paper.add_argument('--param', action='append', default=[], metavar='NAME=VALUE', help="Strategy parameter, repeatable")
+    paper.add_argument('--cash', type=float, default=100000)
+    paper.add_argument('--interval', default='1d', help="Bar interval, used to annualise the metrics")
+    paper.add_argument('--tz', help="Timezone of naive timestamps in CSV/Parquet files (default: UTC)")
+    paper.add_argument('--chunk-rows', type=int, default=100000, help="Rows read from a source at a time")
+    paper.add_argument('--output', help="Write the JSON report here instead of stdout")
+    paper.add_argument('--quiet', action='store_true', help="Only log warnings and errors")
+
+    screen = subparsers.add_parser('screen', help="Run one strategy configuration on every ticker of a universe and rank them")
+    screen.add_argument('--strategy', required=True, help=f"One of: {', '.join(STRATEGIES)} (or the class name)")
+    screen.add_argument('--universe', help="File with one ticker per line (or comma separated)")
+    screen.add_argument('--tickers', nargs='+', default=[])
+    screen.add_argument('--start', required=True, help="Start date (YYYY-MM-DD)")
+    screen.add_argument('--end', required=True, help="End date (YYYY-MM-DD, exclusive)")
+    screen.add_argument('--param', action='append', default=[], metavar='NAME=VALUE', help="Strategy parameter, repeatable")
+    screen.add_argument('--cash', type=float, default=100000)
+    screen.add_argument('--engine', choices=['backtrader', 'vectorized'], default='vectorized')
+    screen.add_argument('--interval', default='1d')
+    screen.add_argument('--metric', choices=METRIC_NAMES, default='Sharpe Ratio', help="Rank tickers by this metric")
+    screen.add_argument('--processes', type=int, help="Worker processes (default: one per core)")
+    screen.add_argument('--top', type=int, default=20, help="Rows of the ranking printed to stderr while the screen runs")
+    screen.add_argument('--refresh', type=float, default=1.0, help="Seconds between updates of the printed ranking")
+    screen.add_argument('--cache-dir', default=CACHE_DIR)
+    screen.add_argument('--output', help="Write the JSON report here instead of stdout")
+    screen.add_argument('--quiet', action='store_true', help="Only log warnings and errors, and print no ranking")
+
+    results = subparsers.add_parser('results', help="Query stored backtest runs")
+    results.add_argument('--ticker')
+    results.add_argument('--strategy', help=f"One of: {', '.join(STRATEGIES)} (or the class name)")
+    results.add_argument('--metric', choices=METRIC_NAMES + ['Final Value', 'Trades'], help="Rank runs by this metric")
+    results.add_argument('--min', type=float, help="Only runs with --metric at least this")
+    results.add_argument('--max', type=float, help="Only runs with --metric at most this")
+    results.add_argument('--limit', type=int, default=50)
+    results.add_argument('--results-dir', default=RESULTS_DIR)
+    results.add_argument('--output', help="Write the JSON report here instead of stdout")
+    results.add_argument('--quiet', action='store_true', help="Only log warnings and errors")
+
+    benchmark = subparsers.add_parser('benchmark', help="Time strategies, metrics, portfolio and data loading on synthetic data")
+    benchmark.add_argument('--bars', type=int, default=100000, help="Bars per synthetic ticker")
+    benchmark.add_argument('--tickers', type=int, default=1, help="Number of synthetic tickers")
+    benchmark.add_argument('--seed', type=int, default=0)
+    benchmark.add_argument('--repeat', type=int, default=3, help="Runs per benchmark (the best time is reported)")
+    benchmark.add_argument('--backtrader-bars', type=int, default=20000, help="Bars used for the cerebro timings (0 skips them)")
+    benchmark.add_argument('--only', nargs='+', choices=BENCHMARK_GROUPS, help="Run only these benchmark groups")
+    benchmark.add_argument('--baseline', help="Baseline JSON to compare against (default: stored baseline for this size and seed)")
+    benchmark.add_argument('--save-baseline', action='store_true', help="Store this run as the baseline")
+    benchmark.add_argument('--tolerance', type=float, default=0.2, help="Relative slowdown flagged as a regression")
+    benchmark.add_argument('--output', help="Write the JSON report here instead of stdout")
+    benchmark.add_argument('--quiet', action='store_true', help="Only log warnings and errors")
+    return parser
+
+def load_backtest_config(args):
+    config = {'engine': 'backtrader', 'cash': 100000, 'interval': '1d', 'params': {},
+              'portfolio': False, 'allocation': 'equal', 'weights': {}, 'rebalance': 21}
+    if args.config:
+        with open(args.config, 'r') as file:
+            config.update(json.load(file))
+    for key in ('strategy', 'tickers', 'start', 'end', 'cash', 'engine', 'interval', 'allocation', 'rebalance', 'data', 'script'):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    config['portfolio'] = config['portfolio'] or args.portfolio
+    for item in args.weight:
+        if '=' not in item:
+            raise ValueError(f"Weights must be TICKER=WEIGHT, got '{item}'")
+        ticker, weight = item.split('=', 1)
+        config['weights'][ticker.strip()] = float(weight)
+    for item in args.param:
+        if '=' not in item:
+            raise ValueError(f"Parameters must be NAME=VALUE, got '{item}'")
+        name, value = item.split('=', 1)
+        config['params'][name.strip()] = value.strip()
+    # A local bar store replaces the download, so tickers and dates are optional with --data
+    required = ('strategy',) if config.get('data') else ('strategy', 'tickers', 'start', 'end')
+    if config.get('script'):
+        required = tuple(key for key in required if key != 'strategy')
+    missing = [key for key in required if not config.get(key)]
+    if missing:
+        raise ValueError(f"Missing required settings: {', '.join(missing)}")
+    if isinstance(config.get('tickers'), str):
+        config['tickers'] = [config['tickers']]
+    return config
+
+def write_report(args, report):
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+    else:
+        sys.stdout.write(text + '\n')
+
+def run_backtest_command(args):
+    config = load_backtest_config(args)
+    if config.get('script'):
+        return run_script_command(args, config)
+    strategy_cls = resolve_strategy(config['strategy'])
+    params = cast_strategy_params(strategy_cls, config['params'])
+    if config.get('data'):
+        return run_bar_store_command(args, config, strategy_cls, params)
+    cache = OHLCVCache(args.cache_dir)
+    if config['portfolio']:
+        return run_portfolio_command(args, config, strategy_cls, params, cache)
+
+    results = {}
+    failed = False
+    timer = PhaseTimer(next_calls=bool(args.profile), profile=bool(args.profile)) if args.timings or args.profile else None
+    store = None if args.no_store else ResultStore(args.results_dir)
+    checkpoints = None if args.no_checkpoint or config['engine'] != 'backtrader' else CheckpointStore(args.checkpoint_dir)
+    bootstrap = None
+    if args.bootstrap:
+        bootstrap = {'on': args.bootstrap_on, 'paths': args.bootstrap, 'block_size': args.block_size,
+                     'confidence': args.confidence, 'seed': args.seed}
+    for ticker in config['tickers']:
+        try:
+            with timed(timer, ticker):
+                with timed(timer, 'fetch'):
+                    data = DataHandler([ticker], config['start'], config['end'], config['interval'], cache).fetch_data()
+                if data.empty:
+                    raise ValueError(f"No data for {ticker} between {config['start']} and {config['end']}")
+                results[ticker] = run_backtest(data, strategy_cls, params, config['cash'], config['engine'],
+                                               PERIODS_PER_YEAR.get(config['interval'], TRADING_DAYS), timer, store, bootstrap,
+                                               checkpoints, ticker=ticker, start=config['start'], end=config['end'], interval=config['interval'])
+        except Exception as exc:
+            logger.error(f"Backtest for {ticker} failed: {exc}")
+            results[ticker] = {'error': f"{type(exc).__name__}: {exc}"}
+            failed = True
+
+    report = {'strategy': strategy_cls.__name__, 'params': params, 'start': config['start'], 'end': config['end'],
+              'interval': config['interval'], 'engine': config['engine'], 'cash': config['cash'], 'results': results}
+    if timer is not None:
+        report['timings'] = timer.to_dict()
+        for path in (args.timings, args.profile):
+            if path:
+                timer.export(path)
+    write_report(args, report)
+    return 1 if failed else 0
+
+def run_script_command(args, config):
+    with open(config['script'], 'r') as file:
+        source = file.read()
+    runner = ScriptRunner(processes=1, cpu_seconds=args.cpu_seconds, memory_mb=args.memory_mb, wall_seconds=args.wall_seconds)
+    cache = OHLCVCache(args.cache_dir)
+    results, strategy_name, failed = {}, None, False
+    try:
+        for ticker in config['tickers']:
+            try:
+                data = DataHandler([ticker], config['start'], config['end'], config['interval'], cache).fetch_data()
+                if data.empty:
+                    raise ValueError(f"No data for {ticker} between {config['start']} and {config['end']}")
+                result = runner.run(source, data, config['params'], config['cash'],
+                                    PERIODS_PER_YEAR.get(config['interval'], TRADING_DAYS), filename=config['script'])
+                strategy_name = result['strategy']
+                results[ticker] = result['metrics']
+            except Exception as exc:
+                logger.error(f"Script backtest for {ticker} failed: {exc}")
+                results[ticker] = {'error': f"{type(exc).__name__}: {exc}"}
+                failed = True
+    finally:
+        runner.close()
+    report = {'strategy': strategy_name, 'script': config['script'], 'params': config['params'], 'start': config['start'],
+              'end': config['end'], 'interval': config['interval'], 'engine': 'script', 'cash': config['cash'], 'results': results}
+    write_report(args, report)
+    return 1 if failed else 0
+
+def run_bar_store_command(args, config, strategy_cls, params):
+    store = BarStore(config['data'])
+    metrics = run_bar_store(store, strategy_cls, params, config['cash'], PERIODS_PER_YEAR.get(config['interval'], TRADING_DAYS),
+                            args.chunk_size, config.get('start'), config.get('end'))
+    report = {'strategy': strategy_cls.__name__, 'params': params, 'start': config.get('start'), 'end': config.get('end'),
+              'interval': config['interval'], 'engine': 'backtrader-streaming', 'cash': config['cash'],
+              'data': config['data'], 'results': {store.meta['name'] or 'data': metrics}}
+    write_report(args, report)
+    return 0
+
+def run_import_command(args):
+    store = import_bars(args.source, args.dest, args.chunk_rows, args.date_column, args.tz, args.name)
+    first, last = store.index(0, 1), store.index(len(store) - 1, len(store))
+    sys.stdout.write(json.dumps({'store': args.dest, 'name': store.meta['name'], 'bars': len(store), 'columns': store.columns,
+                                 'first': str(pd.Timestamp(int(first[0]), tz='UTC')), 'last': str(pd.Timestamp(int(last[0]), tz='UTC'))}, indent=2) + '\n')
+    return 0
+
+def run_portfolio_command(args, config, strategy_cls, params, cache):
+    panel = DataHandler(config['tickers'], config['start'], config['end'], config['interval'], cache).fetch_panel()
+    backtest = PortfolioBacktest(None if strategy_cls is BuyAndHoldStrategy else strategy_cls, config['cash'],
+                                 allocation=config['allocation'], weights=config['weights'],
+                                 rebalance=config['rebalance'] or None, **params)
+    result = backtest.run(panel)
+    metrics = compute_run_metrics(result.value, config['cash'], PERIODS_PER_YEAR.get(config['interval'], TRADING_DAYS),
+                                  traded_value=traded_value(result.position, panel['Open']))
+    metrics.update({'Final Value': result.final_value, 'Bars': len(panel.dates), 'Trades': len(result.trades)})
+    missing = sorted(set(config['tickers']) - set(panel.tickers))
+    report = {'strategy': strategy_cls.__name__, 'params': params, 'start': config['start'], 'end': config['end'],
+              'interval': config['interval'], 'engine': 'portfolio', 'cash': config['cash'],
+              'allocation': config['allocation'], 'rebalance': config['rebalance'], 'tickers': panel.tickers,
+              'missing': missing, 'results': {'portfolio': metrics}}
+    write_report(args, report)
+    return 0
+
+def read_ticker_file(path):
+    with open(path, 'r') as file:
+        return [ticker.strip().upper() for line in file for ticker in line.split(',') if ticker.strip()]
+
+def score_corpus(path, scorer):
+    # Archived headlines: a CSV with `ticker` and `headline` columns (plus anything else, e.g. a date)
+    corpus = pd.read_csv(path)
+    missing = {'ticker', 'headline'} - set(corpus.columns)
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(sorted(missing))}")
+    corpus['score'] = scorer.score(corpus['headline'].fillna('').astype(str))
+    totals = corpus.groupby('ticker')['score'].agg(['sum', 'count'])
+    return {'scores': totals['sum'].to_dict(), 'headlines': totals['count'].to_dict()}
+
+def run_sentiment_command(args):
+    scorer = SentimentScorer.from_file(args.lexicon) if args.lexicon else sentiment_scorer
+    if args.corpus:
+        write_report(args, score_corpus(args.corpus, scorer))
+        return 0
+    tickers = list(dict.fromkeys(args.tickers + (read_ticker_file(args.tickers_file) if args.tickers_file else [])))
+    if not tickers:
+        raise ValueError("No tickers given (use --tickers, --tickers-file or --corpus)")
+    fetcher = NewsFetcher(args.url, timeout=args.timeout, max_workers=args.workers)
+    try:
+        scores = SentimentAnalysis.analyze_many(tickers, fetcher, scorer)
+    finally:
+        fetcher.close()
+    write_report(args, {'scores': scores, 'failed': [ticker for ticker in tickers if ticker not in scores]})
+    return 0 if len(scores) == len(tickers) else 1
+
+def run_screen_command(args):
+    strategy_cls = resolve_strategy(args.strategy)
+    params = {}
+    for item in args.param:
+        if '=' not in item:
+            raise ValueError(f"Parameters must be NAME=VALUE, got '{item}'")
+        name, value = item.split('=', 1)
+        params[name.strip()] = value.strip()
+    params = cast_strategy_params(strategy_cls, params)
+    tickers = list(dict.fromkeys([ticker.upper() for ticker in args.tickers] + (read_ticker_file(args.universe) if args.universe else [])))
+    if not tickers:
+        raise ValueError("No tickers given (use --universe or --tickers)")
+    panel = DataHandler(tickers, args.start, args.end, args.interval, OHLCVCache(args.cache_dir)).fetch_panel()
+    screen = UniverseScreen(strategy_cls, params, args.cash, args.engine, PERIODS_PER_YEAR.get(args.interval, TRADING_DAYS),
+                            args.processes)
+    # The ranking so far is reprinted to stderr at most every --refresh seconds; the JSON report is written at the end
+    results, shown = [], time.monotonic()
+    for result in screen.run(panel):
+        results.append(result)
+        if not args.quiet and time.monotonic() - shown >= args.refresh:
+            shown = time.monotonic()
+            table = format_screen_table(UniverseScreen.rank(results, args.metric), args.metric, args.top)
+            sys.stderr.write(f"\nScreened {len(results)}/{len(panel.tickers)} tickers\n{table}\n")
+    ranked = UniverseScreen.rank(results, args.metric)
+    if not args.quiet:
+        sys.stderr.write(f"\nScreened {len(results)}/{len(panel.tickers)} tickers\n{format_screen_table(ranked, args.metric, args.top)}\n")
+    report = {'strategy': strategy_cls.__name__, 'params': params, 'start': args.start, 'end': args.end,
+              'interval': args.interval, 'engine': args.engine, 'cash': args.cash, 'metric': args.metric,
+              'ranking': [dict(ticker=ticker, **metrics) for ticker, metrics in ranked], 'failed': screen.failed,
+              'missing': sorted(set(tickers) - set(panel.tickers))}
+    write_report(args, report)
+    return 1 if screen.failed else 0
+
+def run_paper_command(args):
+    strategy_cls = resolve_strategy(args.strategy)
+    params = {}
+    for item in args.param:
+        if '=' not in item:
+            raise ValueError(f"Parameters must be NAME=VALUE, got '{item}'")
+        name, value = item.split('=', 1)
+        params[name.strip()] = value.strip()
+    sources = {}
+    for item in args.source:
+        ticker, path = item.split('=', 1) if '=' in item else (os.path.splitext(os.path.basename(item.rstrip(os.sep)))[0], item)
+        if not os.path.exists(path):
+            raise ValueError(f"No bar store or file at {path}")
+        sources[ticker.upper()] = path
+
+    def log_progress(trader):
+        stats = trader.stats()
+        logger.info(f"{stats['ticks']} bars, {stats['ticks_per_second']:.0f} bars/s")
+
+    params = cast_strategy_params(strategy_cls, params)
+    trader = PaperTrader(strategy_cls, args.cash, PERIODS_PER_YEAR.get(args.interval, TRADING_DAYS), **params)
+    report = trader.replay(sources, args.speed, args.chunk_rows, args.tz, on_progress=log_progress, progress_every=100000)
+    report.update({'params': params, 'speed': args.speed, 'sources': sources})
+    write_report(args, report)
+    return 0
+
+def run_results_command(args):
+    if (args.min is not None or args.max is not None) and not args.metric:
+        raise ValueError("--min and --max need --metric")
+    strategy = resolve_strategy(args.strategy).__name__ if args.strategy else None
+    runs = ResultStore(args.results_dir).query(args.ticker and args.ticker.upper(), strategy, args.metric,
+                                               args.min, args.max, args.limit)
+    write_report(args, {'runs': runs})
+    return 0
+
+def run_benchmark_command(args):
+    if args.bars < 2 or args.tickers < 1 or args.repeat < 1:
+        raise ValueError("--bars must be at least 2, --tickers and --repeat at least 1")
+    suite = BenchmarkSuite(args.bars, args.tickers, args.seed, args.repeat, args.backtrader_bars, args.only)
+    report = suite.run()
+    baseline_file = args.baseline or benchmark_baseline_path(args.bars, args.tickers, args.seed)
+    regressions = []
+    if os.path.exists(baseline_file) and not args.save_baseline:
+        with open(baseline_file, 'r') as file:
+            regressions = compare_benchmarks(report, json.load(file), args.tolerance)
+        report['baseline'] = baseline_file
+        report['regressions'] = regressions
+        for name in regressions:
+            logger.warning(f"Regression in {name}: {report['results'][name]['change']:+.1%} vs baseline")
+    elif args.baseline:
+        raise ValueError(f"No baseline at {args.baseline}")
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_file)), exist_ok=True)
+        with open(baseline_file, 'w') as file:
+            json.dump(report, file, indent=2)
+        logger.info(f"Baseline saved to {baseline_file}")
+    failed_checks = [name for name, passed in report['checks'].items() if not passed]
+    for name in failed_checks:
+        logger.warning(f"Benchmark check failed: {name}")
+    write_report(args, report)
+    return 1 if regressions or failed_checks else 0
+
+def main(argv=None):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    commands = {'backtest': run_backtest_command, 'sentiment': run_sentiment_command, 'import': run_import_command,
+                'paper': run_paper_command, 'screen': run_screen_command, 'results': run_results_command, 'benchmark': run_benchmark_command}
+    if args.command in commands:
+        if args.quiet:
+            logging.getLogger().setLevel(logging.WARNING)
+        try:
+            return commands[args.command](args)
+        except (ValueError, OSError) as exc:
+            parser.error(str(exc))
+
+    load_gui_modules()
     root = tk.Tk()
     app = TradingPlatformGUI(root)
     root.mainloop()
+    return 0
+
+# Entry point: GUI by default, `backtest`, `paper`, `screen`, `results`, `import`, `sentiment` and `benchmark` subcommands for headless runs
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The application is a single script whose name is not importable, so it is loaded by path once per session
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_flint_steel():
+    if 'flint_steel' not in sys.modules:
+        spec = importlib.util.spec_from_file_location('flint_steel', os.path.join(ROOT, 'Flint&Steel.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['flint_steel'] = module
+        spec.loader.exec_module(module)
+    return sys.modules['flint_steel']
+
+
+def daily_bars(bars=1500, seed=0, start='2015-01-02', volatility=0.02):
+    # Seeded synthetic daily OHLCV, volatile enough for the stop loss and take profit rules to fire
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0003, volatility, bars)))
+    open_ = close * np.exp(rng.normal(0.0, volatility / 4, bars))
+    high = np.maximum(open_, close) * (1 + rng.random(bars) * 0.01)
+    low = np.minimum(open_, close) * (1 - rng.random(bars) * 0.01)
+    dates = pd.bdate_range(start, periods=bars, name='Date')
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Adj Close': close,
+                         'Volume': rng.integers(100000, 1000000, bars).astype(np.float64)}, index=dates)
+
+
+@pytest.fixture(scope='session')
+def fs():
+    return load_flint_steel()
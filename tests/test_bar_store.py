@@ -0,0 +1,83 @@
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import daily_bars
+
+PARAMS = {'short_period': 10, 'long_period': 30}
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / 'bars.csv'
+    daily_bars(600, seed=6).to_csv(path)
+    return str(path)
+
+
+def test_import_round_trips_the_csv(fs, tmp_path, csv_file):
+    store = fs.import_bars(csv_file, str(tmp_path / 'store'), chunk_rows=128)
+    expected = daily_bars(600, seed=6)
+    assert len(store) == 600
+    assert store.meta['name'] == 'bars'
+    frame = store.frame()
+    np.testing.assert_array_equal(frame.index.to_numpy(dtype='datetime64[ns]'), expected.index.to_numpy(dtype='datetime64[ns]'))
+    np.testing.assert_allclose(frame[fs.OHLCV_COLUMNS].to_numpy(), expected[fs.OHLCV_COLUMNS].to_numpy(), rtol=1e-15)
+    lo, hi = store.locate('2015-02-02', '2015-03-02')
+    assert frame.index[lo] == pd.Timestamp('2015-02-02') and frame.index[hi - 1] == pd.Timestamp('2015-02-27')
+
+
+def test_streaming_feed_matches_pandas_data(fs, tmp_path, csv_file):
+    store = fs.import_bars(csv_file, str(tmp_path / 'store'))
+    data = store.frame()
+    expected = fs.run_strategy(data, fs.MovingAverageStrategy, PARAMS, engine='backtrader')
+    # Small chunks so the run crosses many chunk boundaries
+    metrics = fs.run_bar_store(store, fs.MovingAverageStrategy, PARAMS, chunk_size=50)
+    stored = fs.backtest_metrics(expected, data, 100000)
+    assert metrics['Final Value'] == pytest.approx(expected.final_value, abs=1e-9)
+    assert metrics['Bars'] == len(data)
+    assert metrics['Trades'] == len(expected.trades) > 0
+    for name in ('Total Return', 'Sharpe Ratio', 'Max Drawdown'):
+        assert metrics[name] == pytest.approx(stored[name], rel=1e-9, abs=1e-12)
+
+    cerebro = bt.Cerebro(preload=False, runonce=False, exactbars=1, stdstats=False)
+    cerebro.addstrategy(fs.MovingAverageStrategy, **PARAMS)
+    cerebro.adddata(fs.BarStoreFeed(store=store, chunk_size=50))
+    cerebro.broker.setcash(100000)
+    cerebro.addanalyzer(fs.TradeList, _name='trades')
+    trades = cerebro.run()[0].analyzers.trades.get_analysis()
+    assert [(trade['entry_bar'], trade['exit_bar']) for trade in trades] == \
+        [(trade['entry_bar'], trade['exit_bar']) for trade in expected.trades]
+    np.testing.assert_allclose([trade['pnl'] for trade in trades], [trade['pnl'] for trade in expected.trades])
+
+
+def test_appends_extend_the_store_and_overlaps_are_rejected(fs, tmp_path):
+    bars = daily_bars(300, seed=2)
+    store = fs.BarStore.create(str(tmp_path / 'store'), fs.OHLCV_COLUMNS, name='X')
+    store.append(bars.iloc[:200])
+    store.append(bars.iloc[200:])
+    with pytest.raises(ValueError, match='increasing date order'):
+        store.append(bars.iloc[250:260])
+    with pytest.raises(ValueError, match='increasing date order'):
+        store.append(bars.iloc[::-1])
+    reopened = fs.BarStore(str(tmp_path / 'store'))
+    assert len(reopened) == 300
+    np.testing.assert_array_equal(reopened.frame()['Close'].to_numpy(), bars['Close'].to_numpy())
+    assert [len(index) for index, _ in reopened.chunks(128)] == [128, 128, 44]
+
+
+def test_reimporting_replaces_the_store(fs, tmp_path):
+    first, second = tmp_path / 'first.csv', tmp_path / 'second.csv'
+    daily_bars(100, seed=1).to_csv(first)
+    daily_bars(40, seed=2, start='2020-01-01').to_csv(second)
+    fs.import_bars(str(first), str(tmp_path / 'store'))
+    store = fs.import_bars(str(second), str(tmp_path / 'store'))
+    assert len(fs.BarStore(str(tmp_path / 'store'))) == len(store) == 40
+    assert store.frame().index[0] == pd.Timestamp('2020-01-01')
+
+
+def test_import_rejects_files_without_prices(fs, tmp_path):
+    path = tmp_path / 'volume.csv'
+    pd.DataFrame({'Date': ['2024-01-02'], 'Volume': [1.0]}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match='needs Open, High, Low and Close'):
+        fs.import_bars(str(path), str(tmp_path / 'store'))
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+MU, SIGMA, BARS = 0.0005, 0.01, 250
+
+
+def expected_log_growth():
+    # E[log(1 + r)] for r ~ N(MU, SIGMA), by Gauss-Hermite quadrature
+    nodes, weights = np.polynomial.hermite_e.hermegauss(40)
+    return float(weights @ np.log1p(MU + SIGMA * nodes) / weights.sum())
+
+
+def test_intervals_cover_the_true_values_at_their_confidence(fs):
+    # On i.i.d. returns the percentile intervals should contain the population Sharpe ratio and the median total
+    # return (of BARS bars) in about `confidence` of the samples
+    rng = np.random.default_rng(2024)
+    true_sharpe = MU / SIGMA * np.sqrt(fs.TRADING_DAYS)
+    true_return = np.expm1(BARS * expected_log_growth())
+    trials, covered = 200, {'Sharpe Ratio': 0, 'Total Return': 0}
+    for trial in range(trials):
+        report = fs.bootstrap_metrics(rng.normal(MU, SIGMA, BARS), paths=500, confidence=0.9, seed=trial)
+        for name, truth in (('Sharpe Ratio', true_sharpe), ('Total Return', true_return)):
+            covered[name] += report[name]['lower'] <= truth <= report[name]['upper']
+    for name, hits in covered.items():
+        assert 0.84 <= hits / trials <= 0.96, (name, hits / trials)
+
+
+@pytest.mark.parametrize('block_size', [None, 0])
+def test_results_are_reproducible_and_independent_of_batch_memory(fs, block_size):
+    returns = np.random.default_rng(5).normal(MU, SIGMA, 2520)
+    report = fs.bootstrap_metrics(returns, paths=2000, block_size=block_size, seed=11)
+    assert fs.bootstrap_metrics(returns, paths=2000, block_size=block_size, seed=11) == report
+    assert fs.bootstrap_metrics(returns, paths=2000, block_size=block_size, seed=11, batch_bytes=1) == report
+    assert fs.bootstrap_metrics(returns, paths=2000, block_size=block_size, seed=11, batch_bytes=2 ** 30) == report
+    assert report['Total Return']['lower'] <= report['Total Return']['median'] <= report['Total Return']['upper']
+    assert report['Max Drawdown']['upper'] <= 0
+
+
+def test_observed_values_match_the_run_metrics(fs):
+    values = 100000 * np.cumprod(1 + np.random.default_rng(8).normal(MU, SIGMA, 1000))
+    returns = values[1:] / values[:-1] - 1
+    report = fs.bootstrap_metrics(returns, paths=10, seed=0)
+    metrics = fs.compute_run_metrics(values, values[0])
+    for name in ('Total Return', 'Sharpe Ratio', 'Max Drawdown'):
+        assert report[name]['observed'] == pytest.approx(metrics[name], rel=1e-9)
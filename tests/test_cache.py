@@ -0,0 +1,81 @@
+import pandas as pd
+
+from conftest import daily_bars
+
+
+class FakeFetcher:
+    # Serves bars from a fixed history; tickers can be made to fail or come back empty a number of times
+    def __init__(self, history, failures=None, empties=None, gaps=()):
+        self.history = history
+        self.failures = dict(failures or {})
+        self.empties = dict(empties or {})
+        self.gaps = [pd.Timestamp(day) for day in gaps]
+        self.calls = []
+
+    def __call__(self, ticker, start, end, interval):
+        self.calls.append((ticker, start, end))
+        if self.failures.get(ticker):
+            self.failures[ticker] -= 1
+            raise ConnectionError("rate limited")
+        if self.empties.get(ticker):
+            self.empties[ticker] -= 1
+            return self.history.iloc[:0]
+        bars = self.history.loc[start:pd.Timestamp(end) - pd.Timedelta(days=1)]
+        return bars[~bars.index.isin(self.gaps)]
+
+
+def make_cache(fs, tmp_path, **options):
+    fetcher = FakeFetcher(daily_bars(600, start='2023-01-02'), **options)
+    return fs.OHLCVCache(str(tmp_path), fetcher=fetcher), fetcher
+
+
+def test_empty_result_is_fetched_again(fs, tmp_path):
+    cache, fetcher = make_cache(fs, tmp_path, empties={'AAA': 1})
+    assert cache.get('AAA', '2023-02-01', '2023-03-01').empty
+    assert cache.missing_ranges('AAA', '2023-02-01', '2023-03-01') == [('2023-02-01', '2023-03-01')]
+    data = cache.get('AAA', '2023-02-01', '2023-03-01')
+    assert len(data) == len(pd.bdate_range('2023-02-01', '2023-02-28'))
+    assert len(fetcher.calls) == 2
+    cache.get('AAA', '2023-02-01', '2023-03-01')
+    assert len(fetcher.calls) == 2
+
+
+def test_failed_fetch_records_no_coverage(fs, tmp_path):
+    cache, fetcher = make_cache(fs, tmp_path, failures={'BBB': 1})
+    assert cache.get('BBB', '2023-02-01', '2023-03-01').empty
+    assert cache.missing_ranges('BBB', '2023-02-01', '2023-03-01') == [('2023-02-01', '2023-03-01')]
+    assert len(cache.get('BBB', '2023-02-01', '2023-03-01')) > 0
+
+
+def test_failure_of_one_ticker_does_not_block_the_others(fs, tmp_path):
+    cache, fetcher = make_cache(fs, tmp_path, failures={'BAD': 1})
+    frames = cache.get_many(['GOOD', 'BAD'], '2023-02-01', '2023-03-01')
+    assert len(frames['GOOD']) > 0 and frames['BAD'].empty
+    assert cache.missing_ranges('GOOD', '2023-02-01', '2023-03-01') == []
+    assert cache.missing_ranges('BAD', '2023-02-01', '2023-03-01') != []
+
+
+def test_empty_weekend_is_covered(fs, tmp_path):
+    cache, fetcher = make_cache(fs, tmp_path)
+    # 2023-02-04/05 is a weekend: an empty answer is the right answer and is not asked for again
+    assert cache.get('CCC', '2023-02-04', '2023-02-06').empty
+    assert cache.missing_ranges('CCC', '2023-02-04', '2023-02-06') == []
+
+
+def test_empty_holiday_between_cached_bars_is_covered(fs, tmp_path):
+    cache, fetcher = make_cache(fs, tmp_path, gaps=['2023-02-20'])
+    cache.get('DDD', '2023-02-01', '2023-02-20')
+    cache.get('DDD', '2023-02-21', '2023-03-01')
+    # Only the holiday itself is missing; the provider has no bar for it, with bars on both sides
+    data = cache.get('DDD', '2023-02-01', '2023-03-01')
+    assert pd.Timestamp('2023-02-20') not in data.index
+    assert cache.missing_ranges('DDD', '2023-02-01', '2023-03-01') == []
+    calls = len(fetcher.calls)
+    cache.get('DDD', '2023-02-01', '2023-03-01')
+    assert len(fetcher.calls) == calls
+
+
+def test_empty_range_outside_known_bars_is_not_covered(fs, tmp_path):
+    cache, fetcher = make_cache(fs, tmp_path, empties={'EEE': 1})
+    cache.get('EEE', '2023-02-01', '2023-02-15')
+    assert cache.missing_ranges('EEE', '2023-02-01', '2023-02-15') == [('2023-02-01', '2023-02-15')]
@@ -0,0 +1,113 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from conftest import daily_bars
+from test_streaming import STRATEGY_PARAMS
+
+
+def gappy_bars(bars=1200, seed=7):
+    data = daily_bars(bars, seed=seed)
+    data.loc[data.index[np.random.default_rng(seed).choice(np.arange(3, bars), 8, replace=False)], 'Close'] = np.nan
+    return data
+
+
+def assert_same_result(result, expected):
+    np.testing.assert_array_equal(result.position, expected.position)
+    np.testing.assert_array_equal(result.cash, expected.cash)
+    np.testing.assert_array_equal(result.value, expected.value)
+    assert result.trades == expected.trades
+
+
+@pytest.mark.parametrize('name, params', STRATEGY_PARAMS)
+def test_resumed_run_matches_vectorized_backtest(fs, tmp_path, name, params):
+    strategy_cls = getattr(fs, name)
+    store = fs.CheckpointStore(str(tmp_path))
+    data = gappy_bars()
+    first, done = fs.run_checkpointed(data.iloc[:900], strategy_cls, params, store=store, ticker='X')
+    assert done == 0
+    assert_same_result(first, fs.VectorizedBacktest(strategy_cls, 100000, **params).run(data.iloc[:900]))
+    result, done = fs.run_checkpointed(data, strategy_cls, params, store=store, ticker='X')
+    assert done == 900
+    assert_same_result(result, fs.VectorizedBacktest(strategy_cls, 100000, **params).run(data))
+
+
+@pytest.mark.parametrize('name, params', STRATEGY_PARAMS)
+def test_resumed_run_matches_backtrader(fs, tmp_path, name, params):
+    strategy_cls = getattr(fs, name)
+    store = fs.CheckpointStore(str(tmp_path))
+    data = daily_bars(1200, seed=4)
+    fs.run_checkpointed(data.iloc[:1100], strategy_cls, params, store=store, ticker='X')
+    result, done = fs.run_checkpointed(data, strategy_cls, params, store=store, ticker='X')
+    expected = fs.run_strategy(data, strategy_cls, params, engine='backtrader')
+    assert done == 1100
+    assert result.final_value == pytest.approx(expected.final_value, abs=1e-6)
+    assert [(trade['entry_bar'], trade['exit_bar']) for trade in result.trades] == \
+        [(trade['entry_bar'], trade['exit_bar']) for trade in expected.trades]
+
+
+def test_run_backtest_checkpoints_backtrader_runs_only(fs, tmp_path):
+    store = fs.CheckpointStore(str(tmp_path))
+    data = daily_bars(600, seed=2)
+    fs.run_backtest(data, fs.RSIStrategy, engine='vectorized', checkpoints=store, ticker='X')
+    assert os.listdir(tmp_path) == []
+    fs.run_backtest(data.iloc[:500], fs.RSIStrategy, engine='backtrader', checkpoints=store, ticker='X')
+    metrics = fs.run_backtest(data, fs.RSIStrategy, engine='backtrader', checkpoints=store, ticker='X')
+    assert len(os.listdir(tmp_path)) == 1
+    assert metrics['Final Value'] == pytest.approx(fs.run_strategy(data, fs.RSIStrategy, {}, engine='backtrader').final_value)
+
+
+def test_benchmark_shows_resume_beating_a_full_run(fs):
+    report = fs.BenchmarkSuite(bars=5000, repeat=1, backtrader_bars=5000, groups=['checkpoint']).run()
+    assert report['checks'] == {'checkpoint.resume_beats_full_run': True}
+    assert report['results']['checkpoint.resume']['speedup'] > 1
+
+
+def test_checkpoint_is_read_without_pickle(fs, tmp_path):
+    store = fs.CheckpointStore(str(tmp_path))
+    fs.run_checkpointed(gappy_bars(), fs.MovingAverageStrategy, store=store, ticker='X')
+    [name] = os.listdir(tmp_path)
+    assert name.endswith('.npz')
+    with np.load(os.path.join(tmp_path, name), allow_pickle=False) as saved:
+        assert json.loads(str(saved['state']))['version'] == fs.CheckpointStore.VERSION
+
+
+def test_checkpoint_of_another_version_is_discarded(fs, tmp_path):
+    store = fs.CheckpointStore(str(tmp_path))
+    data = gappy_bars()
+    fs.run_checkpointed(data.iloc[:900], fs.RSIStrategy, store=store, ticker='X')
+    key = store.key('X', fs.RSIStrategy, {}, 100000, data.index[0])
+    state, arrays = store.load(key)
+    with open(store._file(key), 'wb') as file:
+        np.savez(file, state=np.array(json.dumps(dict(state, version=store.VERSION - 1))), **arrays)
+    assert store.load(key) is None
+    assert not os.path.exists(store._file(key))
+    result, done = fs.run_checkpointed(data, fs.RSIStrategy, store=store, ticker='X')
+    assert done == 0
+    assert_same_result(result, fs.VectorizedBacktest(fs.RSIStrategy, 100000).run(data))
+
+
+def test_indicator_state_mismatch_replays_the_full_history(fs, tmp_path):
+    store = fs.CheckpointStore(str(tmp_path))
+    data = gappy_bars()
+    fs.run_checkpointed(data.iloc[:900], fs.MACDStrategy, store=store, ticker='X')
+    key = store.key('X', fs.MACDStrategy, {}, 100000, data.index[0])
+    state, arrays = store.load(key)
+    state['trader']['books'][0]['signals']['version'] += 1
+    store.save(key, state, arrays)
+    result, done = fs.run_checkpointed(data, fs.MACDStrategy, store=store, ticker='X')
+    assert done == 0
+    assert_same_result(result, fs.VectorizedBacktest(fs.MACDStrategy, 100000).run(data))
+
+
+def test_changed_history_is_not_resumed(fs, tmp_path):
+    store = fs.CheckpointStore(str(tmp_path))
+    data = gappy_bars()
+    fs.run_checkpointed(data.iloc[:900], fs.BollingerBandsStrategy, store=store, ticker='X')
+    revised = data.copy()
+    revised.iloc[100, revised.columns.get_loc('Close')] *= 1.01
+    result, done = fs.run_checkpointed(revised, fs.BollingerBandsStrategy, store=store, ticker='X')
+    assert done == 0
+    assert_same_result(result, fs.VectorizedBacktest(fs.BollingerBandsStrategy, 100000).run(revised))
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from conftest import daily_bars
+from test_cache import FakeFetcher
+
+PARAMS = ['--param', 'short_period=10', '--param', 'long_period=30']
+METRICS = {'Total Return', 'Annual Return', 'Sharpe Ratio', 'Max Drawdown', 'Final Value', 'Bars', 'Trades'}
+
+
+@pytest.fixture
+def bar_store(fs, tmp_path):
+    path = tmp_path / 'bars.csv'
+    daily_bars(400, seed=8).to_csv(path)
+    fs.import_bars(str(path), str(tmp_path / 'store'), name='AAA')
+    return str(tmp_path / 'store')
+
+
+@pytest.fixture
+def stub_fetcher(fs, monkeypatch):
+    # Every OHLCVCache the command builds serves bars from a fixed history instead of downloading
+    fetcher = FakeFetcher(daily_bars(600, start='2023-01-02'), failures={'BAD': 10})
+    cache_cls = fs.OHLCVCache
+    monkeypatch.setattr(fs, 'OHLCVCache', lambda cache_dir: cache_cls(cache_dir, fetcher=fetcher))
+    return fetcher
+
+
+def run_main(fs, capsys, argv):
+    code = fs.main(argv)
+    return code, json.loads(capsys.readouterr().out)
+
+
+def test_backtest_on_a_bar_store(fs, capsys, bar_store):
+    code, report = run_main(fs, capsys, ['backtest', '--data', bar_store, '--strategy', 'Moving Average', *PARAMS, '--quiet'])
+    assert code == 0
+    assert report['strategy'] == 'MovingAverageStrategy'
+    assert report['params'] == {'short_period': 10, 'long_period': 30}
+    assert report['engine'] == 'backtrader-streaming'
+    assert list(report['results']) == ['AAA']
+    metrics = report['results']['AAA']
+    assert METRICS <= set(metrics)
+    assert metrics['Bars'] == 400
+
+
+def test_backtest_with_a_stubbed_fetcher(fs, capsys, tmp_path, stub_fetcher):
+    argv = ['backtest', '--strategy', 'RSI', '--tickers', 'AAA', 'BBB', '--start', '2023-01-02', '--end', '2024-01-01',
+            '--engine', 'vectorized', '--cache-dir', str(tmp_path / 'cache'), '--results-dir', str(tmp_path / 'results'),
+            '--output', str(tmp_path / 'report.json'), '--quiet']
+    assert fs.main(argv) == 0
+    assert capsys.readouterr().out == ''
+    with open(tmp_path / 'report.json') as file:
+        report = json.load(file)
+    assert {key: report[key] for key in ('strategy', 'start', 'end', 'interval', 'engine', 'cash')} == \
+        {'strategy': 'RSIStrategy', 'start': '2023-01-02', 'end': '2024-01-01', 'interval': '1d',
+         'engine': 'vectorized', 'cash': 100000}
+    assert list(report['results']) == ['AAA', 'BBB']
+    for metrics in report['results'].values():
+        assert METRICS <= set(metrics)
+        assert metrics['Bars'] == 260
+    # The second run is read from the results store and reports the same metrics
+    assert fs.main(argv) == 0
+    with open(tmp_path / 'report.json') as file:
+        assert json.load(file)['results'] == report['results']
+
+
+def test_failed_ticker_is_reported_with_exit_code_1(fs, capsys, tmp_path, stub_fetcher):
+    code, report = run_main(fs, capsys, ['backtest', '--strategy', 'MACD', '--tickers', 'AAA', 'BAD', '--start', '2023-01-02',
+                                         '--end', '2023-06-01', '--engine', 'vectorized', '--no-store',
+                                         '--cache-dir', str(tmp_path / 'cache'), '--quiet'])
+    assert code == 1
+    assert METRICS <= set(report['results']['AAA'])
+    assert report['results']['BAD'] == {'error': "ValueError: No data for BAD between 2023-01-02 and 2023-06-01"}
+
+
+@pytest.mark.parametrize('argv', [
+    ['--strategy', 'Nope'],
+    ['--strategy', 'Moving Average', '--param', 'short_period'],
+    ['--strategy', 'Moving Average', '--param', 'window=3'],
+    [],
+])
+def test_bad_settings_exit_with_a_usage_error(fs, capsys, bar_store, argv):
+    with pytest.raises(SystemExit) as exit_info:
+        fs.main(['backtest', '--data', bar_store, *argv])
+    assert exit_info.value.code == 2
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert 'error:' in captured.err
+
+
+def test_unknown_strategy_names_the_choices(fs, capsys, bar_store):
+    with pytest.raises(SystemExit):
+        fs.main(['backtest', '--data', bar_store, '--strategy', 'Nope'])
+    assert "Unknown strategy 'Nope'" in capsys.readouterr().err
+
+
+def test_parser_defaults(fs):
+    args = fs.build_arg_parser().parse_args(['backtest', '--strategy', 'RSI'])
+    assert (args.engine, args.cash, args.chunk_size, args.no_store) == (None, None, 100000, False)
+    assert args.results_dir == fs.RESULTS_DIR
@@ -0,0 +1,28 @@
+import pytest
+
+from conftest import daily_bars
+
+# MovingAverageStrategy is covered with its default stops, tight stops that fire on most trades, and wide ones that
+# rarely do. Backtrader's strategy needs numeric stops, so None is not tested here.
+PARITY_CASES = [
+    ('MovingAverageStrategy', {}),
+    ('MovingAverageStrategy', {'short_period': 10, 'long_period': 30}),
+    ('MovingAverageStrategy', {'short_period': 10, 'long_period': 30, 'stop_loss': 0.01, 'take_profit': 0.02}),
+    ('MovingAverageStrategy', {'short_period': 10, 'long_period': 30, 'stop_loss': 0.1, 'take_profit': 0.3}),
+    ('RSIStrategy', {}),
+    ('BollingerBandsStrategy', {}),
+    ('MACDStrategy', {}),
+    ('BuyAndHoldStrategy', {}),
+]
+
+# Seed 0 has a 14-bar run without a down close, where backtrader's RSI divides by zero
+SEEDS = [1, 2]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('name, params', PARITY_CASES)
+def test_vectorized_engine_matches_backtrader(fs, name, params, seed):
+    data = daily_bars(1500, seed=seed)
+    strategy_cls = getattr(fs, name)
+    assert fs.VectorizedBacktest(strategy_cls, **params).run(data).position.any()
+    assert fs.check_engine_parity(data, strategy_cls, **params)
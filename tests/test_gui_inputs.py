@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+import pytest
+
+
+class Entry:
+    def __init__(self, text):
+        self.text = text
+
+    def get(self):
+        return self.text
+
+
+def form(strategy, **entries):
+    # Stands in for the GUI: the strategy drop-down and the hyperparameter entries the getters read
+    return SimpleNamespace(strategy_options=Entry(strategy),
+                           hyperparameter_widgets={name: Entry(text) for name, text in entries.items()})
+
+
+def test_strategy_params_are_cast(fs):
+    gui = form('RSI', rsi_period_entry=' 10 ', rsi_lower_entry='25', rsi_upper_entry='75')
+    assert fs.TradingPlatformGUI.get_strategy_params(gui) == (fs.RSIStrategy, {'rsi_period': 10, 'rsi_lower': 25, 'rsi_upper': 75})
+
+
+@pytest.mark.parametrize('text, message', [('', "rsi_period must be an integer, got ''"),
+                                           ('abc', "rsi_period must be an integer, got 'abc'"),
+                                           ('1.5', "rsi_period must be an integer, got '1.5'")])
+def test_bad_strategy_param_names_the_field(fs, text, message):
+    gui = form('RSI', rsi_period_entry=text, rsi_lower_entry='25', rsi_upper_entry='75')
+    with pytest.raises(ValueError) as exc_info:
+        fs.TradingPlatformGUI.get_strategy_params(gui)
+    assert str(exc_info.value) == message
+
+
+def test_sweep_ranges_skip_empty_fields(fs):
+    gui = form('Bollinger Bands', bbands_period_entry='10:20:5', bbands_devfactor_entry=' ')
+    assert fs.TradingPlatformGUI.get_sweep_ranges(gui) == (fs.BollingerBandsStrategy, {'bbands_period': [10, 15, 20]})
+
+
+@pytest.mark.parametrize('text', ['10:x', '10,abc', '10:20:0'])
+def test_bad_sweep_range_names_the_field(fs, text):
+    gui = form('Bollinger Bands', bbands_period_entry=text)
+    with pytest.raises(ValueError, match=f"^bbands_period range '{text}': "):
+        fs.TradingPlatformGUI.get_sweep_ranges(gui)
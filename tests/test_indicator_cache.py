@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import daily_bars
+from test_streaming import STRATEGY_PARAMS
+
+# 1000 float64 values per single-output entry
+ENTRY_BYTES = 8000
+
+
+def closes(seed):
+    return daily_bars(1000, seed=seed)['Close'].to_numpy()
+
+
+def test_entries_are_evicted_least_recently_used(fs):
+    cache = fs.IndicatorCache(max_bytes=3 * ENTRY_BYTES)
+    a, b, c, d = (closes(seed) for seed in range(4))
+    for values in (a, b, c):
+        cache.get('sma', values, 20)
+    assert cache.nbytes == 3 * ENTRY_BYTES
+    # Touching `a` makes `b` the oldest, so `b` goes when `d` arrives
+    cache.get('sma', a, 20)
+    cache.get('sma', d, 20)
+    assert cache.nbytes == 3 * ENTRY_BYTES
+    assert list(cache.entries) == [cache.key(cache.fingerprint(values), 'sma', (20,)) for values in (c, a, d)]
+    assert cache.stats() == {'entries': 3, 'bytes': 3 * ENTRY_BYTES, 'hits': 1, 'misses': 4, 'spilled': 0, 'reloaded': 0}
+    # Without a spill directory an evicted entry is recomputed
+    cache.get('sma', b, 20)
+    assert cache.misses == 5
+
+
+def test_an_entry_larger_than_the_budget_is_still_kept(fs):
+    cache = fs.IndicatorCache(max_bytes=ENTRY_BYTES // 2)
+    cache.get('sma', closes(0), 20)
+    cache.get('sma', closes(1), 20)
+    assert len(cache.entries) == 1 and cache.nbytes == ENTRY_BYTES
+
+
+def test_evicted_entries_spill_to_disk_and_reload(fs, tmp_path):
+    spill_dir = str(tmp_path / 'spill')
+    cache = fs.IndicatorCache(max_bytes=2 * ENTRY_BYTES, spill_dir=spill_dir)
+    a, b = closes(0), closes(1)
+    sma = cache.get('sma', a, 20)
+    bands = cache.get('bollinger_bands', a, 20, 2.0)
+    cache.get('sma', b, 20)
+    # The three-output bands are over the budget on their own, so both older entries are spilled
+    sma_key = cache.key(cache.fingerprint(a), 'sma', (20,))
+    bands_key = cache.key(cache.fingerprint(a), 'bollinger_bands', (20, 2.0))
+    assert sorted(os.listdir(spill_dir)) == sorted([f"{sma_key}.npy", f"{bands_key}.tuple.npy"])
+    assert list(cache.entries) == [cache.key(cache.fingerprint(b), 'sma', (20,))]
+    assert cache.spilled == 2
+
+    reloaded = cache.get('sma', a, 20)
+    assert isinstance(reloaded, np.memmap)
+    np.testing.assert_array_equal(reloaded, sma)
+    reloaded_bands = cache.get('bollinger_bands', a, 20, 2.0)
+    assert len(reloaded_bands) == 3
+    for out, expected in zip(reloaded_bands, bands):
+        np.testing.assert_array_equal(out, expected)
+    assert (cache.misses, cache.reloaded) == (3, 2)
+
+    # A second cache sharing the directory reads the spilled files instead of recomputing
+    other = fs.IndicatorCache(spill_dir=spill_dir)
+    np.testing.assert_array_equal(other.get('sma', a, 20), fs.sma(a, 20))
+    assert (other.misses, other.reloaded) == (0, 1)
+
+
+def test_unreadable_spill_file_is_recomputed(fs, tmp_path):
+    cache = fs.IndicatorCache(spill_dir=str(tmp_path))
+    values = closes(2)
+    key = cache.key(cache.fingerprint(values), 'ema', (12,))
+    (tmp_path / f"{key}.npy").write_bytes(b'not an array')
+    np.testing.assert_array_equal(cache.get('ema', values, 12), fs.ema(values, 12))
+    assert cache.misses == 1
+
+
+def test_cached_values_are_read_only_and_equal_uncached(fs):
+    cache = fs.IndicatorCache()
+    values = closes(3)
+    for name, args in [('sma', (20,)), ('ema', (12,)), ('rsi_sma', (14,)), ('bollinger_bands', (20, 2.0)),
+                       ('macd', (12, 26, 9))]:
+        expected = fs.INDICATORS[name][0](values, *args)
+        cached = cache.get(name, values, *args)
+        assert cache.get(name, values, *args) is cached
+        for out, want in zip(cache._outputs(cached), cache._outputs(expected)):
+            np.testing.assert_array_equal(out, want)
+            with pytest.raises(ValueError):
+                out[0] = 1.0
+
+
+@pytest.mark.parametrize('name, params', STRATEGY_PARAMS)
+def test_cached_indicators_match_native_backtrader(fs, monkeypatch, name, params):
+    strategy_cls = getattr(fs, name)
+    data = daily_bars(800, seed=1)
+    monkeypatch.setattr(fs, 'indicator_cache', fs.IndicatorCache(enabled=False))
+    native = fs.run_strategy(data, strategy_cls, params, engine='backtrader')
+    cache = fs.IndicatorCache()
+    monkeypatch.setattr(fs, 'indicator_cache', cache)
+    cached = fs.run_strategy(data, strategy_cls, params, engine='backtrader')
+    assert cached.final_value == pytest.approx(native.final_value, abs=1e-6)
+    assert [(trade['entry_bar'], trade['exit_bar']) for trade in cached.trades] == \
+        [(trade['entry_bar'], trade['exit_bar']) for trade in native.trades]
+    if name != 'BuyAndHoldStrategy':
+        assert cache.misses > 0
@@ -0,0 +1,114 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+class ReferencePortfolio:
+    # The original dict-based Portfolio, which the array-backed one must keep behaving like
+    def __init__(self, initial_cash):
+        self.cash = initial_cash
+        self.holdings = {}
+        self.transaction_history = []
+
+    def buy(self, ticker, price, amount):
+        if price * amount > self.cash:
+            return False
+        self.holdings.setdefault(ticker, 0)
+        self.cash -= price * amount
+        self.holdings[ticker] += amount
+        self.transaction_history.append({'ticker': ticker, 'price': price, 'amount': amount, 'type': 'buy'})
+        return True
+
+    def sell(self, ticker, price, amount):
+        if self.holdings.get(ticker, 0) < amount:
+            return False
+        self.cash += price * amount
+        self.holdings[ticker] -= amount
+        self.transaction_history.append({'ticker': ticker, 'price': price, 'amount': amount, 'type': 'sell'})
+        return True
+
+    def portfolio_value(self, current_prices):
+        return self.cash + sum(current_prices.get(ticker, 0) * amount for ticker, amount in self.holdings.items())
+
+
+def test_buys_and_sells_match_the_reference_portfolio_past_the_ledger_capacity(fs):
+    rng = np.random.default_rng(0)
+    portfolio, reference = fs.Portfolio(50000, log_trades=False), ReferencePortfolio(50000)
+    tickers = ['AAA', 'BBB', 'CCC']
+    dates = pd.date_range('2024-01-01', periods=3000, freq='h')
+    accepted = []
+    for i in range(3000):
+        ticker, price, amount = tickers[rng.integers(3)], float(rng.integers(10, 200)), int(rng.integers(1, 20))
+        side = 'buy' if rng.random() < 0.55 else 'sell'
+        ok = getattr(portfolio, side)(ticker, price, amount, dates[i])
+        assert ok == getattr(reference, side)(ticker, price, amount)
+        if ok:
+            accepted.append(dates[i].to_pydatetime())
+    assert len(portfolio.ledger) == len(reference.transaction_history) > 1024
+    assert portfolio.cash == pytest.approx(reference.cash)
+    assert portfolio.holdings == reference.holdings
+    assert portfolio.get_holdings_summary() == {ticker: amount for ticker, amount in reference.holdings.items() if amount > 0}
+    prices = {'AAA': 101.0, 'BBB': 55.5}
+    assert portfolio.portfolio_value(prices) == pytest.approx(reference.portfolio_value(prices))
+    history = portfolio.transaction_history
+    assert [{key: entry[key] for key in ('ticker', 'price', 'amount', 'type')} for entry in history] == reference.transaction_history
+    assert [entry['date'] for entry in history] == accepted
+
+
+def test_rejected_trades_change_nothing(fs):
+    portfolio = fs.Portfolio(100, log_trades=False)
+    assert not portfolio.buy('AAA', 60.0, 2)
+    assert not portfolio.sell('AAA', 10.0, 1)
+    assert portfolio.buy('AAA', 30.0, 2)
+    assert not portfolio.sell('AAA', 30.0, 3)
+    assert portfolio.cash == 40
+    assert portfolio.holdings == {'AAA': 2}
+    assert len(portfolio.ledger) == 1
+
+
+def test_trades_without_a_bar_are_stamped_with_the_current_time(fs):
+    portfolio = fs.Portfolio(100, log_trades=False)
+    before = datetime.datetime.now()
+    portfolio.buy('AAA', 10.0, 1)
+    assert before <= portfolio.transaction_history[0]['date'] <= datetime.datetime.now()
+
+
+def test_pnl_combines_realized_and_unrealized(fs):
+    portfolio = fs.Portfolio(10000, log_trades=False)
+    portfolio.buy('AAA', 100.0, 10)
+    portfolio.sell('AAA', 120.0, 4)
+    portfolio.buy('BBB', 50.0, 20)
+    # AAA: -1000 + 480 + 6 * 110 = 140; BBB: -1000 + 20 * 45 = -100
+    np.testing.assert_allclose(portfolio.pnl({'AAA': 110.0, 'BBB': 45.0}), [140.0, -100.0])
+    assert portfolio.portfolio_value({'AAA': 110.0, 'BBB': 45.0}) == 10000 + 140 - 100
+    # One row of prices per bar gives one value per bar
+    np.testing.assert_allclose(portfolio.portfolio_value(np.array([[100.0, 50.0], [110.0, 45.0]])), [10080.0, 10040.0])
+
+
+def test_record_trades_matches_trading_one_by_one(fs):
+    dates = pd.date_range('2024-01-01', periods=4, freq='D', tz='UTC')
+    tickers, prices, amounts = ['AAA', 'BBB', 'AAA', 'BBB'], [10.0, 20.0, 12.0, 18.0], [5.0, 3.0, -2.0, -3.0]
+    batch = fs.Portfolio(1000, log_trades=False)
+    batch.record_trades(dates, tickers, prices, amounts)
+    single = fs.Portfolio(1000, log_trades=False)
+    for date, ticker, price, amount in zip(dates, tickers, prices, amounts):
+        (single.buy if amount > 0 else single.sell)(ticker, price, abs(amount), date.tz_localize(None))
+    assert batch.cash == single.cash == 1000 - 50 - 60 + 24 + 54
+    assert batch.holdings == single.holdings == {'AAA': 3.0, 'BBB': 0.0}
+    assert batch.transaction_history == single.transaction_history
+
+
+def test_ledger_grows_past_its_capacity(fs):
+    ledger = fs.TransactionLedger(capacity=2)
+    stamps = np.arange(7).astype('datetime64[D]').astype('datetime64[ns]')
+    for i in range(3):
+        ledger.append(stamps[i], i, 10.0 + i, 1.0)
+    ledger.extend(stamps[3:], np.array([0, 1, 2, 0]), np.array([13.0, 14.0, 15.0, 16.0]), np.array([-1.0, -1.0, -1.0, 2.0]))
+    columns = ledger.columns()
+    assert len(ledger) == 7
+    np.testing.assert_array_equal(columns['date'], stamps)
+    np.testing.assert_array_equal(columns['ticker_id'], [0, 1, 2, 0, 1, 2, 0])
+    np.testing.assert_array_equal(columns['price'], [10, 11, 12, 13, 14, 15, 16])
+    np.testing.assert_array_equal(columns['amount'], [1, 1, 1, -1, -1, -1, 2])
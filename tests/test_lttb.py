@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+
+def random_walk(n, seed=0):
+    return np.cumsum(np.random.default_rng(seed).normal(size=n))
+
+
+@pytest.mark.parametrize('n, threshold', [(10, 3), (1000, 50), (5001, 1500), (100000, 1500)])
+def test_keeps_the_end_points_and_threshold_points(fs, n, threshold):
+    x = np.arange(n, dtype=np.float64)
+    selected = fs.lttb(x, random_walk(n), threshold)
+    assert len(selected) == threshold
+    assert selected[0] == 0 and selected[-1] == n - 1
+    assert np.all(np.diff(selected) > 0)
+
+
+@pytest.mark.parametrize('threshold', [100, 101, 500, 2])
+def test_short_input_is_returned_unchanged(fs, threshold):
+    selected = fs.lttb(np.arange(100), random_walk(100), threshold)
+    np.testing.assert_array_equal(selected, np.arange(100))
+
+
+def test_one_point_is_taken_from_each_bucket(fs):
+    n, threshold = 1000, 52
+    selected = fs.lttb(np.arange(n), random_walk(n, seed=1), threshold)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    for index, lo, hi in zip(selected[1:-1], edges[:-1], edges[1:]):
+        assert lo <= index < hi
+
+
+@pytest.mark.parametrize('spike', [1, 337, 998])
+def test_a_spike_survives_downsampling(fs, spike):
+    y = np.sin(np.linspace(0, 20, 1000))
+    y[spike] = 50.0
+    assert spike in fs.lttb(np.arange(1000), y, 40)
+    y[spike] = -50.0
+    assert spike in fs.lttb(np.arange(1000), y, 40)
+
+
+def test_uneven_x_and_gaps(fs):
+    # Irregular timestamps (weekends, holidays) and NaN gaps still give valid, ordered indices
+    x = np.cumsum(np.random.default_rng(2).integers(1, 4, size=2000)).astype(np.float64)
+    y = random_walk(2000, seed=2)
+    y[500:520] = np.nan
+    y[1500] = 100.0
+    selected = fs.lttb(x, y, 200)
+    assert len(selected) == 200 and selected[0] == 0 and selected[-1] == 1999
+    assert np.all(np.diff(selected) > 0)
+    assert 1500 in selected
@@ -0,0 +1,11 @@
+from conftest import daily_bars
+
+
+def test_dashboard_reports_the_stored_ratios(fs):
+    # The GUI metrics panel, `backtest` JSON and the results store all use RISK_FREE_RATE
+    data = daily_bars(1500, seed=3)
+    result = fs.VectorizedBacktest(fs.MovingAverageStrategy, 100000, short_period=10, long_period=30).run(data)
+    stored = fs.backtest_metrics(result, data, 100000)
+    shown = fs.MetricsDashboard().calculate_all(result.value, traded=fs.traded_value(result.position, data['Open'].to_numpy()))
+    for metric in ('Sharpe Ratio', 'Sortino Ratio', 'Annual Return', 'Turnover'):
+        assert shown[metric] == stored[metric]
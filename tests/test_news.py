@@ -0,0 +1,103 @@
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+HEADLINES = {'AAPL': ['Apple is up'], 'MSFT': ['Microsoft down'], 'GOOG': ['Good quarter'], 'AMZN': ['Bad week'],
+             'TSLA': ['Up again'], 'NVDA': ['Down again']}
+
+
+class NewsServer(http.server.ThreadingHTTPServer):
+    # Serves HEADLINES as JSON at /news/<ticker> (404 for unknown tickers). Each request is held briefly and the
+    # number of requests in flight at once is recorded, so the test can see they ran concurrently.
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), NewsHandler)
+        self.requests = []
+        self.in_flight = self.peak = 0
+        self.counter = threading.Lock()
+
+
+class NewsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        ticker = self.path.rsplit('/', 1)[-1]
+        with server.counter:
+            server.requests.append(ticker)
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        time.sleep(0.1)
+        with server.counter:
+            server.in_flight -= 1
+        if ticker not in HEADLINES:
+            self.send_error(404)
+            return
+        body = json.dumps(HEADLINES[ticker]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = NewsServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def fetcher(fs, server, **options):
+    url = f"http://127.0.0.1:{server.server_address[1]}/news/{{ticker}}"
+    return fs.NewsFetcher(url, parser=json.loads, timeout=5, max_workers=8, **options)
+
+
+def test_fetch_many_downloads_concurrently(fs, server):
+    news = fetcher(fs, server)
+    try:
+        assert news.fetch_many(list(HEADLINES)) == HEADLINES
+    finally:
+        news.close()
+    assert sorted(server.requests) == sorted(HEADLINES)
+    assert server.peak > 1
+
+
+def test_cached_headlines_are_not_fetched_again_within_ttl(fs, server):
+    news = fetcher(fs, server, ttl=60)
+    try:
+        news.fetch_many(['AAPL', 'MSFT'])
+        assert news.fetch_many(['AAPL', 'MSFT', 'GOOG']) == {ticker: HEADLINES[ticker] for ticker in ('AAPL', 'MSFT', 'GOOG')}
+        assert news.fetch('AAPL') == HEADLINES['AAPL']
+    finally:
+        news.close()
+    assert sorted(server.requests) == ['AAPL', 'GOOG', 'MSFT']
+
+
+def test_expired_headlines_are_fetched_again(fs, server):
+    news = fetcher(fs, server, ttl=0)
+    try:
+        news.fetch_many(['AAPL'])
+        news.fetch_many(['AAPL'])
+    finally:
+        news.close()
+    assert server.requests == ['AAPL', 'AAPL']
+
+
+def test_failed_tickers_are_left_out_and_not_cached(fs, server):
+    news = fetcher(fs, server, ttl=60)
+    try:
+        assert news.fetch_many(['AAPL', 'NOPE']) == {'AAPL': HEADLINES['AAPL']}
+        assert news.fetch_many(['AAPL', 'NOPE']) == {'AAPL': HEADLINES['AAPL']}
+    finally:
+        news.close()
+    assert 'NOPE' not in news.cache
+    assert sorted(server.requests) == ['AAPL', 'NOPE', 'NOPE']
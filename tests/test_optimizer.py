@@ -0,0 +1,65 @@
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+
+class HoldWindow(bt.Strategy):
+    # Buys on bar `enter` and sells on bar `exit`: on a price path with one trough and one peak, the total return is
+    # unimodal in both parameters, with its maximum at the trough and the peak
+    params = (('enter', 0), ('exit', 1))
+
+    @classmethod
+    def vector_signals(cls, close, p):
+        if p.exit is None:
+            raise ValueError("HoldWindow needs an exit bar")
+        bars = np.arange(len(close))
+        return bars == p.enter, bars == p.exit
+
+
+def trough_and_peak(bars=150, trough=25, peak=95):
+    close = np.interp(np.arange(bars), [0, trough, peak, bars - 1], [100.0, 80.0, 130.0, 90.0])
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    return pd.DataFrame({'Open': open_, 'High': np.maximum(open_, close), 'Low': np.minimum(open_, close),
+                         'Close': close, 'Adj Close': close, 'Volume': 1000.0},
+                        index=pd.bdate_range('2020-01-01', periods=bars, name='Date'))
+
+
+RANGES = {'enter': list(range(0, 60, 5)), 'exit': list(range(60, 140, 5))}
+
+
+@pytest.fixture(scope='module')
+def grid(fs):
+    # Every configuration, so the optimizer's answer can be checked against the true best
+    return list(fs.ParameterSweep(HoldWindow, RANGES, processes=1).run(trough_and_peak()))
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_optimizer_finds_the_best_point_within_budget(fs, grid, seed):
+    best = fs.ParameterSweep.rank(grid, 'Total Return')[0]
+    assert best[0] == {'enter': 25, 'exit': 95}
+    optimizer = fs.SurrogateOptimizer(HoldWindow, RANGES, metric='Total Return', budget=40, processes=2, seed=seed)
+    results = list(optimizer.run(trough_and_peak()))
+    configurations = [tuple(sorted(params.items())) for params, _ in results]
+    assert len(results) == 40
+    assert len(set(configurations)) == len(configurations)
+    assert optimizer.best()[0] == best[0]
+    assert optimizer.best()[1]['Total Return'] == pytest.approx(best[1]['Total Return'])
+
+
+def test_budget_counts_failed_runs_and_is_capped_by_the_grid(fs):
+    # exit=None fails; those runs still use up the budget and are never retried
+    ranges = {'enter': [0, 5, 10], 'exit': [60, None]}
+    optimizer = fs.SurrogateOptimizer(HoldWindow, ranges, metric='Total Return', budget=100, processes=1, seed=0)
+    assert optimizer.budget == 6
+    results = list(optimizer.run(trough_and_peak()))
+    assert sorted(params['enter'] for params, _ in results) == [0, 5, 10]
+    assert all(params['exit'] == 60 for params, _ in results)
+
+
+def test_seeded_runs_are_reproducible(fs):
+    runs = []
+    for _ in range(2):
+        optimizer = fs.SurrogateOptimizer(HoldWindow, RANGES, metric='Total Return', budget=20, processes=1, seed=7)
+        runs.append(sorted(tuple(sorted(params.items())) for params, _ in optimizer.run(trough_and_peak())))
+    assert runs[0] == runs[1]
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+DATES = pd.bdate_range('2024-01-01', periods=5, name='Date')
+
+
+def bars(dates, opens, closes):
+    opens, closes = np.asarray(opens, dtype=np.float64), np.asarray(closes, dtype=np.float64)
+    return pd.DataFrame({'Open': opens, 'High': np.maximum(opens, closes), 'Low': np.minimum(opens, closes),
+                         'Close': closes, 'Adj Close': closes, 'Volume': np.full(len(dates), 1000.0)}, index=dates)
+
+
+def trades_on(result, date):
+    rows = result.trades[result.trades['date'] == date]
+    return dict(zip(rows['ticker'], zip(rows['shares'], rows['price'])))
+
+
+def test_panel_aligns_tickers_on_the_union_of_dates(fs):
+    dates = DATES.tz_localize('America/New_York')
+    frames = {'A': bars(dates, [1, 2, 3, 4, 5], [1, 2, 3, 4, 5]),
+              'B': bars(dates[[1, 3]], [20, 40], [21, 41])}
+    panel = fs.PricePanel.from_frames(frames)
+    assert panel.shape == (5, 2)
+    assert panel.tickers == ['A', 'B']
+    assert panel.dates.equals(dates)
+    np.testing.assert_array_equal(panel['Close'][:, 1], [np.nan, 21, np.nan, 41, np.nan])
+    pd.testing.assert_frame_equal(panel.to_frame('B'), frames['B'], check_freq=False, check_index_type=False)
+
+
+def test_equal_weight_buys_at_the_next_open_and_marks_at_the_close(fs):
+    panel = fs.PricePanel.from_frames({'A': bars(DATES[:4], [10, 10, 11, 12], [10, 10, 12, 12]),
+                                       'B': bars(DATES[:4], [20, 20, 20, 20], [20, 20, 18, 20])})
+    result = fs.PortfolioBacktest(initial_cash=1000, rebalance=0).run(panel)
+    # 500 each at bar 1's open: 50 A at 10 and 25 B at 20, leaving no cash
+    assert trades_on(result, DATES[1]) == {'A': (50.0, 10.0), 'B': (25.0, 20.0)}
+    assert len(result.trades) == 2
+    np.testing.assert_array_equal(result.position, [[0, 0], [50, 25], [50, 25], [50, 25]])
+    np.testing.assert_array_equal(result.cash, [1000, 0, 0, 0])
+    np.testing.assert_array_equal(result.value, [1000, 1000, 50 * 12 + 25 * 18, 50 * 12 + 25 * 20])
+
+
+def test_fixed_weights_leave_the_rounding_in_cash(fs):
+    panel = fs.PricePanel.from_frames({'A': bars(DATES[:3], [10] * 3, [10] * 3), 'B': bars(DATES[:3], [20] * 3, [20] * 3)})
+    result = fs.PortfolioBacktest(initial_cash=1000, allocation='fixed', weights={'A': 0.25, 'B': 0.75}, rebalance=0).run(panel)
+    # floor(250 / 10) = 25 A and floor(750 / 20) = 37 B cost 990
+    assert trades_on(result, DATES[1]) == {'A': (25.0, 10.0), 'B': (37.0, 20.0)}
+    assert result.cash[-1] == 10
+    assert result.final_value == 1000
+
+
+def test_ticker_listed_later_joins_at_the_next_rebalance_and_gaps_are_marked_at_the_last_close(fs):
+    # B has no bars 0 and 1 (not listed yet) and none on the last bar
+    panel = fs.PricePanel.from_frames({'A': bars(DATES, [10, 10, 10, 10, 10], [10, 10, 10, 10, 12]),
+                                       'B': bars(DATES[2:4], [20, 20], [20, 25])})
+    result = fs.PortfolioBacktest(initial_cash=1000, rebalance=0).run(panel)
+    # All in A first; when B lists at bar 2 the targets change to 50/50, filled at bar 3's open
+    assert trades_on(result, DATES[1]) == {'A': (100.0, 10.0)}
+    assert trades_on(result, DATES[3]) == {'A': (-50.0, 10.0), 'B': (25.0, 20.0)}
+    np.testing.assert_array_equal(result.cash, [1000, 0, 0, 0, 0])
+    # B keeps its bar 3 close of 25 on the last bar, where it has no bar
+    assert result.value[-1] == 50 * 12 + 25 * 25
+
+
+def test_scheduled_rebalance_restores_the_targets(fs):
+    panel = fs.PricePanel.from_frames({'A': bars(DATES, [10, 10, 20, 20, 20], [10, 10, 20, 20, 20]),
+                                       'B': bars(DATES, [10] * 5, [10] * 5)})
+    result = fs.PortfolioBacktest(initial_cash=1000, rebalance=2).run(panel)
+    # Decisions on bars 0 and 2 (bar 4 is the last bar and has no next open). After A doubles the book is worth
+    # 1500: 37 A at 20 and 75 B at 10, selling 13 A for 260 and buying 25 B for 250
+    assert sorted(set(result.trades['date'])) == [DATES[1], DATES[3]]
+    assert trades_on(result, DATES[3]) == {'A': (-13.0, 20.0), 'B': (25.0, 10.0)}
+    np.testing.assert_array_equal(result.position[-1], [37, 75])
+    np.testing.assert_array_equal(result.cash, [1000, 0, 0, 10, 10])
+    np.testing.assert_array_equal(result.value, [1000, 1000, 1500, 1500, 1500])
+
+
+def test_strategy_signals_drive_the_weights(fs):
+    closes = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 300))
+    dates = pd.bdate_range('2020-01-01', periods=300, name='Date')
+    frame = bars(dates, closes, closes)
+    panel = fs.PricePanel.from_frames({'A': frame})
+    result = fs.PortfolioBacktest(fs.MovingAverageStrategy, 100000, rebalance=0, short_period=5, long_period=20).run(panel)
+    buy, sell = fs.MovingAverageStrategy.vector_signals(panel['Close'], fs.resolve_strategy_params(
+        fs.MovingAverageStrategy, short_period=5, long_period=20))
+    holding = fs.VectorizedBacktest.desired_from_signals(buy, sell)[:, 0]
+    # Invested (from the next bar) exactly while the strategy wants to hold
+    np.testing.assert_array_equal(result.position[1:, 0] > 0, holding[:-1])
+    assert np.all(result.cash >= 0)
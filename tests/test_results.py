@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import daily_bars
+
+
+def stored_run(fs, store, data, strategy_cls, params, ticker, cash=100000):
+    key = store.key(data, strategy_cls, params, cash, 'vectorized')
+    result = fs.run_strategy(data, strategy_cls, params, cash, 'vectorized')
+    metrics = fs.backtest_metrics(result, data, cash)
+    store.save(key, result, metrics, ticker=ticker, strategy=strategy_cls.__name__, params=params, engine='vectorized')
+    return key, result, metrics
+
+
+def test_key_changes_with_data_params_and_cash(fs, tmp_path):
+    store = fs.ResultStore(str(tmp_path))
+    data = daily_bars(300, seed=1)
+    key = store.key(data, fs.MovingAverageStrategy, {}, 100000, 'vectorized')
+    assert store.key(data.copy(), fs.MovingAverageStrategy, {}, 100000, 'vectorized') == key
+    # Passing a default explicitly resolves to the same settings
+    default = fs.resolve_strategy_params(fs.MovingAverageStrategy).short_period
+    assert store.key(data, fs.MovingAverageStrategy, {'short_period': default}, 100000, 'vectorized') == key
+
+    revised = data.copy()
+    revised.iloc[150, revised.columns.get_loc('Close')] *= 1.001
+    keys = {key,
+            store.key(revised, fs.MovingAverageStrategy, {}, 100000, 'vectorized'),
+            store.key(data.iloc[:-1], fs.MovingAverageStrategy, {}, 100000, 'vectorized'),
+            store.key(data.tz_localize('UTC'), fs.MovingAverageStrategy, {}, 100000, 'vectorized'),
+            store.key(data, fs.MovingAverageStrategy, {'short_period': default + 1}, 100000, 'vectorized'),
+            store.key(data, fs.MovingAverageStrategy, {}, 50000, 'vectorized'),
+            store.key(data, fs.MovingAverageStrategy, {}, 100000, 'backtrader'),
+            store.key(data, fs.RSIStrategy, {}, 100000, 'vectorized')}
+    assert len(keys) == 8
+
+
+def test_missing_run_is_not_found(fs, tmp_path):
+    store = fs.ResultStore(str(tmp_path))
+    key = store.key(daily_bars(300), fs.RSIStrategy, {}, 100000, 'vectorized')
+    assert store.metrics(key) is None
+    assert store.load(key) is None
+
+
+@pytest.mark.parametrize('tz', [None, 'America/New_York'])
+def test_save_then_load_round_trips_the_result(fs, tmp_path, tz):
+    store = fs.ResultStore(str(tmp_path))
+    data = daily_bars(800, seed=3)
+    data.index = data.index.tz_localize(tz) if tz else data.index
+    key, result, metrics = stored_run(fs, store, data, fs.MovingAverageStrategy, {}, 'X')
+    assert result.trades
+    loaded, loaded_metrics = store.load(key)
+    pd.testing.assert_index_equal(loaded.dates, pd.DatetimeIndex(result.dates), check_exact=True,
+                                  exact=False, check_names=False)
+    assert str(loaded.dates.tz) == str(tz)
+    np.testing.assert_array_equal(loaded.position, result.position)
+    np.testing.assert_array_equal(loaded.cash, result.cash)
+    np.testing.assert_array_equal(loaded.value, result.value)
+    assert loaded.trades == result.trades
+    assert loaded.initial_cash == result.initial_cash
+    assert loaded.final_value == result.final_value
+    assert loaded_metrics == metrics
+    assert isinstance(loaded_metrics['Trades'], int)
+    # A save leaves no temporary file behind
+    assert sorted(os.listdir(tmp_path)) == [f"{key}.npz", 'index.sqlite']
+
+
+def test_run_backtest_reuses_the_stored_run(fs, tmp_path):
+    store = fs.ResultStore(str(tmp_path))
+    data = daily_bars(500, seed=5)
+    timer = fs.PhaseTimer()
+    first = fs.run_backtest(data, fs.RSIStrategy, engine='vectorized', store=store, ticker='X', timer=timer)
+    second = fs.run_backtest(data, fs.RSIStrategy, engine='vectorized', store=store, ticker='X', timer=timer)
+    assert second == first
+    assert [phase['name'] for phase in timer.phases].count('run') == 1
+
+
+def test_query_filters_and_orders_by_metric(fs, tmp_path):
+    store = fs.ResultStore(str(tmp_path))
+    runs = {}
+    for ticker, seed in [('AAA', 1), ('BBB', 2)]:
+        data = daily_bars(600, seed=seed)
+        for strategy_cls, params in [(fs.MovingAverageStrategy, {}), (fs.MovingAverageStrategy, {'short_period': 10}),
+                                     (fs.RSIStrategy, {}), (fs.RSIStrategy, {'rsi_period': 10})]:
+            key, _, metrics = stored_run(fs, store, data, strategy_cls, params, ticker)
+            runs[key] = (ticker, strategy_cls.__name__, params, metrics)
+
+    def expected(ticker=None, strategy=None, minimum=None, maximum=None):
+        rows = [(run[3]['Sharpe Ratio'], key) for key, run in runs.items()
+                if (ticker is None or run[0] == ticker) and (strategy is None or run[1] == strategy)
+                and (minimum is None or run[3]['Sharpe Ratio'] >= minimum)
+                and (maximum is None or run[3]['Sharpe Ratio'] <= maximum)]
+        return [key for _, key in sorted(rows, reverse=True)]
+
+    def keys(**filters):
+        return [run['key'] for run in store.query(metric='Sharpe Ratio', **filters)]
+
+    sharpes = sorted(run[3]['Sharpe Ratio'] for run in runs.values())
+    middle = sharpes[len(sharpes) // 2]
+    assert keys() == expected()
+    assert keys(ticker='AAA') == expected(ticker='AAA')
+    assert keys(strategy='RSIStrategy') == expected(strategy='RSIStrategy')
+    assert keys(ticker='BBB', strategy='MovingAverageStrategy') == expected(ticker='BBB', strategy='MovingAverageStrategy')
+    assert keys(minimum=middle) == expected(minimum=middle)
+    assert keys(maximum=middle) == expected(maximum=middle)
+    assert keys(ticker='AAA', minimum=middle) == expected(ticker='AAA', minimum=middle)
+    assert keys(ticker='CCC') == []
+    assert [run['key'] for run in store.query(metric='Sharpe Ratio', limit=2)] == expected()[:2]
+
+    for run in store.query(ticker='AAA', strategy='RSIStrategy', metric='Sharpe Ratio'):
+        assert (run['ticker'], run['strategy'], run['engine']) == ('AAA', 'RSIStrategy', 'vectorized')
+        assert run['params'] == runs[run['key']][2]
+        assert run['metrics'] == runs[run['key']][3]
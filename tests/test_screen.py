@@ -0,0 +1,84 @@
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import daily_bars
+
+
+class AboveAverage(bt.Strategy):
+    # Long while the close is above its moving average; refuses series with non-positive prices
+    params = (('period', 10),)
+
+    @classmethod
+    def vector_signals(cls, close, p):
+        if np.nanmin(close) <= 0:
+            raise ValueError("Prices must be positive")
+        above = close > pd.Series(close).rolling(p.period).mean().to_numpy()
+        before = np.concatenate([[False], above[:-1]])
+        return above & ~before, ~above & before
+
+
+def universe(fs, broken=None):
+    frames = {ticker: daily_bars(500, seed=seed) for ticker, seed in [('AAA', 1), ('BBB', 2), ('CCC', 3)]}
+    if broken:
+        frames[broken].iloc[200, frames[broken].columns.get_loc('Close')] = -1.0
+    return fs.PricePanel.from_frames(frames)
+
+
+def expected_metrics(fs, panel, strategy_cls, params, engine='vectorized'):
+    metrics = {}
+    for ticker in panel.tickers:
+        data = panel.to_frame(ticker)
+        metrics[ticker] = fs.backtest_metrics(fs.run_strategy(data, strategy_cls, params, 100000, engine), data, 100000)
+    return metrics
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_ranking_matches_per_ticker_backtests(fs, processes):
+    panel = universe(fs)
+    params = {'short_period': 10, 'long_period': 30}
+    screen = fs.UniverseScreen(fs.MovingAverageStrategy, params, processes=processes)
+    results = list(screen.run(panel))
+    expected = expected_metrics(fs, panel, fs.MovingAverageStrategy, params)
+    assert dict(results) == expected
+    assert screen.failed == {}
+    for metric in ('Sharpe Ratio', 'Total Return'):
+        ranked = [ticker for ticker, _ in fs.UniverseScreen.rank(results, metric)]
+        assert ranked == sorted(expected, key=lambda ticker: expected[ticker][metric], reverse=True)
+        assert len(set(expected[ticker][metric] for ticker in expected)) == 3
+
+
+def test_backtrader_engine_screens_the_same_way(fs):
+    panel = universe(fs)
+    screen = fs.UniverseScreen(fs.RSIStrategy, engine='backtrader', processes=2)
+    results = dict(screen.run(panel))
+    expected = expected_metrics(fs, panel, fs.RSIStrategy, {}, engine='backtrader')
+    assert results.keys() == expected.keys()
+    for ticker in expected:
+        assert results[ticker]['Final Value'] == pytest.approx(expected[ticker]['Final Value'])
+
+
+def test_failing_ticker_is_reported_not_raised(fs):
+    panel = universe(fs, broken='BBB')
+    screen = fs.UniverseScreen(AboveAverage, {'period': 20}, processes=2)
+    results = list(screen.run(panel))
+    assert sorted(ticker for ticker, _ in results) == ['AAA', 'CCC']
+    assert screen.failed == {'BBB': "ValueError: Prices must be positive"}
+    for ticker, metrics in results:
+        data = panel.to_frame(ticker)
+        assert metrics == fs.backtest_metrics(fs.run_strategy(data, AboveAverage, {'period': 20}, 100000, 'vectorized'),
+                                              data, 100000)
+    # A new run starts with a clean failure list
+    list(screen.run(universe(fs)))
+    assert screen.failed == {}
+
+
+def test_undefined_metrics_rank_last(fs):
+    results = [('FLAT', {'Sharpe Ratio': np.nan}), ('LOW', {'Sharpe Ratio': -0.5}), ('HIGH', {'Sharpe Ratio': 1.2})]
+    assert [ticker for ticker, _ in fs.UniverseScreen.rank(results)] == ['HIGH', 'LOW', 'FLAT']
+
+
+def test_unknown_parameters_are_rejected_up_front(fs):
+    with pytest.raises(ValueError, match='Unknown parameters'):
+        fs.UniverseScreen(fs.RSIStrategy, {'window': 3})
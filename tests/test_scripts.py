@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from conftest import daily_bars
+
+RAISING = """
+class Broken(bt.Strategy):
+    def next(self):
+        raise ValueError("bad signal")
+"""
+
+SPINNING = """
+class Spinning(bt.Strategy):
+    def __init__(self):
+        while True:
+            pass
+"""
+
+BLOCKING = """
+import time
+
+class Blocking(bt.Strategy):
+    def __init__(self):
+        time.sleep(60)
+"""
+
+# The built-in strategy through the script API (workers are forked, so they see the test's copy of the module)
+BUILT_IN = """
+from flint_steel import MovingAverageStrategy
+
+class Script(MovingAverageStrategy):
+    pass
+"""
+
+
+@pytest.fixture
+def runner(fs):
+    runner = fs.ScriptRunner(processes=1, cpu_seconds=2, memory_mb=1024, wall_seconds=30)
+    yield runner
+    runner.close()
+
+
+def test_script_errors_are_raised_and_the_pool_survives(fs, runner):
+    data = daily_bars(300)
+    with pytest.raises(ValueError, match='bad signal'):
+        runner.run(RAISING, data)
+    assert runner.run(BUILT_IN, data, {'short_period': 10, 'long_period': 30})['strategy'] == 'Script'
+
+
+def test_cpu_limit_stops_a_spinning_script(fs, runner):
+    started = time.monotonic()
+    with pytest.raises(fs.ScriptError, match='CPU time limit'):
+        runner.run(SPINNING, daily_bars(300))
+    assert time.monotonic() - started < 20
+
+
+def test_cancelling_a_blocked_script_kills_its_worker(fs, runner):
+    job = fs.BackgroundJob('blocked', None)
+    threading.Timer(0.5, job.cancel).start()
+    started = time.monotonic()
+    with pytest.raises(fs.JobCancelled):
+        runner.run(BLOCKING, daily_bars(300), job=job)
+    assert time.monotonic() - started < 10
+    assert runner.executor is None
+    assert runner.run(BUILT_IN, daily_bars(300), {'short_period': 10, 'long_period': 30})['metrics']['Bars'] == 300
+
+
+def test_wall_clock_limit_stops_a_blocked_script(fs):
+    runner = fs.ScriptRunner(processes=2, wall_seconds=1)
+    try:
+        started = time.monotonic()
+        with pytest.raises(fs.ScriptError, match='within 1 seconds'):
+            runner.run(BLOCKING, daily_bars(300))
+        assert time.monotonic() - started < 10
+        assert runner.executor is None
+    finally:
+        runner.close()
+
+
+def test_script_metrics_match_the_built_in_strategy(fs, runner):
+    data = daily_bars(800, seed=3)
+    params = {'short_period': 10, 'long_period': 30}
+    result = runner.run(BUILT_IN, data, params)
+    expected = fs.backtest_metrics(fs.run_strategy(data, fs.MovingAverageStrategy, params, engine='backtrader'), data, 100000)
+    for name in fs.METRIC_NAMES + ['Final Value', 'Bars']:
+        assert result['metrics'][name] == pytest.approx(expected[name], rel=1e-9, abs=1e-12), name
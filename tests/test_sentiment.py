@@ -0,0 +1,31 @@
+import numpy as np
+
+
+def test_scorer_matches_whole_words_only(fs):
+    scorer = fs.SentimentScorer()
+    np.testing.assert_array_equal(scorer.score(['Software update released', 'Download speeds rise', 'Upside and downside',
+                                                'Goodwill written off', 'Badge design']), np.zeros(5))
+    np.testing.assert_array_equal(scorer.score(['Shares UP', 'up-and-coming', '(down)']), [1.0, 1.0, -1.0])
+
+
+def test_scorer_assigns_every_match_to_its_headline(fs):
+    scorer = fs.SentimentScorer()
+    headlines = ['good good up', '', 'bad news', 'update: download done', 'Up and DOWN', 'no terms', 'bad']
+    np.testing.assert_array_equal(scorer.score(headlines), [3.0, 0.0, -1.0, 0.0, 0.0, 0.0, -1.0])
+    # Trailing headlines with no match still get a score, and a NUL inside a headline does not split it
+    np.testing.assert_array_equal(scorer.score(['up', 'nothing', 'none']), [1.0, 0.0, 0.0])
+    np.testing.assert_array_equal(scorer.score(['up\0down', 'good']), [0.0, 1.0])
+
+
+def test_scorer_phrases_stay_within_a_headline(fs):
+    scorer = fs.SentimentScorer({'beat estimates': 2.0, 'beat': 0.5, 'miss': -1.0})
+    np.testing.assert_array_equal(scorer.score(['Beat  Estimates again', 'beat', 'estimates miss']), [2.0, 0.5, -1.0])
+    np.testing.assert_array_equal(scorer.score(['we beat', 'estimates']), [0.5, 0.0])
+
+
+def test_score_tickers_splits_scores_per_ticker(fs):
+    scores = fs.SentimentScorer().score_tickers({'A': ['up', 'down down'], 'B': [], 'C': ['good']})
+    assert list(scores) == ['A', 'B', 'C']
+    np.testing.assert_array_equal(scores['A'], [1.0, -2.0])
+    assert len(scores['B']) == 0
+    np.testing.assert_array_equal(scores['C'], [1.0])
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from conftest import daily_bars
+
+STRATEGY_PARAMS = [
+    ('MovingAverageStrategy', {'short_period': 10, 'long_period': 30}),
+    ('MovingAverageStrategy', {}),
+    ('RSIStrategy', {}),
+    ('BollingerBandsStrategy', {}),
+    ('MACDStrategy', {}),
+    ('BuyAndHoldStrategy', {}),
+]
+
+
+def gappy_close(seed, bars=1200):
+    # Leading NaNs plus scattered single-bar gaps
+    close = daily_bars(bars, seed=seed)['Close'].to_numpy().copy()
+    rng = np.random.default_rng(seed)
+    close[:3] = np.nan
+    close[rng.choice(np.arange(3, bars), 8, replace=False)] = np.nan
+    return close
+
+
+def test_rolling_sma_nan_leaves_with_its_bar(fs):
+    values = np.arange(20.0)
+    values[2] = np.nan
+    rolling = fs.RollingSMA(5)
+    streamed = np.array([rolling.update(value) for value in values])
+    np.testing.assert_array_equal(np.isnan(streamed), np.isnan(fs.sma(values, 5)))
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('period', [1, 5, 26])
+def test_rolling_ema_matches_ema_with_gaps(fs, seed, period):
+    close = gappy_close(seed)
+    rolling = fs.RollingEMA(period)
+    streamed = np.array([rolling.update(value) for value in close])
+    np.testing.assert_array_equal(streamed, fs.ema(close, period))
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('name, params', STRATEGY_PARAMS)
+def test_stream_signals_match_vector_signals(fs, name, params, seed):
+    strategy_cls = getattr(fs, name)
+    p = fs.resolve_strategy_params(strategy_cls, **params)
+    for close in (daily_bars(1200, seed=seed)['Close'].to_numpy(), gappy_close(seed)):
+        buy, sell = strategy_cls.vector_signals(close, p)
+        step = strategy_cls.stream_signals(p)
+        streamed = np.array([step(value) for value in close.tolist()], dtype=bool)
+        np.testing.assert_array_equal(streamed[:, 0], buy)
+        np.testing.assert_array_equal(streamed[:, 1], sell)
+
+
+@pytest.mark.parametrize('name, params', STRATEGY_PARAMS)
+def test_paper_trader_reproduces_vectorized_backtest_with_gaps(fs, name, params):
+    strategy_cls = getattr(fs, name)
+    data = daily_bars(1200, seed=7)
+    data.loc[data.index[np.random.default_rng(7).choice(np.arange(3, 1200), 8, replace=False)], 'Close'] = np.nan
+    expected = fs.VectorizedBacktest(strategy_cls, 100000, **params).run(data)
+    trader = fs.PaperTrader(strategy_cls, 100000, record=True, **params)
+    trader.replay({'X': data})
+    result = trader.result('X', data.index)
+    np.testing.assert_array_equal(result.position, expected.position)
+    np.testing.assert_array_equal(result.value, expected.value)
+    assert result.trades == expected.trades
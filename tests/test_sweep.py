@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import daily_bars
+
+
+@pytest.mark.parametrize('tz', [None, 'America/New_York'])
+def test_shared_price_data_round_trip(fs, tz):
+    data = daily_bars(250, seed=4)
+    if tz:
+        data.index = data.index.tz_localize(tz)
+    # Extra and reordered columns: only OHLCV columns are shared, in OHLCV order
+    data = data[['Volume', 'Close', 'Open', 'High', 'Low', 'Adj Close']].assign(Note=1.0)
+    shared = fs.SharedPriceData(data)
+    try:
+        shm, attached = fs.SharedPriceData.attach(shared.spec)
+        try:
+            assert list(attached.columns) == fs.OHLCV_COLUMNS
+            assert attached.index.name == 'Date'
+            assert str(attached.index.tz) == str(tz) if tz else attached.index.tz is None
+            np.testing.assert_array_equal(attached.index.to_numpy(dtype='datetime64[ns]'), data.index.to_numpy(dtype='datetime64[ns]'))
+            pd.testing.assert_frame_equal(attached, data[fs.OHLCV_COLUMNS], check_index_type=False, check_freq=False)
+        finally:
+            del attached
+            shm.close()
+    finally:
+        shared.close()
+
+
+def test_sweep_matches_serial_runs_and_skips_failures(fs):
+    data = daily_bars(800, seed=9)
+    # long_period=None makes the run fail; the sweep logs and skips those configurations
+    ranges = {'short_period': [5, 10], 'long_period': [20, 30, None]}
+    results = list(fs.ParameterSweep(fs.MovingAverageStrategy, ranges, processes=2).run(data))
+    assert sorted((params['short_period'], params['long_period']) for params, _ in results) == [(5, 20), (5, 30), (10, 20), (10, 30)]
+    for params, metrics in results:
+        values = fs.run_strategy(data, fs.MovingAverageStrategy, params).value
+        expected = fs.batch_metrics(values[:, None], initial=100000)
+        assert metrics.keys() == expected.keys()
+        for name, column in expected.items():
+            assert metrics[name] == pytest.approx(float(column[0]), rel=1e-12, abs=1e-12), (params, name)
+    ranked = fs.ParameterSweep.rank(results)
+    assert [metrics['Total Return'] for _, metrics in ranked] == sorted((m['Total Return'] for _, m in results), reverse=True)
@@ -0,0 +1,105 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+from conftest import daily_bars
+
+
+def busy(seconds):
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+def by_name(timer, name):
+    return [phase for phase in timer.phases if phase['name'] == name]
+
+
+def test_phases_nest_and_accumulate(fs):
+    timer = fs.PhaseTimer(memory=None)
+    with timer.phase('ticker'):
+        with timer.phase('fetch'):
+            busy(0.01)
+        for _ in range(3):
+            with timer.phase('run'):
+                busy(0.01)
+    with timer.phase('ticker'):
+        with timer.phase('run'):
+            time.sleep(0.02)
+
+    assert [(phase['name'], phase['depth']) for phase in sorted(timer.phases, key=lambda phase: phase['start'])] == \
+        [('ticker', 0), ('fetch', 1), ('run', 1), ('run', 1), ('run', 1), ('ticker', 0), ('run', 1)]
+    # Every occurrence of a phase is kept, and a parent covers the time of its children
+    runs = by_name(timer, 'run')
+    assert len(runs) == 4 and all(run['cpu'] >= 0.01 for run in runs[:3])
+    assert runs[3]['wall'] >= 0.02 and runs[3]['cpu'] < runs[3]['wall']
+    first, second = by_name(timer, 'ticker')
+    assert first['wall'] >= sum(phase['wall'] for phase in runs[:3]) + by_name(timer, 'fetch')[0]['wall']
+    assert first['cpu'] >= 0.04
+    assert second['start'] >= first['start'] + first['wall']
+    assert all(phase['peak_memory'] is None for phase in timer.phases)
+
+
+def test_a_phase_is_recorded_when_it_raises(fs):
+    timer = fs.PhaseTimer(memory=None)
+    with pytest.raises(ValueError):
+        with timer.phase('outer'):
+            with timer.phase('inner'):
+                raise ValueError("boom")
+    assert [(phase['name'], phase['depth']) for phase in timer.phases] == [('inner', 1), ('outer', 0)]
+    assert timer.stack == []
+
+
+def test_traced_peaks_carry_up_to_the_parent(fs):
+    timer = fs.PhaseTimer(memory='traced')
+    with timer.phase('outer'):
+        with timer.phase('allocate'):
+            block = np.ones(4 * 2**20 // 8)
+        del block
+        with timer.phase('small'):
+            pass
+    outer, allocate, small = (by_name(timer, name)[0] for name in ('outer', 'allocate', 'small'))
+    assert allocate['peak_memory'] >= 4 * 2**20
+    assert small['peak_memory'] < 2**20
+    assert outer['peak_memory'] >= allocate['peak_memory']
+
+
+def test_summary_lists_every_phase_indented_by_depth(fs):
+    timer = fs.PhaseTimer(memory=None)
+    with timer.phase('AAA'):
+        with timer.phase('fetch'):
+            pass
+        with timer.phase('run'):
+            pass
+    with timer.phase('metrics'):
+        pass
+    lines = timer.summary().splitlines()
+    assert lines[0] == "Timings (wall / CPU / peak memory):"
+    assert [line.split(':')[0] for line in lines[1:]] == ['  AAA', '    fetch', '    run', '  metrics']
+    assert all(line.endswith('s') for line in lines[1:])
+
+
+def test_backtest_phases_and_next_calls(fs, tmp_path):
+    timer = fs.PhaseTimer(next_calls=True)
+    data = daily_bars(300, seed=4)
+    fs.run_backtest(data, fs.MovingAverageStrategy, engine='backtrader', timer=timer)
+    # The feed's preload runs inside cerebro.run, so it nests under 'run'
+    assert [(phase['name'], phase['depth']) for phase in sorted(timer.phases, key=lambda phase: phase['start'])] == \
+        [('feed', 0), ('run', 0), ('feed.preload', 1), ('analyzers', 0), ('metrics', 0)]
+    assert timer.calls['MovingAverageStrategy']['next'][0] > 0
+    assert timer.calls['MovingAverageStrategy']['analyzers'][0] == 300
+    summary = timer.summary()
+    assert '\n  run: ' in summary and '\n    feed.preload: ' in summary
+    assert 'MovingAverageStrategy next: ' in summary
+
+    report = timer.to_dict()
+    assert [phase['name'] for phase in report['phases']] == ['feed', 'run', 'feed.preload', 'analyzers', 'metrics']
+    assert 'thread' not in report['phases'][0]
+    timer.export(str(tmp_path / 'timings.trace.json'))
+    with open(tmp_path / 'timings.trace.json') as file:
+        trace = json.load(file)
+    assert sorted(event['name'] for event in trace['traceEvents']) == ['analyzers', 'feed', 'feed.preload', 'metrics', 'run']
+    with pytest.raises(ValueError):
+        timer.export(str(tmp_path / 'timings.prof'))